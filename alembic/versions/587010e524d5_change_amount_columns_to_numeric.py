@@ -21,26 +21,31 @@ depends_on: Union[str, Sequence[str], None] = None
 def upgrade() -> None:
     """Upgrade schema."""
     # ### commands auto generated by Alembic - please adjust! ###
-    op.alter_column('budgets', 'amount',
-               existing_type=sa.DOUBLE_PRECISION(precision=53),
-               type_=sa.Numeric(precision=10, scale=2),
-               existing_nullable=False)
-    op.alter_column('expenses', 'amount',
-               existing_type=sa.DOUBLE_PRECISION(precision=53),
-               type_=sa.Numeric(precision=10, scale=2),
-               existing_nullable=False)
+    # Batch mode: SQLite cannot ALTER COLUMN and recreates the tables instead.
+    with op.batch_alter_table('budgets') as batch_op:
+        batch_op.alter_column('amount',
+                   existing_type=sa.DOUBLE_PRECISION(precision=53),
+                   type_=sa.Numeric(precision=10, scale=2),
+                   existing_nullable=False)
+    with op.batch_alter_table('expenses') as batch_op:
+        batch_op.alter_column('amount',
+                   existing_type=sa.DOUBLE_PRECISION(precision=53),
+                   type_=sa.Numeric(precision=10, scale=2),
+                   existing_nullable=False)
     # ### end Alembic commands ###
 
 
 def downgrade() -> None:
     """Downgrade schema."""
     # ### commands auto generated by Alembic - please adjust! ###
-    op.alter_column('expenses', 'amount',
-               existing_type=sa.Numeric(precision=10, scale=2),
-               type_=sa.DOUBLE_PRECISION(precision=53),
-               existing_nullable=False)
-    op.alter_column('budgets', 'amount',
-               existing_type=sa.Numeric(precision=10, scale=2),
-               type_=sa.DOUBLE_PRECISION(precision=53),
-               existing_nullable=False)
+    with op.batch_alter_table('expenses') as batch_op:
+        batch_op.alter_column('amount',
+                   existing_type=sa.Numeric(precision=10, scale=2),
+                   type_=sa.DOUBLE_PRECISION(precision=53),
+                   existing_nullable=False)
+    with op.batch_alter_table('budgets') as batch_op:
+        batch_op.alter_column('amount',
+                   existing_type=sa.Numeric(precision=10, scale=2),
+                   type_=sa.DOUBLE_PRECISION(precision=53),
+                   existing_nullable=False)
     # ### end Alembic commands ###
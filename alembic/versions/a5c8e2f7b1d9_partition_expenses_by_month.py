@@ -0,0 +1,105 @@
+"""partition expenses by month of spent_at
+
+Revision ID: a5c8e2f7b1d9
+Revises: f3b7d1e6a8c4
+Create Date: 2025-12-08 10:41:19.203617
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.app.database.partitions import (
+    PARTITION_MONTHS_AHEAD,
+    add_months,
+    ensure_expense_partitions,
+    month_start,
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5c8e2f7b1d9'
+down_revision: Union[str, Sequence[str], None] = 'f3b7d1e6a8c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "id, name, amount, category_id, budget_id, spent_at, created_at"
+
+
+def _create_indexes() -> None:
+    op.create_index('ix_expenses_category_id_id', 'expenses', ['category_id', 'id'], postgresql_include=['amount'])
+    op.create_index('ix_expenses_budget_id_id', 'expenses', ['budget_id', 'id'], postgresql_include=['amount'])
+    op.create_index('ix_expenses_name', 'expenses', ['name'], postgresql_ops={'name': 'varchar_pattern_ops'})
+    op.create_index(
+        'ix_expenses_spent_at', 'expenses', ['spent_at'], postgresql_include=['amount', 'category_id', 'budget_id']
+    )
+
+
+def _rename_legacy(name: str) -> None:
+    """Move the current expenses table aside so its names can be reused."""
+    op.execute(f"ALTER TABLE expenses RENAME TO {name}")
+    op.execute(f"ALTER TABLE {name} RENAME CONSTRAINT expenses_pkey TO {name}_pkey")
+    for index in ('ix_expenses_category_id_id', 'ix_expenses_budget_id_id', 'ix_expenses_name', 'ix_expenses_spent_at'):
+        op.execute(f"DROP INDEX {index}")
+
+
+def _create_expenses(primary_key: str, partition_by: str = "") -> None:
+    op.execute(
+        f"""
+        CREATE TABLE expenses (
+            id integer NOT NULL DEFAULT nextval('expenses_id_seq'),
+            name varchar NOT NULL,
+            amount numeric(10, 2) NOT NULL,
+            category_id integer NOT NULL REFERENCES categories (id),
+            budget_id integer REFERENCES budgets (id),
+            spent_at timestamptz NOT NULL DEFAULT now(),
+            created_at timestamptz NOT NULL DEFAULT now(),
+            PRIMARY KEY ({primary_key})
+        ) {partition_by}
+        """
+    )
+
+
+def _move_rows(legacy: str) -> None:
+    op.execute(f"INSERT INTO expenses ({COLUMNS}) SELECT {COLUMNS} FROM {legacy}")
+    # The id sequence belongs to the old table and would be dropped with it.
+    op.execute("ALTER SEQUENCE expenses_id_seq OWNED BY expenses.id")
+    op.execute(f"DROP TABLE {legacy}")
+    _create_indexes()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return  # SQLite has no partitioning: expenses stays a plain table.
+
+    # An existing table cannot be partitioned in place: the rows are copied
+    # into a new partitioned table, which locks expenses for the duration.
+    # The primary key of a partitioned table must include the partition key.
+    _rename_legacy('expenses_unpartitioned')
+    _create_expenses('id, spent_at', 'PARTITION BY RANGE (spent_at)')
+
+    # One partition per month from the oldest expense through the coming
+    # months, plus the default partition.
+    this_month = month_start(datetime.now(timezone.utc).date())
+    oldest = bind.scalar(sa.text("SELECT min(spent_at) FROM expenses_unpartitioned"))
+    first = month_start(oldest.astimezone(timezone.utc).date()) if oldest else this_month
+    ensure_expense_partitions(bind, min(first, this_month), add_months(this_month, PARTITION_MONTHS_AHEAD))
+
+    # Indexes are built once the rows are in; partitioned tables cannot be
+    # indexed CONCURRENTLY anyway.
+    _move_rows('expenses_unpartitioned')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    _rename_legacy('expenses_partitioned')
+    _create_expenses('id')
+    _move_rows('expenses_partitioned')  # drops the partitions with their parent
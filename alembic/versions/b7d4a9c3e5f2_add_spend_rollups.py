@@ -0,0 +1,43 @@
+"""add monthly spend rollups
+
+Revision ID: b7d4a9c3e5f2
+Revises: a5c8e2f7b1d9
+Create Date: 2025-12-15 16:22:04.871350
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d4a9c3e5f2'
+down_revision: Union[str, Sequence[str], None] = 'a5c8e2f7b1d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Created empty: reports keep aggregating the expenses until the app (or
+    # python -m src.app.commands.refresh_rollups) has built every month.
+    op.create_table(
+        'spend_rollups',
+        sa.Column('period', sa.Date(), primary_key=True),
+        sa.Column('category_id', sa.Integer(), sa.ForeignKey('categories.id'), primary_key=True),
+        sa.Column('budget_id', sa.Integer(), primary_key=True),
+        sa.Column('total', sa.Numeric(14, 2), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        'spend_rollup_periods',
+        sa.Column('period', sa.Date(), primary_key=True),
+        sa.Column('refreshed_at', sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('spend_rollup_periods')
+    op.drop_table('spend_rollups')
@@ -0,0 +1,64 @@
+"""add expense fk and covering indexes
+
+Revision ID: c4e1a7d2b9f0
+Revises: bb5fb4c81bcc
+Create Date: 2025-11-10 09:12:41.208311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e1a7d2b9f0'
+down_revision: Union[str, Sequence[str], None] = 'bb5fb4c81bcc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The primary keys already index id; these duplicates only slow writes.
+    op.drop_index('ix_categories_id', table_name='categories')
+    op.drop_index('ix_budgets_id', table_name='budgets')
+    op.drop_index('ix_expenses_id', table_name='expenses')
+    op.drop_index('ix_expenses_name', table_name='expenses')
+
+    # Build outside the migration transaction so Postgres can index a large
+    # expenses table CONCURRENTLY without blocking writes.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_expenses_category_id_id',
+            'expenses',
+            ['category_id', 'id'],
+            postgresql_include=['amount'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_expenses_budget_id_id',
+            'expenses',
+            ['budget_id', 'id'],
+            postgresql_include=['amount'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_expenses_name',
+            'expenses',
+            ['name'],
+            postgresql_ops={'name': 'varchar_pattern_ops'},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_expenses_name', table_name='expenses')
+    op.drop_index('ix_expenses_budget_id_id', table_name='expenses')
+    op.drop_index('ix_expenses_category_id_id', table_name='expenses')
+
+    op.create_index('ix_expenses_name', 'expenses', ['name'])
+    op.create_index('ix_expenses_id', 'expenses', ['id'], unique=True)
+    op.create_index('ix_budgets_id', 'budgets', ['id'], unique=True)
+    op.create_index('ix_categories_id', 'categories', ['id'], unique=True)
@@ -0,0 +1,36 @@
+"""add idempotency keys
+
+Revision ID: c9e3f5a7d1b4
+Revises: b7d4a9c3e5f2
+Create Date: 2026-01-08 10:41:27.305118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9e3f5a7d1b4'
+down_revision: Union[str, Sequence[str], None] = 'b7d4a9c3e5f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'idempotency_keys',
+        sa.Column('key', sa.LargeBinary(32), primary_key=True),
+        sa.Column('fingerprint', sa.LargeBinary(32), nullable=False),
+        sa.Column('resource_id', sa.Integer(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(op.f('ix_idempotency_keys_expires_at'), 'idempotency_keys', ['expires_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_idempotency_keys_expires_at'), table_name='idempotency_keys')
+    op.drop_table('idempotency_keys')
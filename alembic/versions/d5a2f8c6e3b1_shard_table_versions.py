@@ -0,0 +1,84 @@
+"""shard table_versions so concurrent writers do not queue on one row
+
+Revision ID: d5a2f8c6e3b1
+Revises: c9e3f5a7d1b4
+Create Date: 2026-01-15 09:12:40.527931
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a2f8c6e3b1'
+down_revision: Union[str, Sequence[str], None] = 'c9e3f5a7d1b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SHARDS = 16
+TABLES = ('budgets', 'categories', 'expenses')
+
+
+def _current_versions():
+    table_versions = sa.table(
+        'table_versions',
+        sa.column('name', sa.String()),
+        sa.column('version', sa.BigInteger()),
+        sa.column('updated_at', sa.DateTime(timezone=True)),
+    )
+    rows = op.get_bind().execute(
+        sa.select(
+            table_versions.c.name, sa.func.sum(table_versions.c.version), sa.func.max(table_versions.c.updated_at)
+        ).group_by(table_versions.c.name)
+    )
+    return {name: (int(version), updated_at) for name, version, updated_at in rows}
+
+
+def _recreate(sharded: bool, rows) -> None:
+    op.drop_table('table_versions')
+    columns = [sa.Column('name', sa.String(length=64), nullable=False)]
+    if sharded:
+        columns.append(sa.Column('shard', sa.Integer(), nullable=False))
+    table_versions = op.create_table(
+        'table_versions',
+        *columns,
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('name', 'shard') if sharded else sa.PrimaryKeyConstraint('name'),
+    )
+    op.bulk_insert(table_versions, rows)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Shard 0 carries the current count, so existing ETags stay valid.
+    current = _current_versions()
+    now = datetime.now(timezone.utc)
+    _recreate(
+        sharded=True,
+        rows=[
+            {
+                'name': name,
+                'shard': shard,
+                'version': current.get(name, (0, now))[0] if shard == 0 else 0,
+                'updated_at': current.get(name, (0, now))[1],
+            }
+            for name in TABLES
+            for shard in range(SHARDS)
+        ],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    current = _current_versions()
+    _recreate(
+        sharded=False,
+        rows=[
+            {'name': name, 'version': version, 'updated_at': updated_at}
+            for name, (version, updated_at) in current.items()
+        ],
+    )
@@ -0,0 +1,42 @@
+"""add running spent totals to budgets and categories
+
+Revision ID: d8f3b5a1c2e7
+Revises: c4e1a7d2b9f0
+Create Date: 2025-11-14 16:03:27.551902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8f3b5a1c2e7'
+down_revision: Union[str, Sequence[str], None] = 'c4e1a7d2b9f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('budgets', sa.Column('spent', sa.Numeric(precision=14, scale=2), server_default='0', nullable=False))
+    op.add_column('categories', sa.Column('spent', sa.Numeric(precision=14, scale=2), server_default='0', nullable=False))
+
+    # Backfill from the existing ledger.
+    op.execute(
+        "UPDATE budgets SET spent = COALESCE("
+        "(SELECT SUM(amount) FROM expenses WHERE expenses.budget_id = budgets.id), 0)"
+    )
+    op.execute(
+        "UPDATE categories SET spent = COALESCE("
+        "(SELECT SUM(amount) FROM expenses WHERE expenses.category_id = categories.id), 0)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('categories') as batch_op:
+        batch_op.drop_column('spent')
+    with op.batch_alter_table('budgets') as batch_op:
+        batch_op.drop_column('spent')
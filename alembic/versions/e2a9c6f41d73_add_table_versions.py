@@ -0,0 +1,40 @@
+"""add table_versions for ETag / Last-Modified validators
+
+Revision ID: e2a9c6f41d73
+Revises: d8f3b5a1c2e7
+Create Date: 2025-11-18 10:21:44.118305
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a9c6f41d73'
+down_revision: Union[str, Sequence[str], None] = 'd8f3b5a1c2e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    table_versions = op.create_table(
+        'table_versions',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    now = datetime.now(timezone.utc)
+    op.bulk_insert(
+        table_versions,
+        [{'name': name, 'version': 0, 'updated_at': now} for name in ('budgets', 'categories', 'expenses')],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('table_versions')
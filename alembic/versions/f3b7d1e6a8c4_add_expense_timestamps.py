@@ -0,0 +1,52 @@
+"""add expense spent_at / created_at timestamps
+
+Revision ID: f3b7d1e6a8c4
+Revises: e2a9c6f41d73
+Create Date: 2025-11-24 14:02:37.540912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b7d1e6a8c4'
+down_revision: Union[str, Sequence[str], None] = 'e2a9c6f41d73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing expenses have no recorded date: both columns are backfilled with
+    # the time of the migration. now() is evaluated once, so Postgres 11+ adds
+    # the columns without rewriting the table.
+    # SQLite cannot ADD COLUMN with a non-constant default to a table that
+    # has rows: it copies the table instead (batch mode).
+    recreate = 'always' if op.get_bind().dialect.name == 'sqlite' else 'auto'
+    with op.batch_alter_table('expenses', recreate=recreate) as batch_op:
+        batch_op.add_column(
+            sa.Column('spent_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        )
+        batch_op.add_column(
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_expenses_spent_at',
+            'expenses',
+            ['spent_at'],
+            postgresql_include=['amount', 'category_id', 'budget_id'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_expenses_spent_at', table_name='expenses')
+    with op.batch_alter_table('expenses') as batch_op:
+        batch_op.drop_column('created_at')
+        batch_op.drop_column('spent_at')
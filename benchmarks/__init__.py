@@ -0,0 +1,6 @@
+"""Performance benchmarks for the Expense Tracker API.
+
+Scripts in this package run against the database configured through
+``DATABASE_URL`` / ``POSTGRES_*`` (see ``src/app/database/expense.py``). Seeding drops and recreates the
+tables, so point them at a scratch database.
+"""
@@ -0,0 +1,51 @@
+"""Auth microbenchmark: get_current_user per request with and without the token cache.
+
+Usage::
+
+    python -m benchmarks.auth --iterations 100000
+    python -m benchmarks.auth --keys-dir keys/ --kid ed-2026   # asymmetric tokens
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+
+def _per_call_us(token: str, iterations: int) -> float:
+    from src.app.security.auth import get_current_user
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        get_current_user(token)
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100_000)
+    parser.add_argument("--keys-dir", help="sign with the <kid>.pem keys of this directory")
+    parser.add_argument("--kid", help="signing key id (with --keys-dir)")
+    args = parser.parse_args()
+
+    from src.app.security import jwt as jwt_helpers
+    from src.app.security.keys import load_key_ring
+
+    if args.keys_dir:
+        jwt_helpers.configure_keys(load_key_ring(args.keys_dir, args.kid))
+    print(f"algorithm: {jwt_helpers.KEY_RING.signing.algorithm}")
+
+    token = jwt_helpers.create_access_token({"sub": "admin"})
+    results = {}
+    for label, size in (("uncached", 0), ("cached", 1024)):
+        jwt_helpers.configure_verify_cache(size)
+        _per_call_us(token, 1_000)  # warm-up
+        results[label] = _per_call_us(token, args.iterations)
+
+    for label, value in results.items():
+        print(f"{label:>8}: {value:7.2f} us per request")
+    print(f"speedup: {results['uncached'] / results['cached']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Stored benchmark baselines and regression checks.
+
+``benchmarks.load`` and ``benchmarks.micro`` produce ``{case: {metric: value}}``
+results. ``--save-baseline FILE`` stores them as JSON together with what they
+were measured on; ``--baseline FILE`` compares a run against such a file and
+exits with status 1 when a metric is worse by more than ``--tolerance``.
+
+Timings only compare meaningfully on the machine and database that produced
+the baseline, so keep one file per environment (``benchmarks/baselines/``
+holds the SQLite stand-in ones). Queries per request do not depend on the
+machine and are held to a small absolute slack instead.
+"""
+
+from __future__ import annotations
+
+import json
+import platform
+import sys
+from pathlib import Path
+
+# +1: higher is better, -1: lower is better. Other metrics are informational:
+# in-process tails (p99) and per-call means / medians are too noisy to gate on,
+# while the fastest round of a microbenchmark is stable.
+METRICS = {
+    "rps": +1,
+    "p50_ms": -1,
+    "p95_ms": -1,
+    "queries_per_request": -1,
+    "min_us": -1,
+}
+# Extra queries per request tolerated before a run counts as a regression.
+QUERY_SLACK = 0.1
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("--json", metavar="FILE", help="write the results as JSON")
+    parser.add_argument("--baseline", metavar="FILE", help="compare with a stored baseline (exit 1 on regression)")
+    parser.add_argument("--save-baseline", metavar="FILE", help="store the results as the new baseline")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed relative slowdown against the baseline (default 0.25)",
+    )
+
+
+def environment(**settings) -> dict:
+    from src.app.database.expense import ASYNC_DATABASE, engine
+
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "database": engine.dialect.name,
+        "async": ASYNC_DATABASE,
+        **settings,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Describe each metric of ``results`` worse than in ``baseline``."""
+    regressions = []
+    for case, expected_metrics in baseline["results"].items():
+        metrics = results.get(case)
+        if metrics is None:
+            continue
+        for name, expected in expected_metrics.items():
+            direction = METRICS.get(name)
+            actual = metrics.get(name)
+            if direction is None or actual is None:
+                continue
+            if name == "queries_per_request":
+                worse = actual > expected + QUERY_SLACK
+            elif direction > 0:
+                worse = actual < expected * (1 - tolerance)
+            else:
+                worse = actual > expected * (1 + tolerance)
+            if worse:
+                regressions.append(f"{case} {name}: {actual:.2f} (baseline {expected:.2f})")
+    return regressions
+
+
+def finish(results: dict, args, settings: dict) -> int:
+    """Write, store and check ``results`` as the baseline arguments ask; return the exit status."""
+    document = {"environment": environment(**settings), "results": results}
+    if args.json:
+        Path(args.json).write_text(json.dumps(document, indent=2) + "\n")
+    if args.save_baseline:
+        Path(args.save_baseline).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.save_baseline).write_text(json.dumps(document, indent=2, sort_keys=True) + "\n")
+        print(f"Saved baseline {args.save_baseline}")
+    if not args.baseline:
+        return 0
+
+    baseline = json.loads(Path(args.baseline).read_text())
+    if baseline["environment"] != document["environment"]:
+        print(f"note: baseline measured on {baseline['environment']}", file=sys.stderr)
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print(f"No regression against {args.baseline} (tolerance {args.tolerance:.0%}).")
+    return 1 if regressions else 0
@@ -0,0 +1,87 @@
+"""Bulk import benchmark: POST /api/v1/expenses/bulk vs. one create per row.
+
+Usage::
+
+    python -m benchmarks.bulk_insert --rows 50000 --single-rows 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+
+def _payload(rows: int, category_ids: list[int], budget_ids: list[int]) -> list[dict]:
+    rng = random.Random(7)
+    return [
+        {
+            "name": f"statement-line-{i}",
+            "amount": round(rng.uniform(1, 500), 2),
+            "category_id": rng.choice(category_ids),
+            "budget_id": rng.choice(budget_ids),
+        }
+        for i in range(rows)
+    ]
+
+
+async def _run(rows: int, single_rows: int, ndjson: bool) -> None:
+    import httpx
+
+    from benchmarks.common import auth_headers, seed_expenses
+    from src.app.database.expense import SessionLocal, async_engine
+    from src.app.models.expense import Budget, Category
+    from src.main import app
+
+    seed_expenses(0)
+    with SessionLocal() as db:
+        category_ids = [c.id for c in db.query(Category.id)]
+        budget_ids = [b.id for b in db.query(Budget.id)]
+
+    headers = auth_headers()
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None
+    ) as client:
+        if single_rows:
+            payload = _payload(single_rows, category_ids, budget_ids)
+            started = time.perf_counter()
+            for row in payload:
+                (await client.post("/api/v1/expenses", json=row, headers=headers)).raise_for_status()
+            elapsed = time.perf_counter() - started
+            print(f"single: {single_rows:>7} rows in {elapsed:6.2f} s  {single_rows / elapsed:10,.0f} rows/s")
+
+        payload = _payload(rows, category_ids, budget_ids)
+        if ndjson:
+            body = "\n".join(json.dumps(row) for row in payload).encode()
+            content_type = "application/x-ndjson"
+        else:
+            body = json.dumps(payload).encode()
+            content_type = "application/json"
+        started = time.perf_counter()
+        response = await client.post(
+            "/api/v1/expenses/bulk",
+            content=body,
+            headers={**headers, "Content-Type": content_type},
+        )
+        elapsed = time.perf_counter() - started
+        response.raise_for_status()
+        created = len(response.json()["created"])
+        print(f"  bulk: {created:>7} rows in {elapsed:6.2f} s  {created / elapsed:10,.0f} rows/s")
+
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--single-rows", type=int, default=2_000)
+    parser.add_argument("--ndjson", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(_run(args.rows, args.single_rows, args.ndjson))
+
+
+if __name__ == "__main__":
+    main()
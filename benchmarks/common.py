@@ -0,0 +1,67 @@
+"""Shared helpers for the benchmark scripts."""
+
+from __future__ import annotations
+
+import math
+import random
+from datetime import datetime, timedelta, timezone
+
+from src.app.database.expense import Base, SessionLocal, engine
+from src.app.models.expense import Budget, Category, Expense
+from src.app.security.auth import create_token_for_user
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return the ``pct`` percentile (0-100) of ``samples`` (nearest rank)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_summary(samples: list[float]) -> dict[str, float]:
+    """Summarise request latencies given in seconds as milliseconds."""
+    return {
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "max_ms": max(samples, default=0.0) * 1000,
+    }
+
+
+def auth_headers(username: str = "admin") -> dict[str, str]:
+    return {"Authorization": f"Bearer {create_token_for_user(username)}"}
+
+
+def seed_expenses(rows: int, categories: int = 10, budgets: int = 5, seed: int = 42, days: int = 365) -> None:
+    """Recreate the schema and insert ``rows`` synthetic expenses spent over the last ``days`` days."""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with SessionLocal() as db:
+        db.add_all(Category(name=f"category-{i}") for i in range(categories))
+        db.add_all(Budget(name=f"budget-{i}", amount=100_000) for i in range(budgets))
+        db.commit()
+        category_ids = [c.id for c in db.query(Category.id)]
+        budget_ids = [b.id for b in db.query(Budget.id)]
+
+        batch = []
+        for i in range(rows):
+            batch.append(
+                {
+                    "name": f"expense-{i}",
+                    "amount": round(rng.uniform(1, 500), 2),
+                    "category_id": rng.choice(category_ids),
+                    "budget_id": rng.choice(budget_ids),
+                    "spent_at": now - timedelta(seconds=rng.uniform(0, days * 86400)),
+                }
+            )
+            if len(batch) == 10_000:
+                db.bulk_insert_mappings(Expense, batch)
+                batch.clear()
+        if batch:
+            db.bulk_insert_mappings(Expense, batch)
+        db.commit()
@@ -0,0 +1,92 @@
+"""Concurrency benchmark: sync session vs. AsyncSession (DATABASE_ASYNC=1).
+
+Fires ``--requests`` GET requests with ``--concurrency`` in flight against the
+in-process app and reports latency percentiles for each database mode. The
+sync mode runs every query on the event loop, so in-flight requests queue
+behind each other; the async mode overlaps their database waits. Run it
+against Postgres: SQLite has no network waits to overlap.
+
+Usage::
+
+    python -m benchmarks.concurrency --rows 1000 --requests 2000 --concurrency 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+async def _run_load(rows: int, total: int, concurrency: int) -> dict:
+    import httpx
+
+    from benchmarks.common import auth_headers, latency_summary
+    from src.app.database.expense import async_engine
+    from src.main import app
+
+    headers = auth_headers()
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+
+        async def one_request(i: int) -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(
+                    f"/api/v1/expenses/{i % rows + 1}", headers=headers
+                )
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one_request(i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+
+    if async_engine is not None:
+        await async_engine.dispose()
+    return {"rps": total / elapsed, **latency_summary(latencies)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--worker", choices=["sync", "async"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = asyncio.run(_run_load(args.rows, args.requests, args.concurrency))
+        print(json.dumps(result))
+        return
+
+    from benchmarks.common import seed_expenses
+
+    seed_expenses(args.rows)
+    for mode in ("sync", "async"):
+        env = {**os.environ, "DATABASE_ASYNC": "1" if mode == "async" else "0"}
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.concurrency", "--worker", mode, *sys.argv[1:]],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{mode:>5}: {result['rps']:8.0f} req/s  "
+            f"p50 {result['p50_ms']:7.1f} ms  p95 {result['p95_ms']:7.1f} ms  "
+            f"p99 {result['p99_ms']:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
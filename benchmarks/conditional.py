@@ -0,0 +1,91 @@
+"""Polling benchmark: full GETs vs. conditional GETs answered with 304.
+
+Simulates a dashboard polling an unchanged expense page and reports latency,
+bytes transferred and SQL statements per poll for both kinds of request.
+
+Usage::
+
+    python -m benchmarks.conditional --rows 5000 --limit 500 --polls 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+
+async def _poll(client, path: str, headers: dict, polls: int, expected: int, counter) -> dict:
+    from benchmarks.common import latency_summary
+
+    samples = []
+    transferred = 0
+    statements = counter()
+    for _ in range(polls):
+        started = time.perf_counter()
+        response = await client.get(path, headers=headers)
+        samples.append(time.perf_counter() - started)
+        assert response.status_code == expected, response.status_code
+        transferred += len(response.content)
+    return {
+        **latency_summary(samples),
+        "kb_per_poll": transferred / polls / 1024,
+        "statements_per_poll": (counter() - statements) / polls,
+    }
+
+
+async def _run(rows: int, limit: int, polls: int) -> None:
+    import httpx
+    from sqlalchemy import event
+
+    from benchmarks.common import auth_headers, seed_expenses
+    from src.app.database.expense import async_engine, engine
+    from src.main import app
+
+    seed_expenses(rows)
+
+    executed = 0
+
+    def count(*args):
+        nonlocal executed
+        executed += 1
+
+    for target in filter(None, (engine, async_engine and async_engine.sync_engine)):
+        event.listen(target, "before_cursor_execute", count)
+
+    headers = auth_headers()
+    path = f"/api/v1/expenses?limit={limit}"
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None
+    ) as client:
+        first = await client.get(path, headers=headers)
+        first.raise_for_status()
+        results = {
+            "full": await _poll(client, path, headers, polls, 200, lambda: executed),
+            "conditional": await _poll(
+                client, path, {**headers, "If-None-Match": first.headers["etag"]}, polls, 304, lambda: executed
+            ),
+        }
+
+    if async_engine is not None:
+        await async_engine.dispose()
+
+    print(f"polling {path} ({rows} rows seeded), {polls} polls each")
+    for name, result in results.items():
+        print(
+            f"{name:>11}: p50 {result['p50_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms  "
+            f"{result['kb_per_poll']:8.1f} KiB/poll  {result['statements_per_poll']:.1f} SQL/poll"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5_000)
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--polls", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(_run(args.rows, args.limit, args.polls))
+
+
+if __name__ == "__main__":
+    main()
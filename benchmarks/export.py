@@ -0,0 +1,124 @@
+"""Export benchmark: stream the whole ledger and report throughput and peak RSS.
+
+Seeds ``--rows`` synthetic expenses, then streams ``/api/v1/expenses/export``
+through the in-process app in a fresh interpreter so that the reported peak
+RSS belongs to the export alone.
+
+Usage::
+
+    python -m benchmarks.export --rows 1000000 --format ndjson [--gzip]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import time
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def _run_export(fmt: str, gzip: bool) -> dict:
+    from urllib.parse import urlencode
+
+    from benchmarks.common import auth_headers
+    from src.app.database.expense import async_engine
+    from src.main import app
+
+    # Drive the ASGI app directly: httpx's ASGITransport buffers the whole
+    # body, which would hide whether the server itself streams.
+    query = {"format": fmt}
+    if gzip:
+        query["gzip"] = "true"
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/v1/expenses/export",
+        "raw_path": b"/api/v1/expenses/export",
+        "query_string": urlencode(query).encode(),
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in auth_headers().items()],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    totals = {"status": None, "bytes": 0}
+
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # The client never disconnects; block like a live connection would.
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            totals["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            body = message.get("body", b"")
+            totals["bytes"] += len(body)
+
+    rss_before = _peak_rss_mb()
+    started = time.perf_counter()
+    await app(scope, receive, send)
+    elapsed = time.perf_counter() - started
+    if totals["status"] != 200:
+        raise RuntimeError(f"export failed with status {totals['status']}")
+
+    if async_engine is not None:
+        await async_engine.dispose()
+    return {
+        "seconds": elapsed,
+        "mb": totals["bytes"] / 1024 / 1024,
+        "rss_before_mb": rss_before,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(asyncio.run(_run_export(args.format, args.gzip))))
+        return
+
+    if not args.skip_seed:
+        from benchmarks.common import seed_expenses
+
+        seed_expenses(args.rows)
+
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.export", "--worker", *sys.argv[1:]],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    print(
+        f"exported {args.rows} rows ({result['mb']:.1f} MB) in {result['seconds']:.2f} s: "
+        f"{args.rows / result['seconds']:,.0f} rows/s, "
+        f"peak RSS {result['peak_rss_mb']:.0f} MB "
+        f"(+{result['peak_rss_mb'] - result['rss_before_mb']:.0f} MB during export)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Fast JSON path benchmark: CPU time of a 10k-row expenses page.
+
+Compares, in one process, the two ways ``get_expenses`` builds its body:
+
+* default: ORM rows from ``get_all_expenses``, validated and serialized by
+  FastAPI against the route's ``response_model``, rendered by ``JSONResponse``;
+* fast: column tuples from ``get_expense_rows`` encoded by
+  :func:`src.app.fast_json.dumps` (``FAST_JSON_RESPONSES=1``).
+
+The services are called directly so the page can exceed ``MAX_PAGE_SIZE``.
+With ``--profile`` each path also prints its top functions by own CPU time.
+
+Usage::
+
+    python -m benchmarks.fast_json --rows 10000 --iterations 10 [--profile]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import cProfile
+import io
+import pstats
+import time
+
+
+async def _default_body(db, route, limit: int) -> bytes:
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+
+    from src.app.services import expense_services
+
+    expenses, next_cursor = expense_services.get_all_expenses(db, limit=limit)
+    content = await serialize_response(
+        field=route.response_field,
+        response_content={"items": expenses, "next_cursor": next_cursor},
+        is_coroutine=True,
+    )
+    return JSONResponse(content).body
+
+
+async def _fast_body(db, route, limit: int) -> bytes:
+    from src.app.fast_json import dumps
+    from src.app.services import expense_services
+
+    expenses, next_cursor = expense_services.get_expense_rows(db, limit=limit)
+    return dumps({"items": expenses, "next_cursor": next_cursor})
+
+
+def _run(build, route, limit: int, iterations: int, profile: bool) -> dict:
+    from src.app.database.expense import SessionLocal
+
+    async def once():
+        # A fresh session per page, as per request.
+        with SessionLocal() as db:
+            return await build(db, route, limit)
+
+    body = asyncio.run(once())  # warm-up
+    profiler = cProfile.Profile() if profile else None
+    cpu_started, wall_started = time.process_time(), time.perf_counter()
+    if profiler:
+        profiler.enable()
+    for _ in range(iterations):
+        asyncio.run(once())
+    if profiler:
+        profiler.disable()
+    result = {
+        "cpu_ms": (time.process_time() - cpu_started) / iterations * 1000,
+        "wall_ms": (time.perf_counter() - wall_started) / iterations * 1000,
+        "bytes": len(body),
+    }
+    if profiler:
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats("tottime").print_stats(12)
+        result["profile"] = stream.getvalue()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--profile", action="store_true", help="print a cProfile summary per path")
+    args = parser.parse_args()
+
+    from benchmarks.common import seed_expenses
+    from src.main import app
+
+    seed_expenses(args.rows)
+    route = next(route for route in app.routes if getattr(route, "name", None) == "get_expenses")
+
+    results = {}
+    for label, build in (("default", _default_body), ("fast", _fast_body)):
+        results[label] = _run(build, route, args.rows, args.iterations, args.profile)
+        result = results[label]
+        print(
+            f"{label:>8}: {result['cpu_ms']:8.1f} ms CPU  {result['wall_ms']:8.1f} ms wall  "
+            f"per {args.rows}-row page ({result['bytes'] / 1024:.0f} KiB)"
+        )
+        if args.profile:
+            print(result["profile"])
+    print(f"CPU speedup: {results['default']['cpu_ms'] / results['fast']['cpu_ms']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
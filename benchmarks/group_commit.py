@@ -0,0 +1,108 @@
+"""Group commit benchmark: sustained expense inserts per second through the API.
+
+Drives ``POST /api/v1/expenses`` with ``--concurrency`` requests in flight for
+``--seconds`` seconds, once per transaction (the default) and once with
+``EXPENSE_GROUP_COMMIT=1``, each in a fresh interpreter. Reports inserts per
+second, latency percentiles and database commits per insert. Point
+``DATABASE_URL`` at the Postgres to size for: the gain is the fsyncs saved.
+
+Usage::
+
+    python -m benchmarks.group_commit --seconds 10 --concurrency 64
+    python -m benchmarks.group_commit --max-batch 200 --max-delay-ms 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+async def _ingest(seconds: float, concurrency: int) -> dict:
+    import httpx
+    from sqlalchemy import event
+
+    from benchmarks.common import auth_headers, latency_summary
+    from src.app.database.expense import async_engine, engine
+    from src.app.group_commit import expense_writer
+    from src.main import app
+
+    commits = 0
+
+    def count_commit(conn):
+        nonlocal commits
+        commits += 1
+
+    for counted in [engine] + ([async_engine.sync_engine] if async_engine is not None else []):
+        event.listen(counted, "commit", count_commit)
+    headers = auth_headers()
+    samples: list[float] = []
+    deadline = time.perf_counter() + seconds
+
+    async def client_loop(client, worker: int) -> None:
+        i = 0
+        while time.perf_counter() < deadline:
+            body = {"name": f"ingest-{worker}-{i}", "amount": f"{i % 500 + 1}.25", "category_id": 1, "budget_id": 1}
+            started = time.perf_counter()
+            (await client.post("/api/v1/expenses", json=body, headers=headers)).raise_for_status()
+            samples.append(time.perf_counter() - started)
+            i += 1
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client, worker) for worker in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    await expense_writer.stop()
+    if async_engine is not None:
+        await async_engine.dispose()
+    return {
+        "inserts_per_s": len(samples) / elapsed,
+        **latency_summary(samples),
+        "commits_per_insert": commits / max(len(samples), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--max-batch", type=int, help="GROUP_COMMIT_MAX_BATCH for the group commit run")
+    parser.add_argument("--max-delay-ms", type=float, help="GROUP_COMMIT_MAX_DELAY_MS for the group commit run")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(asyncio.run(_ingest(args.seconds, args.concurrency))))
+        return
+
+    from benchmarks.common import seed_expenses
+
+    seed_expenses(0, categories=1, budgets=1)
+    tuning = {}
+    if args.max_batch is not None:
+        tuning["GROUP_COMMIT_MAX_BATCH"] = str(args.max_batch)
+    if args.max_delay_ms is not None:
+        tuning["GROUP_COMMIT_MAX_DELAY_MS"] = str(args.max_delay_ms)
+    for enabled in ("0", "1"):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.group_commit", "--worker", *sys.argv[1:]],
+            check=True,
+            capture_output=True,
+            text=True,
+            env={**os.environ, **tuning, "EXPENSE_GROUP_COMMIT": enabled},
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{'group commit' if enabled == '1' else 'per request '}: {result['inserts_per_s']:8.0f} inserts/s  "
+            f"p50 {result['p50_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms  "
+            f"{result['commits_per_insert']:.3f} commits/insert"
+        )
+
+
+if __name__ == "__main__":
+    main()
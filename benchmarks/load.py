@@ -0,0 +1,167 @@
+"""In-process load generator: RPS, latency percentiles and queries per request.
+
+Seeds ``--rows`` synthetic expenses into the database of ``DATABASE_URL`` (a
+local Postgres, or SQLite as a stand-in), then drives ``src.main:app`` through
+``httpx.ASGITransport`` with ``--concurrency`` requests in flight, one
+scenario at a time. Each scenario starts with ``--warmup`` unmeasured requests
+(caches, pools, prepared statements) and reports requests per second,
+p50/p95/p99 latency and the statements sent to the database per request.
+
+Usage::
+
+    python -m benchmarks.load --rows 10000 --requests 2000 --concurrency 10
+    python -m benchmarks.load --scenario create_expense --scenario list_expenses
+    python -m benchmarks.load --save-baseline benchmarks/baselines/sqlite-load.json
+    python -m benchmarks.load --baseline benchmarks/baselines/sqlite-load.json  # exit 1 on regression
+
+The in-process transport leaves out the network and the server, so the
+numbers are an upper bound of what a deployed worker serves; compare runs
+with each other rather than with production.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+
+from benchmarks import baseline
+
+CATEGORIES = 10
+BUDGETS = 5
+
+
+def _scenarios(rows: int) -> dict:
+    """Scenario name -> ``request(i)`` returning the arguments of ``client.request``."""
+    return {
+        "login": lambda i: (
+            "POST",
+            "/api/v1/auth/token",
+            {"data": {"username": "admin", "password": "admin"}, "auth": False},
+        ),
+        "list_expenses": lambda i: ("GET", "/api/v1/expenses", {"params": {"limit": 50}}),
+        "list_expenses_by_category": lambda i: (
+            "GET",
+            "/api/v1/expenses",
+            {"params": {"limit": 50, "category_id": i % CATEGORIES + 1}},
+        ),
+        "get_expense": lambda i: ("GET", f"/api/v1/expenses/{i % rows + 1}", {}),
+        "create_expense": lambda i: (
+            "POST",
+            "/api/v1/expenses",
+            {
+                "json": {
+                    "name": f"load-{i}",
+                    "amount": f"{i % 500 + 1}.25",
+                    "category_id": i % CATEGORIES + 1,
+                    "budget_id": i % BUDGETS + 1,
+                }
+            },
+        ),
+        "report_summary": lambda i: ("GET", "/api/v1/reports/summary", {"params": {"group_by": "category"}}),
+    }
+
+
+class _StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+async def _run_scenario(client, request, headers, total: int, warmup: int, concurrency: int, counter) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one(i: int, record: bool) -> None:
+        method, path, options = request(i)
+        options = dict(options)
+        request_headers = headers if options.pop("auth", True) else {}
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.request(method, path, headers=request_headers, **options)
+            if record:
+                latencies.append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{method} {path}: {response.status_code} {response.text}")
+
+    await asyncio.gather(*(one(i, False) for i in range(warmup)))
+    counter.count = 0
+    started = time.perf_counter()
+    await asyncio.gather(*(one(warmup + i, True) for i in range(total)))
+    elapsed = time.perf_counter() - started
+
+    from benchmarks.common import latency_summary
+
+    return {
+        "rps": total / elapsed,
+        **latency_summary(latencies),
+        "queries_per_request": counter.count / total,
+    }
+
+
+async def _run(names: list[str], rows: int, total: int, warmup: int, concurrency: int) -> dict:
+    import httpx
+    from sqlalchemy import event
+
+    from benchmarks.common import auth_headers
+    from src.app.database.expense import async_engine, engine
+    from src.main import app
+
+    counter = _StatementCounter()
+    engines = [engine] + ([async_engine.sync_engine] if async_engine is not None else [])
+    for counted in engines:
+        event.listen(counted, "before_cursor_execute", counter)
+
+    scenarios = _scenarios(rows)
+    results = {}
+    headers = auth_headers()
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            for name in names:
+                results[name] = await _run_scenario(
+                    client, scenarios[name], headers, total, warmup, concurrency, counter
+                )
+    finally:
+        for counted in engines:
+            event.remove(counted, "before_cursor_execute", counter)
+        if async_engine is not None:
+            await async_engine.dispose()
+    return results
+
+
+def main() -> int:
+    scenario_names = list(_scenarios(1))
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000, help="expenses to seed")
+    parser.add_argument("--requests", type=int, default=2000, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--scenario", action="append", choices=scenario_names, help="run only these (repeatable)"
+    )
+    parser.add_argument("--no-seed", action="store_true", help="reuse the data of a previous run")
+    baseline.add_arguments(parser)
+    args = parser.parse_args()
+
+    if not args.no_seed:
+        from benchmarks.common import seed_expenses
+
+        seed_expenses(args.rows, categories=CATEGORIES, budgets=BUDGETS)
+
+    names = args.scenario or scenario_names
+    results = asyncio.run(_run(names, args.rows, args.requests, args.warmup, args.concurrency))
+    for name, result in results.items():
+        print(
+            f"{name:>26}: {result['rps']:8.0f} req/s  p50 {result['p50_ms']:7.2f} ms  "
+            f"p95 {result['p95_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms  "
+            f"{result['queries_per_request']:5.2f} queries/req"
+        )
+    settings = {"rows": args.rows, "requests": args.requests, "concurrency": args.concurrency}
+    return baseline.finish(results, args, settings)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""Metrics overhead benchmark: cost of the request metrics on the hot path.
+
+Two measurements:
+
+* micro: ``MetricsMiddleware`` around a no-op ASGI app vs. the bare app, so
+  the per-request cost of the middleware itself is isolated;
+* end to end: ``GET /api/v1/categories`` through the full app with
+  ``METRICS_ENABLED`` on and off (with the slow-query log), each in a fresh
+  interpreter.
+
+Usage::
+
+    python -m benchmarks.metrics_overhead --requests 2000 --micro 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+async def _micro(iterations: int) -> dict:
+    from src.app.middleware import MetricsMiddleware
+
+    class Route:
+        name = "bench"
+
+    async def endpoint(scope, receive, send):
+        scope["route"] = Route
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    results = {}
+    for name, app in (("bare", endpoint), ("metrics", MetricsMiddleware(endpoint))):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            await app({"type": "http", "method": "GET", "path": "/"}, receive, send)
+        results[name] = (time.perf_counter() - started) / iterations * 1_000_000
+    return results
+
+
+async def _end_to_end(requests: int) -> dict:
+    import httpx
+
+    from benchmarks.common import auth_headers, latency_summary
+    from src.app.database.expense import async_engine
+    from src.main import app
+
+    headers = auth_headers()
+    samples = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for _ in range(50):
+            await client.get("/api/v1/categories", headers=headers)
+        for _ in range(requests):
+            started = time.perf_counter()
+            (await client.get("/api/v1/categories", headers=headers)).raise_for_status()
+            samples.append(time.perf_counter() - started)
+    if async_engine is not None:
+        await async_engine.dispose()
+    return {**latency_summary(samples), "mean_ms": sum(samples) / len(samples) * 1000}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--micro", type=int, default=200_000)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(asyncio.run(_end_to_end(args.requests))))
+        return
+
+    micro = asyncio.run(_micro(args.micro))
+    print(
+        f"micro: bare {micro['bare']:.2f} us/request, with metrics {micro['metrics']:.2f} us/request "
+        f"(+{micro['metrics'] - micro['bare']:.2f} us)"
+    )
+
+    from benchmarks.common import seed_expenses
+
+    seed_expenses(0)
+    for enabled in ("0", "1"):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.metrics_overhead", "--worker", *sys.argv[1:]],
+            check=True,
+            capture_output=True,
+            text=True,
+            # Off means no middleware at all: the SQL profiling also needs it.
+            env={**os.environ, "METRICS_ENABLED": enabled, **({} if enabled == "1" else {"SLOW_QUERY_MS": "0"})},
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"end to end, metrics {'on ' if enabled == '1' else 'off'}: mean {result['mean_ms']:.3f} ms  "
+            f"p50 {result['p50_ms']:.3f} ms  p99 {result['p99_ms']:.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Microbenchmarks of the services, serialization and auth helpers.
+
+Each case is timed the way pytest-benchmark does it: the number of calls per
+round is calibrated so a round lasts at least ``--min-round-ms``, then
+``--rounds`` rounds are timed and reported as min / median / mean / stddev
+per call and calls per second. Service cases run against ``--rows`` seeded
+expenses in the database of ``DATABASE_URL``.
+
+Usage::
+
+    python -m benchmarks.micro --rows 10000 --rounds 20
+    python -m benchmarks.micro --case expense_out_page --case decode_token_uncached
+    python -m benchmarks.micro --baseline benchmarks/baselines/sqlite-micro.json  # exit 1 on regression
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import statistics
+import sys
+import time
+from decimal import Decimal
+
+from benchmarks import baseline
+
+PAGE = 50
+
+
+def _time(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return time.perf_counter() - started
+
+
+def measure(fn, rounds: int, min_round_time: float) -> dict:
+    """Per-call statistics of ``fn`` in microseconds."""
+    fn()  # warm-up
+    iterations = 1
+    while (elapsed := _time(fn, iterations)) < min_round_time:
+        iterations = max(iterations * 2, int(iterations * min_round_time / max(elapsed, 1e-9)))
+    gc.collect()
+    samples = [_time(fn, iterations) / iterations * 1_000_000 for _ in range(rounds)]
+    mean = statistics.fmean(samples)
+    return {
+        "min_us": min(samples),
+        "median_us": statistics.median(samples),
+        "mean_us": mean,
+        "stddev_us": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "ops": 1_000_000 / mean,
+        "rounds": rounds,
+        "iterations": iterations,
+    }
+
+
+def _cases(db) -> dict:
+    """Case name -> zero-argument callable."""
+    import jwt as pyjwt
+    from pydantic import TypeAdapter
+
+    from src.app.fast_json import dumps
+    from src.app.models.expense import Expense
+    from src.app.schema.expense import ExpenseIn, ExpenseOut
+    from src.app.security import jwt as jwt_helpers
+    from src.app.services import expense_services, report_services
+
+    page, _ = expense_services.get_all_expenses(db, limit=PAGE)
+    rows, _ = expense_services.get_expense_rows(db, limit=PAGE)
+    db.expunge_all()  # detached: the create case's commits must not expire the page
+    page_adapter = TypeAdapter(list[ExpenseOut])
+    payload = {"name": "Coffee", "amount": "3.20", "category_id": 1, "budget_id": 1}
+    token = jwt_helpers.create_access_token({"sub": "admin"})
+    counter = iter(range(10**9))
+
+    def decode_uncached():
+        # What decode_access_token does on a verified-token cache miss.
+        key = jwt_helpers.KEY_RING.verification_key(token)
+        pyjwt.decode(token, key.verifying_key, algorithms=[key.algorithm])
+
+    def create_expense():
+        expense = Expense(name=f"micro-{next(counter)}", amount=Decimal("3.20"), category_id=1, budget_id=1)
+        expense_services.create_expense(expense, db)
+
+    return {
+        "expense_in_validate": lambda: ExpenseIn.model_validate(payload),
+        "expense_out_page": lambda: page_adapter.dump_json(page_adapter.validate_python(page, from_attributes=True)),
+        "fast_json_page": lambda: dumps({"items": rows, "next_cursor": None}),
+        "create_token": lambda: jwt_helpers.create_access_token({"sub": "admin"}),
+        "decode_token_uncached": decode_uncached,
+        "get_all_expenses": lambda: expense_services.get_all_expenses(db, limit=PAGE),
+        "get_expense_rows": lambda: expense_services.get_expense_rows(db, limit=PAGE),
+        "get_spend_summary": lambda: report_services.get_spend_summary(db, ["category"]),
+        "create_expense": create_expense,
+    }
+
+
+CASES = (
+    "expense_in_validate",
+    "expense_out_page",
+    "fast_json_page",
+    "create_token",
+    "decode_token_uncached",
+    "get_all_expenses",
+    "get_expense_rows",
+    "get_spend_summary",
+    "create_expense",
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000, help="expenses to seed")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--min-round-ms", type=float, default=20.0)
+    parser.add_argument("--case", action="append", choices=CASES, help="run only these (repeatable)")
+    parser.add_argument("--no-seed", action="store_true", help="reuse the data of a previous run")
+    baseline.add_arguments(parser)
+    args = parser.parse_args()
+
+    from src.app.database.expense import SessionLocal
+
+    if not args.no_seed:
+        from benchmarks.common import seed_expenses
+
+        seed_expenses(args.rows)
+
+    results = {}
+    with SessionLocal() as db:
+        cases = _cases(db)
+        for name in args.case or CASES:
+            results[name] = measure(cases[name], args.rounds, args.min_round_ms / 1000)
+            result = results[name]
+            print(
+                f"{name:>22}: median {result['median_us']:10.1f} us  min {result['min_us']:10.1f} us  "
+                f"stddev {result['stddev_us']:8.1f} us  {result['ops']:10.0f} ops/s  "
+                f"({result['rounds']} x {result['iterations']})"
+            )
+    settings = {"rows": args.rows, "rounds": args.rounds}
+    return baseline.finish(results, args, settings)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
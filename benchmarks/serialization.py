@@ -0,0 +1,114 @@
+"""Serialization benchmark: ``ExpenseOut`` rows with Decimal vs. float amounts.
+
+Runs the steps FastAPI takes for a ``response_model`` on ORM rows: validate
+them into the schema, dump in JSON mode and encode like ``JSONResponse``.
+The float schemas are copies of the previous ``ExpenseOut`` / ``BudgetOut`` /
+``CategoryOut``; the rows are transient ORM objects, so no database is used.
+
+Usage::
+
+    python -m benchmarks.serialization --rows 100000 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import time
+from decimal import Decimal
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+
+
+class FloatCategoryOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+    spent: float
+
+
+class FloatBudgetOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+    amount: float
+    spent: float
+    remaining: float
+
+
+class FloatExpenseOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+    amount: float
+    category: Optional[FloatCategoryOut]
+    budget: Optional[FloatBudgetOut]
+
+
+def _rows(count: int) -> list:
+    from src.app.models.expense import Budget, Category, Expense
+
+    categories = [Category(id=i, name=f"category-{i}", spent=Decimal("1234.50")) for i in range(10)]
+    budgets = [
+        Budget(id=i, name=f"budget-{i}", amount=Decimal("100000.00"), spent=Decimal("1234.50"))
+        for i in range(5)
+    ]
+    return [
+        Expense(
+            id=i,
+            name=f"expense-{i}",
+            amount=Decimal(i % 50_000) / 100,
+            category=categories[i % 10],
+            budget=budgets[i % 5],
+        )
+        for i in range(count)
+    ]
+
+
+def _measure(model, rows: list, repeat: int) -> dict:
+    adapter = TypeAdapter(list[model])
+    best = {"validate": float("inf"), "dump": float("inf"), "encode": float("inf")}
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        items = adapter.validate_python(rows, from_attributes=True)
+        validated = time.perf_counter()
+        data = adapter.dump_python(items, mode="json")
+        dumped = time.perf_counter()
+        body = json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+        encoded = time.perf_counter()
+        best["validate"] = min(best["validate"], validated - started)
+        best["dump"] = min(best["dump"], dumped - validated)
+        best["encode"] = min(best["encode"], encoded - dumped)
+    return {**best, "total": sum(best.values()), "bytes": len(body.encode())}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from src.app.schema.expense import ExpenseOut
+
+    rows = _rows(args.rows)
+    results = {
+        "float": _measure(FloatExpenseOut, rows, args.repeat),
+        "decimal": _measure(ExpenseOut, rows, args.repeat),
+    }
+    for label, result in results.items():
+        print(
+            f"{label:>8}: validate {result['validate'] * 1000:7.1f} ms  dump {result['dump'] * 1000:7.1f} ms  "
+            f"encode {result['encode'] * 1000:7.1f} ms  total {result['total'] * 1000:7.1f} ms  "
+            f"({result['bytes'] / 1024 / 1024:.1f} MiB)"
+        )
+    print(f"decimal / float: {results['decimal']['total'] / results['float']['total']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Time series report benchmark: a year of expenses bucketed in SQL.
+
+Seeds ``--rows`` expenses spread over the last year, then times
+``get_spend_timeseries`` (the query behind ``GET /api/v1/reports/timeseries``,
+without the report cache) for every bucket size, overall and per category,
+over the whole year and over its last month. Then builds the monthly spend
+rollups and times the monthly series over whole months from the expenses
+and from the rollups.
+
+Usage::
+
+    python -m benchmarks.timeseries --rows 1000000 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from benchmarks.common import seed_expenses
+    from src.app.database.expense import SessionLocal, engine
+    from src.app.database.partitions import add_months, month_start
+    from src.app.services import rollup_services
+    from src.app.services.report_services import TIME_BUCKETS, get_spend_timeseries
+
+    seed_expenses(args.rows)
+    if engine.dialect.name == "postgresql":
+        # Statistics, and the visibility map that index-only scans rely on.
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.exec_driver_sql("VACUUM ANALYZE expenses")
+
+    now = datetime.now(timezone.utc)
+    ranges = {"year": now - timedelta(days=366), "month": now - timedelta(days=30)}
+    print(f"{args.rows} expenses over the last year ({engine.dialect.name})")
+    with SessionLocal() as db:
+        for range_name, start in ranges.items():
+            for bucket in TIME_BUCKETS:
+                for group_by in (None, "category"):
+                    timings = []
+                    for _ in range(args.repeat):
+                        started = time.perf_counter()
+                        series = get_spend_timeseries(db, bucket, group_by, start=start, end=now)
+                        timings.append(time.perf_counter() - started)
+                    print(
+                        f"{range_name:>5} by {bucket:<5} {group_by or 'overall':<8}: "
+                        f"best {min(timings) * 1000:8.1f} ms  ({len(series['points'])} points)"
+                    )
+
+        started = time.perf_counter()
+        rebuilt = rollup_services.refresh_rollups(db)
+        print(f"built rollups of {len(rebuilt)} months in {(time.perf_counter() - started) * 1000:.0f} ms")
+        this_month = month_start(now)
+        start = datetime(*add_months(this_month, -12).timetuple()[:3], tzinfo=timezone.utc)
+        end = datetime(*add_months(this_month, 1).timetuple()[:3], tzinfo=timezone.utc)
+        for source, enabled in (("expenses", False), ("rollups", True)):
+            rollup_services.ROLLUP_REPORTS = enabled
+            for group_by in (None, "category"):
+                timings = []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    series = get_spend_timeseries(db, "month", group_by, start=start, end=end)
+                    timings.append(time.perf_counter() - started)
+                print(
+                    f"13 months by month {group_by or 'overall':<8} from {source:<8}: "
+                    f"best {min(timings) * 1000:8.1f} ms  ({len(series['points'])} points)"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+"""Shared cache for read-mostly API responses.
+
+Values are stored in a pluggable backend chosen by ``CACHE_URL``:
+
+* ``memory://`` (default): a TTL + LRU store inside the process. Fine for a
+  single worker; with several workers, another worker's write is only picked
+  up after the TTL.
+* ``redis://``, ``rediss://`` or ``unix://``: any server speaking the Redis
+  protocol, shared by every worker and host. Requires the ``redis`` package.
+
+Each :class:`CacheNamespace` (categories, budgets, expenses, reports) has a
+version token under ``<prefix><namespace>:version`` and stores its entries
+under ``<prefix><namespace>:entry:<key>`` together with the version they were
+loaded under. A lookup reads the token and the entry in one round trip and
+only uses entries of the current version. Invalidating a namespace replaces
+its token, so all workers stop reading the old entries at once; those are
+overwritten or age out through their TTL.
+
+With a Redis backend the round trips run in a thread whenever the caller is
+on the event loop (coroutines, and service code in async database mode).
+
+Writers call :func:`invalidate_on_commit`; the namespace is invalidated once
+the session commits. Invalidating after the commit is not enough by itself: a
+reader whose ``SELECT`` ran before the commit still stores the pre-write row
+afterwards. :meth:`CacheNamespace.get_or_load` therefore resolves the version
+before loading and stores the row with that version, so it belongs to the
+invalidated version and is never read.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+
+from src.app.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+CACHE_URL = os.getenv("CACHE_URL", "memory://")
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "expense-tracker:")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "4096"))
+REFERENCE_CACHE_TTL = float(os.getenv("REFERENCE_CACHE_TTL", "60"))
+EXPENSE_CACHE_TTL = float(os.getenv("EXPENSE_CACHE_TTL", "60"))
+REPORT_CACHE_TTL = float(os.getenv("REPORT_CACHE_TTL", "30"))
+# How long a report computation may hold its lock before others recompute.
+CACHE_LOCK_TIMEOUT = float(os.getenv("CACHE_LOCK_TIMEOUT", "10"))
+CACHE_LOCK_POLL_INTERVAL = 0.05
+
+_MISSING = object()
+_PENDING_KEY = "pending_cache_invalidations"
+
+
+class MemoryBackend:
+    """Thread-safe TTL + LRU store for a single process."""
+
+    blocking = False  # no I/O: called directly, even on the event loop
+
+    def __init__(self, maxsize: int = CACHE_MAX_ENTRIES, clock=time.monotonic):
+        self.maxsize = maxsize
+        self._clock = clock
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _live(self, key):
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= self._clock():
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key, value, ttl):
+        expires_at = None if ttl is None else self._clock() + ttl
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key):
+        with self._lock:
+            value = self._live(key)
+        return None if value is _MISSING else value
+
+    def get_many(self, keys) -> list:
+        with self._lock:
+            values = [self._live(key) for key in keys]
+        return [None if value is _MISSING else value for value in values]
+
+    def set(self, key, value, ttl: float | None = None) -> None:
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def add(self, key, value, ttl: float | None = None) -> bool:
+        """Store ``value`` only if ``key`` is absent; return whether it was stored."""
+        with self._lock:
+            if self._live(key) is not _MISSING:
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisBackend:
+    """Redis-protocol store; values are JSON encoded.
+
+    Connection errors are logged and treated as misses so that an unavailable
+    cache degrades to database reads instead of failing requests.
+    """
+
+    blocking = True  # network round trips: kept off the event loop
+
+    def __init__(self, url: str | None = None, client=None):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError(
+                "CACHE_URL points at a Redis server but the 'redis' package is not installed"
+            ) from exc
+        self._errors = redis.RedisError
+        self._client = client if client is not None else redis.Redis.from_url(url)
+
+    def _call(self, method, *args, **kwargs):
+        try:
+            return getattr(self._client, method)(*args, **kwargs)
+        except self._errors:
+            logger.warning("Cache %s failed", method, exc_info=True)
+            return None
+
+    @staticmethod
+    def _px(ttl: float | None):
+        return None if ttl is None else max(1, int(ttl * 1000))
+
+    def get(self, key):
+        raw = self._call("get", key)
+        return None if raw is None else json.loads(raw)
+
+    def get_many(self, keys) -> list:
+        raws = self._call("mget", keys) or [None] * len(keys)
+        return [None if raw is None else json.loads(raw) for raw in raws]
+
+    def set(self, key, value, ttl: float | None = None) -> None:
+        self._call("set", key, json.dumps(value), px=self._px(ttl))
+
+    def add(self, key, value, ttl: float | None = None) -> bool:
+        return bool(self._call("set", key, json.dumps(value), px=self._px(ttl), nx=True))
+
+    def delete(self, key) -> None:
+        self._call("delete", key)
+
+
+def create_backend(url: str):
+    """Build the backend described by ``url``."""
+    if url.startswith("memory://"):
+        return MemoryBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported CACHE_URL {url!r}; expected memory:// or redis://")
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = create_backend(CACHE_URL)
+    return _backend
+
+
+def configure_cache(backend) -> None:
+    """Replace the shared backend (e.g. in tests or from application startup)."""
+    global _backend
+    _backend = backend
+
+
+class CacheNamespace:
+    """A group of cached values invalidated together.
+
+    Cached values must be JSON compatible (e.g. ``model_dump(mode="json")``)
+    so that every backend returns them unchanged.
+    """
+
+    def __init__(self, name: str, ttl: float, backend=None):
+        self.name = name
+        self.ttl = ttl
+        self._backend = backend
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def backend(self):
+        return self._backend if self._backend is not None else get_backend()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _version_key(self) -> str:
+        return f"{CACHE_KEY_PREFIX}{self.name}:version"
+
+    def _entry_key(self, key) -> str:
+        if isinstance(key, tuple):
+            key = ":".join(map(str, key))
+        return f"{CACHE_KEY_PREFIX}{self.name}:entry:{key}"
+
+    def _io(self, fn, *args):
+        """Call backend I/O ``fn(*args)`` from sync (service) code.
+
+        In async mode service code runs on the event loop, inside SQLAlchemy's
+        greenlet; a network backend is then waited for in a thread so that the
+        loop keeps serving other requests. In sync mode the database blocks
+        the caller anyway and so does the cache.
+        """
+        if self.backend.blocking and in_greenlet():
+            return await_only(asyncio.to_thread(fn, *args))
+        return fn(*args)
+
+    async def _aio(self, fn, *args):
+        """Await backend I/O ``fn(*args)`` from a coroutine."""
+        if self.backend.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    def _resolve(self, key):
+        """Return ``(entry_key, version, value)``, ``value`` being ``None`` on a miss.
+
+        Entries carry the version they were stored under, so the version and
+        the entry are read together: one round trip on Redis (``MGET``).
+        """
+        entry_key = self._entry_key(key)
+        version_key = self._version_key()
+        version, entry = self.backend.get_many([version_key, entry_key])
+        if version is None:
+            # Random tokens rather than a counter: a lost version key can never
+            # bring entries of an older version back.
+            self.backend.add(version_key, uuid.uuid4().hex)
+            version = self.backend.get(version_key)
+        if not isinstance(entry, dict) or entry.get("version") != version:
+            return entry_key, version, None
+        return entry_key, version, entry["value"]
+
+    def _store(self, entry_key: str, version, value) -> None:
+        self.backend.set(entry_key, {"version": version, "value": value}, self.ttl)
+
+    def _count(self, value, default):
+        if value is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def get(self, key, default=None):
+        """Return the cached value for ``key``, or ``default`` on a miss."""
+        value = self._io(self._resolve, key)[2] if self.enabled else None
+        return self._count(value, default)
+
+    def set(self, key, value) -> None:
+        """Store ``value`` under the current version.
+
+        Only for values read after the last write; loaders go through
+        :meth:`get_or_load`, which stores under the version they started from.
+        """
+        if self.enabled:
+            entry_key, version, _ = self._io(self._resolve, key)
+            self._io(self._store, entry_key, version, value)
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for ``key``, calling ``loader()`` on a miss.
+
+        The version is resolved before ``loader()`` runs and the value is
+        stored with it: if the namespace is invalidated meanwhile, the
+        possibly stale value belongs to the old version and is never read.
+        """
+        if not self.enabled:
+            self.misses += 1
+            return loader()
+        entry_key, version, value = self._io(self._resolve, key)
+        value = self._count(value, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            self._io(self._store, entry_key, version, value)
+        return value
+
+    async def get_or_compute(self, key, compute):
+        """Like :meth:`get_or_load` for expensive async ``compute()`` calls.
+
+        Only one caller per key computes a missing value: concurrent callers in
+        this process await the same result (or error), and other processes wait
+        on a lock in the backend and read the value it produced.
+        """
+        if not self.enabled:
+            self.misses += 1
+            return await compute()
+        entry_key, version, value = await self._aio(self._resolve, key)
+        value = self._count(value, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        flight_key = f"{entry_key}:{version}"
+        inflight = self._inflight.get(flight_key)
+        while inflight is not None:
+            await asyncio.wait({inflight})
+            if not inflight.cancelled():
+                return inflight.result()  # its value, or the error it failed with
+            # The computing request went away: wait for the one taking over, or take over.
+            inflight = self._inflight.get(flight_key)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[flight_key] = future
+        try:
+            value = await self._compute_locked(entry_key, version, compute)
+        except Exception as exc:
+            # Waiters fail with the same error instead of all retrying at once.
+            future.set_exception(exc)
+            future.exception()  # retrieved: it is fine if nobody was waiting
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            if self._inflight.get(flight_key) is future:
+                del self._inflight[flight_key]
+        future.set_result(value)
+        return value
+
+    async def _compute_locked(self, entry_key: str, version, compute):
+        lock_key = f"{entry_key}:{version}:lock"
+        deadline = time.monotonic() + CACHE_LOCK_TIMEOUT
+        acquired = await self._aio(self.backend.add, lock_key, 1, CACHE_LOCK_TIMEOUT)
+        while not acquired and time.monotonic() < deadline:
+            await asyncio.sleep(CACHE_LOCK_POLL_INTERVAL)
+            entry = await self._aio(self.backend.get, entry_key)
+            if isinstance(entry, dict) and entry.get("version") == version:
+                return entry["value"]
+            acquired = await self._aio(self.backend.add, lock_key, 1, CACHE_LOCK_TIMEOUT)
+        try:
+            value = await compute()
+            await self._aio(self._store, entry_key, version, value)
+            return value
+        finally:
+            if acquired:
+                await self._aio(self.backend.delete, lock_key)
+
+    def invalidate(self) -> None:
+        """Drop every entry of the namespace, in all workers."""
+        self._io(self.backend.set, self._version_key(), uuid.uuid4().hex)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "ttl": self.ttl}
+
+
+category_cache = CacheNamespace("categories", REFERENCE_CACHE_TTL)
+budget_cache = CacheNamespace("budgets", REFERENCE_CACHE_TTL)
+expense_cache = CacheNamespace("expenses", EXPENSE_CACHE_TTL)
+report_cache = CacheNamespace("reports", REPORT_CACHE_TTL)
+CACHE_NAMESPACES = (category_cache, budget_cache, expense_cache, report_cache)
+
+REGISTRY.collector(
+    "cache_lookups_total", "Cache lookups by namespace and result", ("namespace", "result"), kind="counter"
+).add_callback(
+    lambda: [
+        sample
+        for namespace in CACHE_NAMESPACES
+        for sample in (((namespace.name, "hit"), namespace.hits), ((namespace.name, "miss"), namespace.misses))
+    ]
+)
+
+
+def invalidate_on_commit(db: Session, *namespaces: CacheNamespace) -> None:
+    """Invalidate ``namespaces`` once ``db`` commits its current transaction."""
+    db.info.setdefault(_PENDING_KEY, set()).update(namespaces)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_pending(session):
+    for namespace in session.info.pop(_PENDING_KEY, ()):
+        namespace.invalidate()
@@ -0,0 +1,38 @@
+"""Create the monthly expense partitions ahead of time (Postgres only).
+
+The app already does this at startup and daily; run this from cron when
+the app may be down across a month boundary, or to pre-create a range.
+
+Usage::
+
+    python -m src.app.commands.create_partitions                  # this month + PARTITION_MONTHS_AHEAD
+    python -m src.app.commands.create_partitions --months-ahead 12
+"""
+
+import argparse
+import sys
+
+from src.app.database.expense import engine
+from src.app.database.partitions import PARTITION_MONTHS_AHEAD, ensure_upcoming_partitions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--months-ahead",
+        type=int,
+        default=PARTITION_MONTHS_AHEAD,
+        help=f"months after the current one to cover (default {PARTITION_MONTHS_AHEAD})",
+    )
+    args = parser.parse_args(argv)
+
+    if engine.dialect.name != "postgresql":
+        print("Expenses are only partitioned on Postgres; nothing to do.")
+        return 0
+    created = ensure_upcoming_partitions(engine, args.months_ahead)
+    print(f"Created {', '.join(created)}." if created else "All partitions already exist.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""Recompute budget/category spent totals and report drift.
+
+Usage::
+
+    python -m src.app.commands.reconcile_totals          # report only
+    python -m src.app.commands.reconcile_totals --fix    # also correct drifted totals
+
+Exits with status 1 when drift is found and not fixed.
+"""
+
+import argparse
+import sys
+
+from src.app.database.expense import SessionLocal
+from src.app.services.totals_services import reconcile_spent_totals
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fix", action="store_true", help="overwrite drifted totals")
+    args = parser.parse_args(argv)
+
+    with SessionLocal() as db:
+        report = reconcile_spent_totals(db, fix=args.fix)
+
+    drifted = 0
+    for table, rows in report.items():
+        for row in rows:
+            drifted += 1
+            print(
+                f"{table} id={row['id']}: recorded {row['recorded']} "
+                f"actual {row['actual']} (drift {row['recorded'] - row['actual']})"
+            )
+    if not drifted:
+        print("No drift: running totals match the expenses.")
+    elif args.fix:
+        print(f"Fixed {drifted} drifted total(s).")
+    return 1 if drifted and not args.fix else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
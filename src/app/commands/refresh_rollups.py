@@ -0,0 +1,53 @@
+"""Rebuild the monthly spend rollups from the expenses.
+
+Usage::
+
+    python -m src.app.commands.refresh_rollups                     # build months never built
+    python -m src.app.commands.refresh_rollups --period 2025-03    # rebuild given months (repeatable)
+    python -m src.app.commands.refresh_rollups --check             # report drift only
+
+``--check`` exits with status 1 when a built month's rollups differ from
+the expenses.
+"""
+
+import argparse
+import sys
+from datetime import date
+
+from src.app.database.expense import SessionLocal
+from src.app.services.rollup_services import refresh_rollups, rollup_drift
+
+
+def _month(value: str) -> date:
+    try:
+        year, month = value.split("-")
+        return date(int(year), int(month), 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM, got {value!r}") from None
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--period", type=_month, action="append", help="month to rebuild, as YYYY-MM")
+    parser.add_argument("--check", action="store_true", help="compare the rollups with the expenses")
+    args = parser.parse_args(argv)
+
+    with SessionLocal() as db:
+        if args.check:
+            drift = rollup_drift(db)
+            for row in drift:
+                print(
+                    f"{row['period']:%Y-%m} category={row['category_id']} budget={row['budget_id']}: "
+                    f"recorded {row['recorded']} actual {row['actual']}"
+                )
+            if not drift:
+                print("No drift: rollups match the expenses.")
+            return 1 if drift else 0
+        rebuilt = refresh_rollups(db, periods=args.period)
+
+    print(f"Rebuilt {', '.join(f'{month:%Y-%m}' for month in rebuilt)}." if rebuilt else "All months are built.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
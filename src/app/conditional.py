@@ -0,0 +1,97 @@
+"""HTTP conditional requests (ETag / If-None-Match, Last-Modified).
+
+Read routes declare the tables their payload depends on with
+``dependencies=[conditional_get(Expense, ...)]``. The validators come from the
+``table_versions`` counters, so a client polling an unchanged resource gets
+``304 Not Modified`` after one primary-key range read of those counters,
+without the rows being queried or serialized.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy.orm import Session
+
+from src.app.database.expense import get_db, run_in_session
+from src.app.security.auth import get_current_user
+from src.app.services import version_services
+
+NOT_MODIFIED_RESPONSE = {
+    status.HTTP_304_NOT_MODIFIED: {"description": "Not modified since the ETag or date the client sent"}
+}
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass(frozen=True)
+class Validators:
+    etag: str
+    last_modified: datetime | None
+
+    @classmethod
+    def from_versions(cls, rows) -> "Validators":
+        parts = []
+        last_modified = None
+        for _, version, updated_at in rows:
+            if updated_at.tzinfo is None:
+                # SQLite hands back naive datetimes; they are stored as UTC.
+                updated_at = updated_at.replace(tzinfo=timezone.utc)
+            # The timestamp keeps tags unique across recreated databases.
+            parts.append(f"{version}-{int(updated_at.timestamp() * 1_000_000)}")
+            last_modified = max(last_modified or updated_at, updated_at)
+        if last_modified is not None and last_modified.replace(microsecond=0) >= _utcnow().replace(microsecond=0):
+            # HTTP dates have one-second resolution: a later write in this same
+            # second would look unchanged. Leave Last-Modified out and do not
+            # honor If-Modified-Since until the second is over (RFC 9110 8.8.2.2).
+            last_modified = None
+        return cls(etag='"' + ".".join(parts) + '"', last_modified=last_modified)
+
+    def headers(self) -> dict[str, str]:
+        # private: responses require authentication; no-cache: always revalidate.
+        headers = {"ETag": self.etag, "Cache-Control": "private, no-cache"}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified.astimezone(timezone.utc), usegmt=True)
+        return headers
+
+    def matches(self, request: Request) -> bool:
+        """Whether the client's cached copy is still current (RFC 9110 13.2.2)."""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return "*" in tags or self.etag in tags
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is None or self.last_modified is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return self.last_modified.replace(microsecond=0) <= since
+
+
+def conditional_get(*models):
+    """Route dependency answering 304 while the tables of ``models`` are unchanged."""
+    tables = tuple(sorted(model.__tablename__ for model in models))
+
+    async def check(
+        request: Request,
+        response: Response,
+        current_user: dict = Depends(get_current_user),
+        db: Session = Depends(get_db),
+    ):
+        # Read before the payload: a write landing in between yields an older
+        # tag for a newer body, which only costs the client one more download.
+        rows = await run_in_session(db, version_services.get_table_versions, tables=tables)
+        validators = Validators.from_versions(rows)
+        if validators.matches(request):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=validators.headers())
+        response.headers.update(validators.headers())
+
+    return Depends(check)
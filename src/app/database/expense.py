@@ -44,6 +44,8 @@
 # Base = declarative_base()
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
 from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
@@ -51,6 +53,9 @@ import os
 
 load_dotenv()
 
+# Imported after load_dotenv(): the pool settings are read from the environment.
+from src.app.database.pool import engine_options, instrument_engine, is_memory_sqlite  # noqa: E402
+
 def _ensure_sslmode(url: str) -> str:
     """
     Append sslmode=require to the Postgres URL if it's missing.
@@ -124,15 +129,125 @@ if os.getenv("RENDER") == "true" and ("@localhost:" in DATABASE_URL or "@127.0.0
         "DATABASE_URL points to localhost on Render. Use the Postgres service URL from the Render dashboard."
     )
 
+# Sync driver -> async driver used when DATABASE_ASYNC=1 (or an async URL is given).
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgresql+psycopg": "postgresql+psycopg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+_SYNC_DRIVERS = {
+    "postgresql+asyncpg": "postgresql",
+    "sqlite+aiosqlite": "sqlite",
+}
+
+
+def _is_async_url(url: str) -> bool:
+    return make_url(url).drivername in _SYNC_DRIVERS
+
+
+def _to_sync_url(url: str) -> str:
+    """Return the sync (psycopg2/pysqlite) flavour of ``url``."""
+    parsed = make_url(url)
+    if parsed.drivername not in _SYNC_DRIVERS:
+        return url
+    query = dict(parsed.query)
+    if "ssl" in query and "sslmode" not in query:
+        query["sslmode"] = query.pop("ssl")
+    parsed = parsed.set(drivername=_SYNC_DRIVERS[parsed.drivername], query=query)
+    return parsed.render_as_string(hide_password=False)
+
+
+def _to_async_url(url: str) -> str:
+    """
+    Return the async (asyncpg/aiosqlite) flavour of ``url``.
+    asyncpg spells libpq's ``sslmode`` as ``ssl``.
+    """
+    parsed = make_url(url)
+    if parsed.drivername not in _ASYNC_DRIVERS:
+        return url
+    drivername = _ASYNC_DRIVERS[parsed.drivername]
+    query = dict(parsed.query)
+    if drivername == "postgresql+asyncpg" and "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    parsed = parsed.set(drivername=drivername, query=query)
+    return parsed.render_as_string(hide_password=False)
+
+
 # 3) Create engine + session factory
 SQLALCHEMY_ECHO = os.getenv("SQLALCHEMY_ECHO", "0") == "1"
 
+# Async mode serves requests through an AsyncSession so DB waits don't block
+# the event loop. Enabled with DATABASE_ASYNC=1 or an async driver in the URL.
+ASYNC_DATABASE = os.getenv("DATABASE_ASYNC", "0") == "1" or _is_async_url(DATABASE_URL)
+
+# SQLite (a file, or sqlite:// in memory) stands in for Postgres in tests and
+# benchmarks; Postgres-only paths (partitions, advisory locks) check the dialect.
+# Each engine holds its own connection to an in-memory database, so in async
+# mode both open the same shared-cache one instead of two private ones.
+if ASYNC_DATABASE and is_memory_sqlite(DATABASE_URL):
+    DATABASE_URL = "sqlite:///file:expense-tracker?mode=memory&cache=shared&uri=true"
+
+# The sync engine is always available (migrations, scripts, tests).
+# Pool sizing, pre-ping strategy and statement timeout: see database/pool.py.
 engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
+    _to_sync_url(DATABASE_URL),
     echo=SQLALCHEMY_ECHO,
+    **engine_options(_to_sync_url(DATABASE_URL)),
 )
+instrument_engine(engine, "sync")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = (
+    create_async_engine(
+        _to_async_url(DATABASE_URL),
+        echo=SQLALCHEMY_ECHO,
+        **engine_options(_to_async_url(DATABASE_URL), is_async=True),
+    )
+    if ASYNC_DATABASE
+    else None
+)
+if async_engine is not None:
+    instrument_engine(async_engine.sync_engine, "async")
+
+AsyncSessionLocal = (
+    async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    if async_engine is not None
+    else None
+)
+
 Base = declarative_base()
+
+
+async def get_db():
+    """
+    FastAPI dependency yielding a database session.
+
+    Yields an ``AsyncSession`` in async mode and a regular ``Session`` otherwise;
+    route handlers stay agnostic by going through :func:`run_in_session`.
+    """
+    if ASYNC_DATABASE:
+        async with AsyncSessionLocal() as session:
+            yield session
+        return
+
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def run_in_session(db, fn, *args, **kwargs):
+    """
+    Call the synchronous service function ``fn(*args, db=..., **kwargs)``.
+
+    With an ``AsyncSession`` the call goes through ``AsyncSession.run_sync``, so
+    the service code is shared between both modes while every round-trip is
+    awaited on the event loop instead of blocking it.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(lambda session: fn(*args, db=session, **kwargs))
+    return fn(*args, db=db, **kwargs)
@@ -0,0 +1,143 @@
+"""Monthly range partitions of ``expenses`` on Postgres.
+
+On Postgres ``expenses`` is partitioned by ``RANGE (spent_at)``: one partition
+per calendar month in UTC (``expenses_y2025m01`` holds January 2025) plus
+``expenses_default`` for rows outside of them. Queries filtering on
+``spent_at`` (the list's ``spent_from`` / ``spent_to``, the time series report)
+only read the partitions their range overlaps, and old months can be detached
+or dropped as a whole instead of being deleted and vacuumed row by row.
+
+Partitions for the current month and the next ``PARTITION_MONTHS_AHEAD`` are
+created when the tables are created, at startup and then every
+``PARTITION_CHECK_INTERVAL`` seconds by the app, and on demand with
+``python -m src.app.commands.create_partitions``. Creating a month moves its
+rows out of the default partition first, so late partitions stay correct.
+
+SQLite has no partitioning and keeps a plain table; everything here is then a
+no-op.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+PARTITION_CHECK_INTERVAL = float(os.getenv("PARTITION_CHECK_INTERVAL", "86400"))
+
+PARTITIONED_TABLE = "expenses"
+DEFAULT_PARTITION = "expenses_default"
+
+# pg_advisory_xact_lock key: app workers starting together create each month once.
+_LOCK_KEY = 0x65787073
+
+
+def month_start(value: date) -> date:
+    """First day of the month of ``value``."""
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    """First day of the month ``count`` months after (or before) ``month``."""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARTITIONED_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def is_partitioned(connection) -> bool:
+    """Whether ``expenses`` is a partitioned table on this connection."""
+    if connection.dialect.name != "postgresql":
+        return False
+    return (
+        connection.execute(
+            text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"),
+            {"table": PARTITIONED_TABLE},
+        ).first()
+        is not None
+    )
+
+
+def existing_partitions(connection) -> set[str]:
+    return set(
+        connection.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE pg_inherits.inhparent = to_regclass(:table)"
+            ),
+            {"table": PARTITIONED_TABLE},
+        ).scalars()
+    )
+
+
+def ensure_expense_partitions(connection, first: date, last: date) -> list[str]:
+    """Create the missing monthly partitions from ``first`` to ``last`` (inclusive).
+
+    Runs in the caller's transaction and returns the names of the partitions
+    it created. Does nothing unless ``expenses`` is partitioned.
+    """
+    if not is_partitioned(connection):
+        return []
+    connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _LOCK_KEY})
+    existing = existing_partitions(connection)
+    if DEFAULT_PARTITION not in existing:
+        connection.exec_driver_sql(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {PARTITIONED_TABLE} DEFAULT")
+
+    created = []
+    month = month_start(first)
+    while month <= last:
+        name = partition_name(month)
+        if name not in existing:
+            _create_partition(connection, name, month, add_months(month, 1))
+            created.append(name)
+        month = add_months(month, 1)
+    return created
+
+
+def _create_partition(connection, name: str, start: date, end: date) -> None:
+    # Bounds are UTC instants, whatever the session's TimeZone.
+    lower, upper = f"'{start.isoformat()} 00:00:00+00'", f"'{end.isoformat()} 00:00:00+00'"
+    connection.exec_driver_sql(
+        f"CREATE TABLE {name} (LIKE {PARTITIONED_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+    # Attaching fails while the default partition holds rows of the new range.
+    connection.exec_driver_sql(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+        f"WHERE spent_at >= {lower} AND spent_at < {upper} RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    )
+    # Indexes and foreign keys of the parent are created on the partition here.
+    connection.exec_driver_sql(
+        f"ALTER TABLE {PARTITIONED_TABLE} ATTACH PARTITION {name} FOR VALUES FROM ({lower}) TO ({upper})"
+    )
+
+
+def ensure_upcoming_partitions(engine, months_ahead: int = PARTITION_MONTHS_AHEAD, today: date | None = None) -> list[str]:
+    """Create the partitions of this month and the next ``months_ahead``."""
+    if engine.dialect.name != "postgresql":
+        return []
+    this_month = month_start(today or datetime.now(timezone.utc).date())
+    with engine.begin() as connection:
+        return ensure_expense_partitions(connection, this_month, add_months(this_month, months_ahead))
+
+
+async def maintain_partitions(engine, interval: float = PARTITION_CHECK_INTERVAL) -> None:
+    """Keep the upcoming partitions created for as long as the app runs."""
+    if engine.dialect.name != "postgresql":
+        return
+    while True:
+        try:
+            created = await asyncio.to_thread(ensure_upcoming_partitions, engine)
+        except Exception:
+            logger.warning("Creating expense partitions failed", exc_info=True)
+        else:
+            if created:
+                logger.info("Created expense partitions %s", ", ".join(created))
+        await asyncio.sleep(interval)
@@ -0,0 +1,159 @@
+"""Connection pool settings and instrumentation.
+
+Pool sizing comes from the environment so that it can be matched against
+Postgres ``max_connections``: every worker process may open up to
+``DB_POOL_SIZE + DB_MAX_OVERFLOW`` connections per engine it uses.
+
+``DB_POOL_PRE_PING`` chooses how connections are checked on checkout:
+
+* ``always`` (default): a ping round-trip before every checkout.
+* ``idle``: ping only connections idle for more than ``DB_POOL_PRE_PING_IDLE``
+  seconds, the ones a server or proxy may have dropped meanwhile.
+* ``never``: rely on ``DB_POOL_RECYCLE`` and on SQLAlchemy invalidating the
+  pool when a query hits a dropped connection.
+"""
+
+import os
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DisconnectionError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
+
+from src.app.metrics import REGISTRY
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "always")
+DB_POOL_PRE_PING_IDLE = float(os.getenv("DB_POOL_PRE_PING_IDLE", "30"))
+# Server-side cap per statement in milliseconds (Postgres only); 0 disables.
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+PRE_PING_STRATEGIES = {"always", "idle", "never"}
+if DB_POOL_PRE_PING not in PRE_PING_STRATEGIES:
+    raise ValueError(
+        f"DB_POOL_PRE_PING must be one of {sorted(PRE_PING_STRATEGIES)}, got {DB_POOL_PRE_PING!r}"
+    )
+
+POOL_WAIT = REGISTRY.histogram(
+    "db_pool_wait_seconds", "Time spent waiting to check a connection out of the pool", ("engine",)
+)
+POOL_OVERFLOW = REGISTRY.counter(
+    "db_pool_overflow_total", "Connections opened beyond the pool size", ("engine",)
+)
+POOL_TIMEOUTS = REGISTRY.counter(
+    "db_pool_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT", ("engine",)
+)
+POOL_INVALIDATIONS = REGISTRY.counter(
+    "db_pool_invalidations_total", "Connections invalidated (disconnects, failed pings)", ("engine", "soft")
+)
+POOL_CHECKED_OUT = REGISTRY.collector(
+    "db_pool_checked_out", "Connections currently checked out", ("engine",)
+)
+POOL_SIZE = REGISTRY.collector("db_pool_size", "Configured pool size", ("engine",))
+POOL_OVERFLOW_IN_USE = REGISTRY.collector(
+    "db_pool_overflow_in_use", "Overflow connections currently open", ("engine",)
+)
+
+
+class _InstrumentedPoolMixin:
+    metrics_label = ""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        # QueuePool counts opened connections in _overflow, starting at -pool_size.
+        overflow = self._overflow
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            POOL_TIMEOUTS.inc(engine=self.metrics_label)
+            raise
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - started, engine=self.metrics_label)
+            if self._overflow > max(overflow, 0):
+                POOL_OVERFLOW.inc(engine=self.metrics_label)
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    metrics_label = "sync"
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    metrics_label = "async"
+
+
+def is_memory_sqlite(url) -> bool:
+    """Whether ``url`` names an in-memory SQLite database (private or shared-cache)."""
+    url = make_url(url)
+    return url.get_backend_name() == "sqlite" and (
+        url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+    )
+
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """Keyword arguments for ``create_engine`` / ``create_async_engine``."""
+    parsed = make_url(url)
+    options = {"pool_pre_ping": DB_POOL_PRE_PING == "always"}
+    if parsed.get_backend_name() == "sqlite":
+        # Sessions move between the event loop and worker threads; SQLite
+        # serializes writers itself.
+        options["connect_args"] = {"check_same_thread": False}
+    if is_memory_sqlite(parsed):
+        # Every connection to an in-memory database gets an empty one of its
+        # own: the whole process shares a single connection instead.
+        options["poolclass"] = StaticPool
+    else:
+        options.update(
+            poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+    if DB_STATEMENT_TIMEOUT_MS and parsed.get_backend_name() == "postgresql":
+        if parsed.get_driver_name() == "asyncpg":
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+def instrument_engine(engine, label: str) -> None:
+    """Attach invalidation counters, pool gauges and the ``idle`` pre-ping."""
+
+    @event.listens_for(engine, "invalidate")
+    def _invalidated(dbapi_connection, record, exception):
+        POOL_INVALIDATIONS.inc(engine=label, soft="false")
+
+    @event.listens_for(engine, "soft_invalidate")
+    def _soft_invalidated(dbapi_connection, record, exception):
+        POOL_INVALIDATIONS.inc(engine=label, soft="true")
+
+    def gauge(read):
+        # engine.pool is looked up per scrape: dispose() replaces the pool.
+        return lambda: [((label,), read(engine.pool))] if isinstance(engine.pool, QueuePool) else []
+
+    POOL_CHECKED_OUT.add_callback(gauge(lambda pool: pool.checkedout()))
+    POOL_SIZE.add_callback(gauge(lambda pool: pool.size()))
+    POOL_OVERFLOW_IN_USE.add_callback(gauge(lambda pool: max(pool.overflow(), 0)))
+
+    if DB_POOL_PRE_PING != "idle":
+        return
+
+    @event.listens_for(engine, "checkin")
+    def _remember_checkin(dbapi_connection, record):
+        record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _ping_if_idle(dbapi_connection, record, proxy):
+        checked_in_at = record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < DB_POOL_PRE_PING_IDLE:
+            return
+        try:
+            engine.dialect.do_ping(dbapi_connection)
+        except Exception as exc:
+            # The pool discards this connection and retries with a fresh one.
+            raise DisconnectionError("idle connection failed its ping") from exc
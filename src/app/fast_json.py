@@ -0,0 +1,47 @@
+"""Opt-in fast path for the JSON list endpoints.
+
+By default FastAPI validates what a list endpoint returns against its
+``response_model`` (``from_attributes`` on every ORM row and nested relation)
+and then encodes the result with ``json.dumps``; for large pages that is most
+of the request's CPU time.
+
+With ``FAST_JSON_RESPONSES=1``, ``get_expenses``, ``get_categories`` and
+``get_budgets`` select only the columns of their response schema and build
+plain dicts already shaped like it (money as exact strings). Those are
+returned as a ready ``Response`` encoded with ``orjson`` (or ``json`` when it
+is not installed), so FastAPI skips validation and serialization. The route
+declarations are untouched, so the OpenAPI schema stays the same; the tests
+check that both paths return the same documents.
+"""
+
+import json
+import os
+
+from fastapi import Response
+
+from src.app.middleware import timed_serialization
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the standard library
+    orjson = None
+
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "0") == "1"
+
+
+def dumps(content) -> bytes:
+    """Encode JSON-compatible ``content`` compactly as UTF-8."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def json_response(content, response: Response) -> Response:
+    """Return ``content`` as JSON, keeping the headers dependencies set on ``response``.
+
+    FastAPI only copies those headers (e.g. ``ETag``) onto responses it builds
+    itself, not onto one returned by the endpoint.
+    """
+    with timed_serialization():
+        body = dumps(content)
+    return Response(body, media_type="application/json", headers=response.headers)
@@ -0,0 +1,182 @@
+"""Group commit for high-rate expense ingestion.
+
+Every ``POST /api/v1/expenses`` normally runs its own transaction, so a busy
+ingestion endpoint spends most of its time waiting for Postgres to flush the
+WAL of one-row commits. With ``EXPENSE_GROUP_COMMIT=1`` the route validates
+the body and hands it to :data:`expense_writer` instead: one background task
+per process collects the queued expenses into micro-batches of up to
+``GROUP_COMMIT_MAX_BATCH`` rows, waiting at most ``GROUP_COMMIT_MAX_DELAY_MS``
+after the first one, writes each batch with the bulk import path (one
+multi-row ``INSERT``, one commit) and resolves every request with the id of
+its row. The response is sent only after that commit, as before.
+
+The queue holds at most ``GROUP_COMMIT_QUEUE_SIZE`` expenses. When it is full
+the request waits up to ``GROUP_COMMIT_ENQUEUE_TIMEOUT`` seconds for room and
+is then answered ``503`` with ``Retry-After``, so the database sets the pace
+instead of the process buffering without bound.
+
+An expense whose category or budget does not exist is rejected on its own
+(``422``); the rest of its batch is written. A failed batch, whatever the
+error, fails each of its requests and the writer goes on with the next one.
+"""
+
+import asyncio
+import logging
+import os
+
+from fastapi import HTTPException, status
+
+from src.app.database.expense import SessionLocal
+from src.app.metrics import REGISTRY
+from src.app.services.expense_services import bulk_create_expenses
+
+logger = logging.getLogger(__name__)
+
+EXPENSE_GROUP_COMMIT = os.getenv("EXPENSE_GROUP_COMMIT", "0") == "1"
+GROUP_COMMIT_MAX_BATCH = int(os.getenv("GROUP_COMMIT_MAX_BATCH", "500"))
+GROUP_COMMIT_MAX_DELAY_MS = float(os.getenv("GROUP_COMMIT_MAX_DELAY_MS", "2"))
+GROUP_COMMIT_QUEUE_SIZE = int(os.getenv("GROUP_COMMIT_QUEUE_SIZE", "10000"))
+GROUP_COMMIT_ENQUEUE_TIMEOUT = float(os.getenv("GROUP_COMMIT_ENQUEUE_TIMEOUT", "1"))
+
+BATCH_SIZE = REGISTRY.histogram(
+    "expense_group_commit_batch_size",
+    "Expenses written per group commit",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+REJECTED = REGISTRY.counter(
+    "expense_group_commit_rejected_total", "Expenses turned away because the ingestion queue was full"
+)
+QUEUE_DEPTH = REGISTRY.collector("expense_group_commit_queue_depth", "Expenses waiting for a group commit")
+
+
+class GroupCommitWriter:
+    """Queue of validated expenses written in batches by a background task.
+
+    Args:
+        session_factory: Callable returning a sync ``Session``; each batch
+            runs in a worker thread with a session of its own.
+        max_batch (int): Most expenses per transaction.
+        max_delay (float): Seconds a batch waits for more expenses after its first.
+        queue_size (int): Most expenses waiting at once.
+        enqueue_timeout (float): Seconds a request waits for room in a full queue.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        max_batch: int = GROUP_COMMIT_MAX_BATCH,
+        max_delay: float = GROUP_COMMIT_MAX_DELAY_MS / 1000,
+        queue_size: int = GROUP_COMMIT_QUEUE_SIZE,
+        enqueue_timeout: float = GROUP_COMMIT_ENQUEUE_TIMEOUT,
+    ):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.queue_size = queue_size
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._loop = None
+        self.batches = 0
+
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self) -> None:
+        """Start the writer on the running event loop (again, if it moved loops)."""
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task = loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Write what is already queued, then stop the background task."""
+        if self._task is None or self._task.done():
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def submit(self, values: dict) -> int:
+        """Queue one expense's column values; return its id once committed.
+
+        Raises:
+            HTTPException: 503 when the queue stayed full, 422 for a missing
+                category or budget.
+        """
+        self.start()
+        future = self._loop.create_future()
+        try:
+            await asyncio.wait_for(self._queue.put((values, future)), self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            REJECTED.inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many expenses waiting to be written; retry shortly",
+                headers={"Retry-After": "1"},
+            ) from None
+        return await future
+
+    async def _next_batch(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_delay
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _write(self, rows: list[dict]):
+        with self.session_factory() as db:
+            return bulk_create_expenses(list(enumerate(rows)), db)
+
+    async def _commit(self, batch: list) -> None:
+        # Expenses of requests that went away meanwhile are written all the same.
+        created, errors = await asyncio.to_thread(self._write, [values for values, _ in batch])
+        self.batches += 1
+        BATCH_SIZE.observe(len(batch))
+        for row in created:
+            future = batch[row["index"]][1]
+            if not future.done():
+                future.set_result(row["id"])
+        for row in errors:
+            future = batch[row["index"]][1]
+            if not future.done():
+                future.set_exception(
+                    HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=row["errors"])
+                )
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            failure = None
+            try:
+                await self._commit(batch)
+            except Exception as exc:
+                # The batch fails; the writer goes on with the next one.
+                logger.warning("Group commit of %d expenses failed", len(batch), exc_info=True)
+                failure = exc
+            finally:
+                # Every request of the batch is answered, whatever went wrong.
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(failure or RuntimeError("Group commit returned no result for the expense"))
+                for _ in batch:
+                    self._queue.task_done()
+
+expense_writer = GroupCommitWriter(SessionLocal)
+QUEUE_DEPTH.add_callback(lambda: [((), expense_writer.depth())])
@@ -0,0 +1,253 @@
+"""Request metrics and SQL profiling: per-route latency, size and database work.
+
+:class:`MetricsMiddleware` is a plain ASGI middleware (no ``BaseHTTPMiddleware``
+task or body buffering), labelled with the route ``name=`` of the matched
+endpoint, so cardinality stays bounded by the number of routes. The queries a
+request runs are profiled through engine events into a per-request
+:class:`RequestProfile` kept in a context variable, which also follows the
+work into ``run_sync`` greenlets and threadpool-iterated streaming bodies.
+
+Statements slower than ``SLOW_QUERY_MS`` are logged with their route, time,
+row count and parameters redacted to their types. ``SERVER_TIMING=1`` adds a
+``Server-Timing`` header (database and serialization time) that browser
+devtools show per request; serialization is what happens between the endpoint
+returning (see :class:`ProfiledRoute`) and the headers going out, plus the
+fast JSON path's encoding.
+"""
+
+import functools
+import inspect
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+
+from src.app.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+# Statements taking at least this many milliseconds are logged; 0 disables.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0") == "1"
+# Longer statements (e.g. multi-row inserts) are cut in the slow-query log.
+SLOW_QUERY_MAX_CHARS = 2000
+
+REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route, method and status", ("route", "method", "status")
+)
+REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds", "Time until the last body byte was sent", ("route", "method")
+)
+IN_FLIGHT = REGISTRY.gauge("http_requests_in_flight", "Requests currently being served")
+RESPONSE_SIZE = REGISTRY.histogram(
+    "http_response_size_bytes",
+    "Response body size",
+    ("route",),
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216),
+)
+REQUEST_QUERIES = REGISTRY.histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request",
+    ("route",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+REQUEST_DB_SECONDS = REGISTRY.histogram(
+    "http_request_db_seconds", "Time spent executing SQL per request", ("route",)
+)
+
+class RequestProfile:
+    """Database and serialization work of the request being served."""
+
+    __slots__ = ("scope", "queries", "db_seconds", "rows", "serialize_seconds", "endpoint_returned")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.queries = 0
+        self.db_seconds = 0.0
+        # Rows the driver reported: affected by writes, returned by reads
+        # where it knows (psycopg2 does, SQLite does not).
+        self.rows = 0
+        self.serialize_seconds = 0.0
+        self.endpoint_returned = None
+
+    @property
+    def route(self) -> str:
+        # The router stores the matched route in the shared scope.
+        return getattr(self.scope.get("route"), "name", None) or "unmatched"
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.db_seconds * 1000:.2f};desc="{self.queries} queries, {self.rows} rows", '
+            f"serialize;dur={self.serialize_seconds * 1000:.2f}"
+        )
+
+
+_request_profile: ContextVar[RequestProfile | None] = ContextVar("request_profile", default=None)
+
+
+def _redact(value):
+    if isinstance(value, dict):
+        return {key: _redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_redact(item) for item in value]
+    return None if value is None else f"<{type(value).__name__}>"
+
+
+def redact_parameters(parameters, executemany: bool = False):
+    """Statement parameters with every value replaced by its type name.
+
+    ``executemany`` parameter lists are summarised by their first set.
+    """
+    if executemany and parameters:
+        return {"sets": len(parameters), "first": _redact(parameters[0])}
+    return _redact(parameters)
+
+
+def _log_slow_query(profile, statement, parameters, executemany, seconds, rows) -> None:
+    statement = " ".join(statement.split())
+    if len(statement) > SLOW_QUERY_MAX_CHARS:
+        statement = statement[:SLOW_QUERY_MAX_CHARS] + "..."
+    logger.warning(
+        "Slow query in %s: %.1f ms, %s rows: %s; parameters %s",
+        profile.route if profile is not None else "no request",
+        seconds * 1000,
+        rows if rows >= 0 else "?",
+        statement,
+        redact_parameters(parameters, executemany),
+    )
+
+
+def track_queries(engine) -> None:
+    """Attribute the statements run on ``engine`` to the current request and log slow ones."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - context._metrics_started
+        rows = cursor.rowcount if cursor.rowcount is not None else -1
+        profile = _request_profile.get()
+        if profile is not None:
+            profile.queries += 1
+            profile.db_seconds += seconds
+            if rows > 0:
+                profile.rows += rows
+        if SLOW_QUERY_MS and seconds * 1000 >= SLOW_QUERY_MS:
+            _log_slow_query(profile, statement, parameters, executemany, seconds, rows)
+
+
+def _endpoint_returned() -> None:
+    profile = _request_profile.get()
+    if profile is not None:
+        profile.endpoint_returned = time.perf_counter()
+
+
+@contextmanager
+def timed_serialization():
+    """Count the enclosed work as serialization of the current request."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile = _request_profile.get()
+        if profile is not None:
+            profile.serialize_seconds += time.perf_counter() - started
+
+
+class ProfiledRoute(APIRoute):
+    """Route recording when its endpoint returned.
+
+    What follows until the response starts (response model validation and
+    JSON encoding) is the request's serialization time.
+    """
+
+    def get_route_handler(self):
+        call = self.dependant.call
+        if inspect.iscoroutinefunction(call):
+
+            @functools.wraps(call)
+            async def endpoint(*args, **kwargs):
+                try:
+                    return await call(*args, **kwargs)
+                finally:
+                    _endpoint_returned()
+
+        else:
+
+            @functools.wraps(call)
+            def endpoint(*args, **kwargs):
+                try:
+                    return call(*args, **kwargs)
+                finally:
+                    _endpoint_returned()
+
+        # Called with the resolved parameters: the signature was read already.
+        self.dependant.call = endpoint
+        return super().get_route_handler()
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        size = 0
+        profile = RequestProfile(scope)
+        token = _request_profile.set(profile)
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if profile.endpoint_returned is not None:
+                    profile.serialize_seconds += time.perf_counter() - profile.endpoint_returned
+                if SERVER_TIMING:
+                    total = f"total;dur={(time.perf_counter() - started) * 1000:.2f}"
+                    header = f"{profile.server_timing()}, {total}".encode()
+                    message = {**message, "headers": [*message.get("headers", ()), (b"server-timing", header)]}
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        in_flight = IN_FLIGHT.labels()
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.inc(-1)
+            _request_profile.reset(token)
+            if METRICS_ENABLED:
+                name = profile.route
+                REQUESTS.labels(name, scope["method"], str(status)).inc()
+                REQUEST_DURATION.labels(name, scope["method"]).observe(time.perf_counter() - started)
+                RESPONSE_SIZE.labels(name).observe(size)
+                REQUEST_QUERIES.labels(name).observe(profile.queries)
+                REQUEST_DB_SECONDS.labels(name).observe(profile.db_seconds)
+
+
+def metrics_config(app, engines) -> None:
+    """
+    Install the request metrics middleware and query profiling.
+
+    Args:
+        app (FastAPI): The FastAPI application instance.
+        engines: Sync engines whose statements are attributed to requests.
+    """
+    if not (METRICS_ENABLED or SLOW_QUERY_MS or SERVER_TIMING):
+        return
+    for engine in engines:
+        track_queries(engine)
+    app.add_middleware(MetricsMiddleware)
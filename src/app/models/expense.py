@@ -1,18 +1,45 @@
-from sqlalchemy import Column, ForeignKey, Integer, Numeric, String
+from datetime import datetime, timezone
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    Numeric,
+    String,
+    event,
+    func,
+    insert,
+)
 
 from sqlalchemy.orm import relationship
 from src.app.database.expense import Base, engine
+from src.app.database import partitions
+
+# On Postgres expenses are range-partitioned by month of spent_at (see
+# database/partitions.py); SQLite keeps a plain table.
+PARTITION_EXPENSES = engine.dialect.name == "postgresql"
 
 
 def create_tables():
     Base.metadata.create_all(bind=engine)
 
 
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
 class Category(Base):
     __tablename__ = "categories"
 
-    id = Column(Integer, primary_key=True, index=True, unique=True, autoincrement=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String, unique=True, index=True, nullable=False)
+    # Running total of the category's expenses, kept in step by the expense services.
+    spent = Column(Numeric(14, 2), nullable=False, default=0, server_default="0")
     expenses = relationship("Expense", back_populates="category")
 
 
@@ -20,20 +47,138 @@ class Budget(Base):
     __tablename__ = "budgets"
 
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String, unique=True, index=True, nullable=False)
     amount = Column(Numeric(10, 2), nullable=False)  # 10 digits, 2 decimal places
+    # Running total of the budget's expenses, kept in step by the expense services.
+    spent = Column(Numeric(14, 2), nullable=False, default=0, server_default="0")
     expenses = relationship("Expense", back_populates="budget")
 
+    @property
+    def remaining(self):
+        return self.amount - self.spent
+
 
 class Expense(Base):
     __tablename__ = "expenses"
+    __table_args__ = (
+        # (fk, id) serves FK lookups, keyset pages filtered by category/budget
+        # and, with amount included, index-only GROUP BY for the reports.
+        Index("ix_expenses_category_id_id", "category_id", "id", postgresql_include=["amount"]),
+        Index("ix_expenses_budget_id_id", "budget_id", "id", postgresql_include=["amount"]),
+        # Pattern ops let Postgres use the index for name LIKE 'prefix%'.
+        Index("ix_expenses_name", "name", postgresql_ops={"name": "varchar_pattern_ops"}),
+        # Date range filters and index-only scans for the time series report.
+        Index(
+            "ix_expenses_spent_at",
+            "spent_at",
+            postgresql_include=["amount", "category_id", "budget_id"],
+        ),
+        {"postgresql_partition_by": "RANGE (spent_at)"} if PARTITION_EXPENSES else {},
+    )
 
-    id = Column(Integer, primary_key=True, index=True, unique=True, autoincrement=True)
-    name = Column(String, index=True, nullable=False)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String, nullable=False)
     amount = Column(Numeric(10, 2), nullable=False)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
     budget_id = Column(Integer, ForeignKey("budgets.id"), nullable=True)
+    # When the money was spent (given by the client) and when the row was recorded, in UTC.
+    # A partitioned table's primary key must include the partition key: it is
+    # (id, spent_at) there, while the mapper keeps identifying rows by id alone.
+    spent_at = Column(
+        DateTime(timezone=True),
+        primary_key=PARTITION_EXPENSES,
+        nullable=False,
+        default=_utcnow,
+        server_default=func.now(),
+    )
+    created_at = Column(DateTime(timezone=True), nullable=False, default=_utcnow, server_default=func.now())
 
     category = relationship("Category")
     budget = relationship("Budget")
+
+    __mapper_args__ = {"primary_key": [id]}
+
+
+class SpendRollup(Base):
+    """Spend per UTC month, category and budget, kept in step with the expenses.
+
+    The expense services upsert deltas here in the same transaction as every
+    write; monthly reports sum these rows instead of the expenses.
+    """
+
+    __tablename__ = "spend_rollups"
+
+    period = Column(Date, primary_key=True)  # first day of the month
+    category_id = Column(Integer, ForeignKey("categories.id"), primary_key=True)
+    # 0 for expenses without a budget: primary key columns cannot be NULL.
+    budget_id = Column(Integer, primary_key=True)
+    total = Column(Numeric(14, 2), nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class SpendRollupPeriod(Base):
+    """Months whose rollups were rebuilt from the expenses and are exact since."""
+
+    __tablename__ = "spend_rollup_periods"
+
+    period = Column(Date, primary_key=True)
+    refreshed_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class TableVersion(Base):
+    """One shard of a table's change counter, bumped in the transaction of a write.
+
+    A table's version is the sum over its ``TABLE_VERSION_SHARDS`` rows. Each
+    write bumps one shard picked at random, so concurrent writers only wait
+    for each other when they pick the same row. Read endpoints derive their
+    ETag / Last-Modified from these rows, so answering a conditional request
+    never touches the tables themselves.
+    """
+
+    __tablename__ = "table_versions"
+
+    name = Column(String(64), primary_key=True)
+    shard = Column(Integer, primary_key=True, default=0)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class IdempotencyKey(Base):
+    """An ``Idempotency-Key`` a create request was sent with, and what it created.
+
+    Stored in the transaction of the insert, so a key exists exactly when its
+    row does; retries with the key are answered from ``resource_id``.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    key = Column(LargeBinary(32), primary_key=True)  # SHA-256 of user, route and key
+    fingerprint = Column(LargeBinary(32), nullable=False)  # SHA-256 of the request body
+    resource_id = Column(Integer, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+
+VERSIONED_TABLES = (Category.__tablename__, Budget.__tablename__, Expense.__tablename__)
+TABLE_VERSION_SHARDS = 16
+
+
+@event.listens_for(Expense.__table__, "after_create")
+def _create_expense_partitions(table, connection, **kw):
+    this_month = partitions.month_start(_utcnow().date())
+    partitions.ensure_expense_partitions(
+        connection, this_month, partitions.add_months(this_month, partitions.PARTITION_MONTHS_AHEAD)
+    )
+
+
+@event.listens_for(TableVersion.__table__, "after_create")
+def _seed_table_versions(table, connection, **kw):
+    now = datetime.now(timezone.utc)
+    connection.execute(
+        insert(table),
+        [
+            {"name": name, "shard": shard, "version": 0, "updated_at": now}
+            for name in VERSIONED_TABLES
+            for shard in range(TABLE_VERSION_SHARDS)
+        ],
+    )
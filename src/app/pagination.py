@@ -0,0 +1,63 @@
+"""Keyset (cursor) pagination helpers shared by the list endpoints.
+
+Pages are ordered by primary key and continue after the last id seen, so the
+cost of fetching a page does not grow with the offset into the table.
+"""
+
+import base64
+import binascii
+
+from fastapi import HTTPException, status
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(last_id: int) -> str:
+    """Encode the last id of a page into an opaque cursor token."""
+    return base64.urlsafe_b64encode(f"id:{last_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None) -> int | None:
+    """
+    Decode a cursor produced by :func:`encode_cursor`.
+
+    Raises:
+        HTTPException: If the cursor is malformed (400).
+    """
+    if cursor is None:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        prefix, _, value = base64.urlsafe_b64decode(padded).decode().partition(":")
+        if prefix != "id":
+            raise ValueError(cursor)
+        return int(value)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"message": "Invalid pagination cursor", "code": 400},
+        )
+
+
+def keyset_paginate(query, id_column, limit: int, after_id: int | None):
+    """
+    Apply keyset pagination to ``query``.
+
+    Args:
+        query: SQLAlchemy ORM query selecting the paginated entity.
+        id_column: The primary key column used as the sort/seek key.
+        limit (int): Maximum number of rows in the page.
+        after_id (int | None): Decoded cursor; only rows with a greater id are returned.
+
+    Returns:
+        tuple: The rows of the page and the cursor of the next page (None on the last page).
+    """
+    if after_id is not None:
+        query = query.filter(id_column > after_id)
+    # Fetch one extra row to learn whether another page exists.
+    rows = query.order_by(id_column).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(getattr(rows[-1], id_column.key))
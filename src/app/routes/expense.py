@@ -1,18 +1,29 @@
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+from decimal import Decimal
+from typing import Annotated, Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from src.app.database.expense import SessionLocal
+from src.app.conditional import NOT_MODIFIED_RESPONSE, conditional_get
+from src.app.database.expense import get_db, run_in_session
+from src.app.fast_json import FAST_JSON_RESPONSES, json_response
+from src.app import group_commit
+from src.app.middleware import ProfiledRoute
 from src.app.models.expense import Budget, Category, Expense
 from src.app.schema.expense import (
     BudgetIn,
+    BulkExpenseResult,
     BudgetOut,
     CategoryOut,
     CategoryIn,
     ExpenseIn,
     ExpenseOut,
+    Page,
+    Timestamp,
 )
-from src.app.exceptions import NotFoundException
+from src.app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor
 from src.app.security.auth import (
     authenticate_user,
     create_token_for_user,
@@ -22,22 +33,48 @@ from src.app.services import (
     budget_services,
     category_service,
     expense_services,
+    export_services,
+    idempotency_services,
 )
 
-router = APIRouter(prefix="/api/v1")
-
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+router = APIRouter(prefix="/api/v1", route_class=ProfiledRoute)
 
 
 # Convenience alias for annotating the database dependency in route signatures.
 db_dependency = Annotated[Session, Depends(get_db)]
 
+# Shared query parameters of the paginated list endpoints.
+limit_query = Query(
+    DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of items per page"
+)
+cursor_query = Query(None, description="`next_cursor` of the previous page")
+
+# Shared header of the create endpoints.
+idempotency_key_header = Header(
+    None,
+    alias="Idempotency-Key",
+    max_length=255,
+    description="Retries with the same key return the row created first instead of a duplicate",
+)
+
+
+async def _create_once(db, response: Response, current_user: dict, key, route: str, payload, instance, create, load):
+    """Run ``create`` through the Idempotency-Key check, marking replays with ``Idempotent-Replayed``."""
+    created, replayed = await run_in_session(
+        db,
+        idempotency_services.create_once,
+        key,
+        current_user["username"],
+        route,
+        payload,
+        instance,
+        create,
+        load,
+    )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return created
+
 
 @router.post(
     "/auth/token",
@@ -65,23 +102,96 @@ async def login_for_access_token(
     name="get_expenses",
     tags=["expenses"],
     status_code=status.HTTP_200_OK,
-    response_model=list[ExpenseOut],
-    response_description="List of all expenses",
+    response_model=Page[ExpenseOut],
+    responses=NOT_MODIFIED_RESPONSE,
+    dependencies=[conditional_get(Expense, Category, Budget)],
+    response_description="One page of expenses",
     summary="Get all expenses",
-    description="Retrieve a list of all expenses stored in the database.",
+    description=(
+        "Retrieve expenses page by page, optionally filtered by category, budget, amount range, "
+        "name prefix or the time range they were spent in."
+    ),
 )
 async def get_expenses(
+    response: Response,
+    limit: int = limit_query,
+    cursor: Optional[str] = cursor_query,
+    category_id: Optional[int] = Query(None, description="Only expenses in this category"),
+    budget_id: Optional[int] = Query(None, description="Only expenses charged to this budget"),
+    min_amount: Optional[Decimal] = Query(None, description="Minimum amount (inclusive)"),
+    max_amount: Optional[Decimal] = Query(None, description="Maximum amount (inclusive)"),
+    name_prefix: Optional[str] = Query(None, description="Only expenses whose name starts with this"),
+    spent_from: Optional[Timestamp] = Query(None, description="Only expenses spent at or after this time"),
+    spent_to: Optional[Timestamp] = Query(None, description="Only expenses spent before this time"),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> Page[ExpenseOut]:
+    """
+    Retrieve a page of expenses.
+
+    Returns:
+        Page[Expense]: The expenses of the page and the cursor of the next one.
+    """
+    expenses, next_cursor = await run_in_session(
+        db,
+        expense_services.get_expense_rows if FAST_JSON_RESPONSES else expense_services.get_all_expenses,
+        limit=limit,
+        after_id=decode_cursor(cursor),
+        category_id=category_id,
+        budget_id=budget_id,
+        min_amount=min_amount,
+        max_amount=max_amount,
+        name_prefix=name_prefix,
+        spent_from=spent_from,
+        spent_to=spent_to,
+    )
+    if FAST_JSON_RESPONSES:
+        return json_response({"items": expenses, "next_cursor": next_cursor}, response)
+    return {"items": expenses, "next_cursor": next_cursor}
+
+
+@router.get(
+    "/expenses/export",
+    name="export_expenses",
+    tags=["expenses"],
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "The full expense ledger",
+            "content": {media_type: {} for media_type in export_services.MEDIA_TYPES.values()},
+        }
+    },
+    summary="Export all expenses",
+    description="Stream every expense as NDJSON or CSV, optionally gzip-compressed.",
+)
+async def export_expenses(
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Output format"),
+    gzip: bool = Query(False, description="Compress the stream with gzip"),
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db),
-) -> list[ExpenseOut]:
+):
     """
-    Retrieve all expenses.
+    Stream the expense ledger.
+
+    Args:
+        format (str): "ndjson" (one JSON object per line) or "csv".
+        gzip (bool): Whether to gzip the body on the fly.
 
     Returns:
-        List[Expense]: A list of all expense objects.
+        StreamingResponse: The exported rows, produced batch by batch.
     """
-    expenses = expense_services.get_all_expenses(db)
-    return expenses
+    if isinstance(db, AsyncSession):
+        body = export_services.aiter_expense_export(db, format, gzip)
+    else:
+        body = export_services.iter_expense_export(db, format, gzip)
+
+    headers = {"Content-Disposition": f'attachment; filename="expenses.{format}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        body, media_type=export_services.MEDIA_TYPES[format], headers=headers
+    )
 
 
 @router.get(
@@ -90,6 +200,8 @@ async def get_expenses(
     tags=["expenses"],
     status_code=status.HTTP_200_OK,
     response_model=ExpenseOut,
+    responses=NOT_MODIFIED_RESPONSE,
+    dependencies=[conditional_get(Expense, Category, Budget)],
     summary="Get a specific expense",
     description="Retrieve a specific expense by its unique ID.",
 )
@@ -107,7 +219,9 @@ async def get_expense(
     Returns:
         Expense: The expense object if found.
     """
-    expense = expense_services.get_specific_expense(db, expense_id)
+    expense = await run_in_session(
+        db, expense_services.get_expense_detail, expense_id=expense_id
+    )
 
     return expense
 
@@ -123,6 +237,8 @@ async def get_expense(
 )
 async def create_expense(
     expense_in: ExpenseIn,
+    response: Response,
+    idempotency_key: Optional[str] = idempotency_key_header,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
@@ -131,13 +247,117 @@ async def create_expense(
 
     Args:
         expense_in (ExpenseIn): The expense data to create.
+        idempotency_key (str, optional): Replays the expense created with this key.
 
     Returns:
         Expense: The created expense object.
     """
+    if group_commit.EXPENSE_GROUP_COMMIT and idempotency_key is None:
+        # Written with other queued expenses in one transaction, then read back.
+        expense_id = await group_commit.expense_writer.submit(expense_in.model_dump())
+        return await run_in_session(db, expense_services.get_specific_expense, expense_id=expense_id)
     expense = Expense(**expense_in.model_dump())
-    expense = expense_services.create_expense(expense, db)
-    return expense
+    return await _create_once(
+        db,
+        response,
+        current_user,
+        idempotency_key,
+        "create_expense",
+        expense_in,
+        expense,
+        expense_services.create_expense,
+        expense_services.get_specific_expense,
+    )
+
+
+# Upper bound on rows accepted by one bulk import request.
+MAX_BULK_ROWS = 100_000
+
+
+def _decode_bulk_body(body: bytes, content_type: str) -> list:
+    """Decode a JSON array or NDJSON body into rows (``None`` for undecodable NDJSON lines).
+
+    Fractional numbers are decoded straight to ``Decimal`` so amounts stay exact.
+    """
+    if content_type.startswith("application/x-ndjson"):
+        items = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line, parse_float=Decimal))
+            except ValueError:
+                items.append(None)
+        return items
+
+    try:
+        items = json.loads(body, parse_float=Decimal)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"message": "Body is not valid JSON", "code": 400},
+        )
+    if not isinstance(items, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"message": "Expected a JSON array of expenses", "code": 400},
+        )
+    return items
+
+
+@router.post(
+    "/expenses/bulk",
+    name="bulk_create_expenses",
+    tags=["expenses"],
+    status_code=status.HTTP_200_OK,
+    response_model=BulkExpenseResult,
+    summary="Create many expenses",
+    description=(
+        "Import a batch of expenses sent as a JSON array or as NDJSON "
+        "(`Content-Type: application/x-ndjson`). Valid rows are stored in one "
+        "transaction; invalid rows are reported by index without aborting the batch."
+    ),
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": {"$ref": "#/components/schemas/ExpenseIn"}}
+                },
+                "application/x-ndjson": {"schema": {"$ref": "#/components/schemas/ExpenseIn"}},
+            },
+        }
+    },
+)
+async def bulk_create_expenses(
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Create many expenses at once.
+
+    Returns:
+        BulkExpenseResult: The ids of the stored rows and the errors of the rejected ones.
+
+    Raises:
+        HTTPException: If the body cannot be decoded (400) or the batch is too large (413).
+    """
+    items = _decode_bulk_body(await request.body(), request.headers.get("content-type", ""))
+    if len(items) > MAX_BULK_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail={"message": f"At most {MAX_BULK_ROWS} rows per request", "code": 413},
+        )
+
+    rows, errors = expense_services.validate_bulk_rows(items)
+    created = []
+    if rows:
+        created, reference_errors = await run_in_session(
+            db, expense_services.bulk_create_expenses, rows
+        )
+        errors = sorted(errors + reference_errors, key=lambda error: error["index"])
+    return {"created": created, "errors": errors}
 
 
 @router.delete(
@@ -162,12 +382,7 @@ async def delete_expense(
     Raises:
         HTTPException: If the expense is not found (404).
     """
-    expense = db.query(Expense).filter(Expense.id == expense_id).first()
-    if not expense:
-        raise NotFoundException({"message": "Expense not found", "code": 404})
-
-    db.delete(expense)
-    db.commit()
+    await run_in_session(db, expense_services.delete_expense, expense_id)
 
 
 @router.patch(
@@ -195,27 +410,9 @@ async def update_expense(
     Raises:
         HTTPException: If the expense is not found (404).
     """
-    expense = db.query(Expense).filter(Expense.id == expense_id).first()
-    if not expense:
-        raise NotFoundException({"message": "Expense not found", "code": 404})
-
-    # Update fields from the input schema. ExpenseIn uses category_id and budget_id
-    expense.name = expense_in.name
-    expense.amount = expense_in.amount
-    # Some clients may omit category_id or budget_id, so handle that defensively
-    try:
-        expense.category_id = expense_in.category_id
-    except AttributeError:
-        # if ExpenseIn doesn't include category_id, skip assignment
-        pass
-
-    try:
-        expense.budget_id = expense_in.budget_id
-    except AttributeError:
-        pass
-
-    db.commit()
-    db.refresh(expense)
+    expense = await run_in_session(
+        db, expense_services.update_expense, expense_id, expense_in
+    )
     return expense
 
 
@@ -230,6 +427,8 @@ async def update_expense(
 )
 async def create_category(
     category_in: CategoryIn,
+    response: Response,
+    idempotency_key: Optional[str] = idempotency_key_header,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
@@ -238,6 +437,7 @@ async def create_category(
 
     Args:
         category_in (CategoryIn): The category data to create.
+        idempotency_key (str, optional): Replays the category created with this key.
 
     Returns:
         Category: The created category object.
@@ -245,8 +445,17 @@ async def create_category(
     """
 
     category = Category(**category_in.model_dump())
-    category = category_service.create_category(category, db)
-    return category
+    return await _create_once(
+        db,
+        response,
+        current_user,
+        idempotency_key,
+        "create_category",
+        category_in,
+        category,
+        category_service.create_category,
+        lambda session, category_id: category_service.get_specific_category(category_id, session),
+    )
 
 
 @router.get(
@@ -254,22 +463,32 @@ async def create_category(
     name="get_categories",
     tags=["categories"],
     status_code=status.HTTP_200_OK,
-    response_model=list[CategoryOut],
+    response_model=Page[CategoryOut],
+    responses=NOT_MODIFIED_RESPONSE,
+    dependencies=[conditional_get(Category)],
     summary="Get all categories",
-    description="Retrieve a list of all categories stored in the database.",
+    description="Retrieve the categories stored in the database, page by page.",
 )
 async def get_categories(
+    response: Response,
+    limit: int = limit_query,
+    cursor: Optional[str] = cursor_query,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
-    Retrieve all categories.
+    Retrieve a page of categories.
 
     Returns:
-        List[Category]: A list of all category objects.
+        Page[Category]: The categories of the page and the cursor of the next one.
     """
-    categories = category_service.get_all_categories(db)
-    return categories
+    categories, next_cursor = await run_in_session(
+        db, category_service.get_all_categories, limit=limit, after_id=decode_cursor(cursor)
+    )
+    if FAST_JSON_RESPONSES:
+        # The cached items are already JSON-ready; skip re-validating them.
+        return json_response({"items": categories, "next_cursor": next_cursor}, response)
+    return {"items": categories, "next_cursor": next_cursor}
 
 
 @router.get(
@@ -278,6 +497,8 @@ async def get_categories(
     tags=["categories"],
     status_code=status.HTTP_200_OK,
     response_model=CategoryOut,
+    responses=NOT_MODIFIED_RESPONSE,
+    dependencies=[conditional_get(Category)],
     summary="Get specific category",
     description="Retrieve a specific category stored in the database.",
 )
@@ -292,7 +513,9 @@ async def get_category(
     Returns:
         Category: A list of all category objects.
     """
-    category = category_service.get_specific_category(category_id,db)
+    category = await run_in_session(
+        db, category_service.get_specific_category, category_id
+    )
     return category
 
 
@@ -307,6 +530,8 @@ async def get_category(
 )
 async def create_budget(
     budget_in: BudgetIn,
+    response: Response,
+    idempotency_key: Optional[str] = idempotency_key_header,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
@@ -315,13 +540,23 @@ async def create_budget(
 
     Args:
         budget_in (BudgetIn): The budget data to create.
+        idempotency_key (str, optional): Replays the budget created with this key.
 
     Returns:
         Budget: The created budget object.
     """
     budget = Budget(**budget_in.model_dump())
-    budget = budget_services.create_budget(budget, db)
-    return budget
+    return await _create_once(
+        db,
+        response,
+        current_user,
+        idempotency_key,
+        "create_budget",
+        budget_in,
+        budget,
+        budget_services.create_budget,
+        budget_services.get_specific_budget,
+    )
 
 
 @router.get(
@@ -329,22 +564,32 @@ async def create_budget(
     name="get_budgets",
     tags=["budgets"],
     status_code=status.HTTP_200_OK,
-    response_model=list[BudgetOut],
+    response_model=Page[BudgetOut],
+    responses=NOT_MODIFIED_RESPONSE,
+    dependencies=[conditional_get(Budget)],
     summary="Get all budgets",
-    description="Retrieve a list of all budgets stored in the database.",
+    description="Retrieve the budgets stored in the database, page by page.",
 )
 async def get_budgets(
+    response: Response,
+    limit: int = limit_query,
+    cursor: Optional[str] = cursor_query,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
-    Retrieve all budgets.
+    Retrieve a page of budgets.
 
     Returns:
-        List[Budget]: A list of all budget objects.
+        Page[Budget]: The budgets of the page and the cursor of the next one.
     """
-    budgets = budget_services.get_all_budgets(db)
-    return budgets
+    budgets, next_cursor = await run_in_session(
+        db, budget_services.get_all_budgets, limit=limit, after_id=decode_cursor(cursor)
+    )
+    if FAST_JSON_RESPONSES:
+        # The cached items are already JSON-ready; skip re-validating them.
+        return json_response({"items": budgets, "next_cursor": next_cursor}, response)
+    return {"items": budgets, "next_cursor": next_cursor}
 
 
 @router.get(
@@ -353,6 +598,8 @@ async def get_budgets(
     tags=["budgets"],
     status_code=status.HTTP_200_OK,
     response_model=BudgetOut,
+    responses=NOT_MODIFIED_RESPONSE,
+    dependencies=[conditional_get(Budget)],
     summary="Get a specific budget",
     description="Retrieve a specific budget by its unique ID.",
 )
@@ -373,7 +620,9 @@ async def get_budget(
     Raises:
         HTTPException: If the budget is not found (404) or the user is not authorized (403).
     """
-    budget = budget_services.get_specific_budget(db, budget_id)
+    budget = await run_in_session(
+        db, budget_services.get_specific_budget, budget_id=budget_id
+    )
     return budget
 
 
@@ -0,0 +1,24 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from src.app.security import jwt as jwt_helpers
+
+router = APIRouter()
+
+# Verifiers may reuse the key set this long; publish a new key at least this
+# long before signing with it.
+JWKS_MAX_AGE = 300
+
+
+@router.get("/.well-known/jwks.json", name="jwks", tags=["auth"])
+async def jwks():
+    """
+    Publish the public keys that access tokens are verified with.
+
+    Returns:
+        JSONResponse: A JWK set with one key per ``kid``; empty while tokens
+        are signed with the shared secret.
+    """
+    return JSONResponse(
+        jwt_helpers.KEY_RING.jwks, headers={"Cache-Control": f"public, max-age={JWKS_MAX_AGE}"}
+    )
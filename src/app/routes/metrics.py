@@ -0,0 +1,23 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.app.metrics import REGISTRY
+
+router = APIRouter()
+
+
+@router.get(
+    "/metrics",
+    name="metrics",
+    tags=["monitoring"],
+    response_class=PlainTextResponse,
+    include_in_schema=False,
+)
+async def metrics():
+    """
+    Expose the process metrics in the Prometheus text format.
+
+    Returns:
+        PlainTextResponse: Pool, cache and request metrics of this worker.
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
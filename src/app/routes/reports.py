@@ -0,0 +1,95 @@
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.orm import Session
+
+from src.app.cache import report_cache
+from src.app.database.expense import get_db, run_in_session
+from src.app.middleware import ProfiledRoute
+from src.app.schema.expense import SpendSummary, SpendTimeseries, Timestamp
+from src.app.security.auth import get_current_user
+from src.app.services import report_services
+
+router = APIRouter(prefix="/api/v1/reports", route_class=ProfiledRoute)
+
+
+@router.get(
+    "/summary",
+    name="get_spend_summary",
+    tags=["reports"],
+    status_code=status.HTTP_200_OK,
+    response_model=SpendSummary,
+    summary="Spending summary",
+    description=(
+        "Total, count, average, minimum and maximum spend grouped by category "
+        "and/or budget, computed in the database. Grouping by budget alone also "
+        "returns the remaining amount of each budget."
+    ),
+)
+async def get_spend_summary(
+    group_by: list[Literal["category", "budget"]] = Query(
+        ["category"], description="Dimensions to group by; repeat for both"
+    ),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Summarise spending per category and/or budget.
+
+    Args:
+        group_by (list[str]): "category", "budget" or both.
+
+    Returns:
+        SpendSummary: The grouped aggregates and the overall totals.
+    """
+    async def compute():
+        summary = await run_in_session(db, report_services.get_spend_summary, group_by=group_by)
+        return SpendSummary.model_validate(summary).model_dump(mode="json")
+
+    # Concurrent misses for the same grouping run the aggregation only once.
+    return await report_cache.get_or_compute(("summary", *sorted(set(group_by))), compute)
+
+
+@router.get(
+    "/timeseries",
+    name="get_spend_timeseries",
+    tags=["reports"],
+    status_code=status.HTTP_200_OK,
+    response_model=SpendTimeseries,
+    summary="Spending over time",
+    description=(
+        "Total and count of expenses per day, week or month (UTC), overall or per "
+        "category or budget, optionally limited to a time range. Buckets without "
+        "expenses are omitted."
+    ),
+)
+async def get_spend_timeseries(
+    bucket: Literal["day", "week", "month"] = Query("month", description="Bucket size"),
+    group_by: Optional[Literal["category", "budget"]] = Query(
+        None, description="One series per category or budget; overall totals when omitted"
+    ),
+    start: Optional[Timestamp] = Query(None, description="Only expenses spent at or after this time"),
+    end: Optional[Timestamp] = Query(None, description="Only expenses spent before this time"),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Summarise spending per time bucket.
+
+    Args:
+        bucket (str): "day", "week" or "month".
+        group_by (str, optional): "category" or "budget".
+        start (datetime, optional): Inclusive lower bound on ``spent_at``.
+        end (datetime, optional): Exclusive upper bound on ``spent_at``.
+
+    Returns:
+        SpendTimeseries: The points of the series in time order.
+    """
+    async def compute():
+        series = await run_in_session(
+            db, report_services.get_spend_timeseries, bucket=bucket, group_by=group_by, start=start, end=end
+        )
+        return SpendTimeseries.model_validate(series).model_dump(mode="json")
+
+    key = ("timeseries", bucket, group_by, start.isoformat() if start else None, end.isoformat() if end else None)
+    return await report_cache.get_or_compute(key, compute)
@@ -1,10 +1,52 @@
 """Pydantic schemas for the Expense Tracker API.
 
 This module defines input validation schemas for expenses.
+
+Money is carried as ``Decimal`` end to end and rendered in JSON as an exact
+string with two decimal places (``"12.50"``), so that clients never round it
+through binary floats. Inputs accept numbers or strings.
+
+Timestamps are UTC; naive inputs are taken to be UTC already.
 """
 
-from typing import Optional
-from pydantic import BaseModel, Field
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Annotated, Generic, Optional, TypeVar
+from pydantic import AfterValidator, BaseModel, Field, PlainSerializer
+
+T = TypeVar("T")
+
+CENT = Decimal("0.01")
+
+
+def _to_cents(value: Decimal) -> Decimal:
+    """Give ``value`` exactly two decimal places (``12.5`` -> ``12.50``)."""
+    return value.quantize(CENT)
+
+
+# An amount submitted by a client: fits ``Numeric(10, 2)``, normalized to cents.
+Amount = Annotated[Decimal, Field(max_digits=10, decimal_places=2), AfterValidator(_to_cents)]
+
+# An amount returned to clients. Values come from ``Numeric(_, 2)`` columns or
+# casts, so ``Decimal.__str__`` (C code, cheaper than pydantic's default Decimal
+# serializer) already yields the exact ``"12.50"`` form.
+Money = Annotated[Decimal, PlainSerializer(Decimal.__str__, return_type=str, when_used="json")]
+
+
+def as_utc(value: datetime) -> datetime:
+    """Return ``value`` in UTC; naive values (e.g. read from SQLite) are taken as UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def format_timestamp(value: datetime) -> str:
+    """The JSON form of a :data:`Timestamp` (``2025-01-31T12:00:00Z``)."""
+    return as_utc(value).isoformat().replace("+00:00", "Z")
+
+
+# A point in time, normalized to UTC; rendered by pydantic as format_timestamp() does.
+Timestamp = Annotated[datetime, AfterValidator(as_utc)]
 
 
 class ExpenseIn(BaseModel):
@@ -13,14 +55,19 @@ class ExpenseIn(BaseModel):
 
     Attributes:
         name (str): Name of the expense.
-        amount (float): Amount of the expense.
+        amount (Decimal): Amount of the expense.
         category (str): Category of the expense.
+        spent_at (datetime): When the money was spent; defaults to now.
     """
 
     name: str = Field(..., description="Name of the expense")
-    amount: float = Field(..., description="Amount of the expense")
+    amount: Amount = Field(..., description="Amount of the expense")
     category_id: int = Field(..., description="The id of the category")
     budget_id: int = Field(..., description="The id of the budget")
+    spent_at: Timestamp = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        description="When the money was spent (UTC unless an offset is given); defaults to now",
+    )
 
 
 class CategoryIn(BaseModel):
@@ -40,11 +87,11 @@ class BudgetIn(BaseModel):
 
     Attributes:
         name (str): Name of the budget.
-        amount (float): Total amount allocated for the budget.
+        amount (Decimal): Total amount allocated for the budget.
     """
 
     name: str = Field(..., description="Name of the budget")
-    amount: float = Field(..., description="Total amount allocated for the budget")
+    amount: Amount = Field(..., description="Total amount allocated for the budget")
 
 
 class CategoryOut(BaseModel):
@@ -53,10 +100,12 @@ class CategoryOut(BaseModel):
 
     Attributes:
         name (str): Name of the category.
+        spent (Decimal): Total amount of the category's expenses.
     """
 
     id: int 
     name: str
+    spent: Money
 
     class Config:
         """
@@ -74,12 +123,16 @@ class BudgetOut(BaseModel):
 
     Attributes:
         name (str): Name of the budget.
-        amount (float): Total amount allocated for the budget.
+        amount (Decimal): Total amount allocated for the budget.
+        spent (Decimal): Total amount of the budget's expenses.
+        remaining (Decimal): ``amount - spent``; negative when overspent.
     """
 
     id: int
     name: str
-    amount: float
+    amount: Money
+    spent: Money
+    remaining: Money
 
     class Config:
         """
@@ -97,14 +150,18 @@ class ExpenseOut(BaseModel):
 
     Attributes:
         name (str): Name of the expense.
-        amount (float): Amount of the expense.
+        amount (Decimal): Amount of the expense.
+        spent_at (datetime): When the money was spent (UTC).
+        created_at (datetime): When the expense was recorded (UTC).
         category (CategoryOut): Category the expense belongs to.
         budget (BudgetOut): Budget the expense is associated with.
     """
 
     id: int
     name: str
-    amount: float
+    amount: Money
+    spent_at: Timestamp
+    created_at: Timestamp
     category: Optional[CategoryOut]
     budget: Optional[BudgetOut]
 
@@ -122,15 +179,154 @@ class ExpenseUpdate(BaseModel):
     """Schema for updating an existing expense.
     Attributes:
         name (str, optional): Name of the expense.
-        amount (float, optional): Amount of the expense.
+        amount (Decimal, optional): Amount of the expense.
         category (PydanticObjectId, optional): Category of the expense.
         budget (PydanticObjectId, optional): Budget associated with the expense.
     """
 
     name: Optional[str] = None
-    amount: Optional[float] = None
+    amount: Optional[Amount] = None
     category: Optional[CategoryOut]
     budget: Optional[BudgetOut]
 
     class Config:
         from_attributes = True
+
+
+class Page(BaseModel, Generic[T]):
+    """
+    Schema for one page of a keyset-paginated listing.
+
+    Attributes:
+        items (list): The records in this page, ordered by id.
+        next_cursor (str, optional): Opaque token for the next page; null on the last page.
+    """
+
+    items: list[T]
+    next_cursor: Optional[str] = Field(
+        None, description="Pass as `cursor` to fetch the next page"
+    )
+
+
+class BulkExpenseCreated(BaseModel):
+    """
+    A row of a bulk import that was stored.
+
+    Attributes:
+        index (int): Position of the row in the submitted batch.
+        id (int): The id assigned to the new expense.
+    """
+
+    index: int
+    id: int
+
+
+class BulkExpenseError(BaseModel):
+    """
+    A row of a bulk import that was rejected.
+
+    Attributes:
+        index (int): Position of the row in the submitted batch.
+        errors (list): Validation or reference errors for the row.
+    """
+
+    index: int
+    errors: list[dict]
+
+
+class BulkExpenseResult(BaseModel):
+    """
+    Outcome of a bulk import; valid rows are stored even when others fail.
+
+    Attributes:
+        created (list[BulkExpenseCreated]): The stored rows and their ids.
+        errors (list[BulkExpenseError]): The rejected rows.
+    """
+
+    created: list[BulkExpenseCreated]
+    errors: list[BulkExpenseError]
+
+
+class SpendAggregate(BaseModel):
+    """
+    Aggregated spending over a set of expenses.
+
+    Attributes:
+        total (Decimal): Sum of the amounts.
+        count (int): Number of expenses.
+        average (Decimal, optional): Mean amount; null when there are no expenses.
+        minimum (Decimal, optional): Smallest amount.
+        maximum (Decimal, optional): Largest amount.
+    """
+
+    total: Money
+    count: int
+    average: Optional[Money] = None
+    minimum: Optional[Money] = None
+    maximum: Optional[Money] = None
+
+
+class SpendSummaryRow(SpendAggregate):
+    """
+    Spending of one category and/or budget.
+
+    Attributes:
+        category_id (int, optional): The category of the group.
+        budget_id (int, optional): The budget of the group.
+        budget_amount (Decimal, optional): Amount allocated to the budget (budget grouping only).
+        remaining (Decimal, optional): ``budget_amount - total`` (budget grouping only).
+    """
+
+    category_id: Optional[int] = None
+    budget_id: Optional[int] = None
+    budget_amount: Optional[Money] = None
+    remaining: Optional[Money] = None
+
+
+class SpendSummary(BaseModel):
+    """
+    Schema for the spending summary report.
+
+    Attributes:
+        group_by (list[str]): The dimensions the groups are keyed on.
+        groups (list[SpendSummaryRow]): One row per group.
+        totals (SpendAggregate): Aggregates over all expenses.
+    """
+
+    group_by: list[str]
+    groups: list[SpendSummaryRow]
+    totals: SpendAggregate
+
+
+class SpendTimeseriesPoint(BaseModel):
+    """
+    Spending of one time bucket, per category or budget when grouped.
+
+    Attributes:
+        period (datetime): Start of the bucket (UTC).
+        category_id (int, optional): The category of the point (category grouping only).
+        budget_id (int, optional): The budget of the point (budget grouping only).
+        total (Decimal): Sum of the amounts.
+        count (int): Number of expenses.
+    """
+
+    period: Timestamp
+    category_id: Optional[int] = None
+    budget_id: Optional[int] = None
+    total: Money
+    count: int
+
+
+class SpendTimeseries(BaseModel):
+    """
+    Schema for the spending time series report.
+
+    Attributes:
+        bucket (str): "day", "week" (starting Monday) or "month".
+        group_by (str, optional): "category" or "budget"; null for overall totals.
+        points (list[SpendTimeseriesPoint]): One point per non-empty bucket (and group), in time order.
+    """
+
+    bucket: str
+    group_by: Optional[str] = None
+    points: list[SpendTimeseriesPoint]
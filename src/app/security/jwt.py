@@ -5,10 +5,16 @@ from __future__ import annotations
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict
 
+import hashlib
 import os
+import time
 import jwt
 from fastapi import HTTPException, status
 
+from src.app.cache import MemoryBackend
+from src.app.metrics import REGISTRY
+from src.app.security.keys import KeyRing, load_key_ring, symmetric_key_ring
+
 
 def _require_env(key: str, default: str | None = None) -> str:
     """Fetch an environment variable or raise if it is missing."""
@@ -21,6 +27,37 @@ def _require_env(key: str, default: str | None = None) -> str:
 SECRET_KEY = _require_env("JWT_SECRET_KEY", "change-me")
 ALGORITHM = _require_env("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(_require_env("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+# Directory of <kid>.pem keys for asymmetric tokens; unset keeps the shared secret.
+JWT_KEYS_DIR = os.getenv("JWT_KEYS_DIR")
+JWT_SIGNING_KID = os.getenv("JWT_SIGNING_KID")
+# Verified tokens remembered to skip signature checks on repeat requests; 0 disables.
+JWT_VERIFY_CACHE_SIZE = int(_require_env("JWT_VERIFY_CACHE_SIZE", "1024"))
+
+_VERIFY_CACHE_LOOKUPS = REGISTRY.counter(
+    "auth_token_cache_lookups_total", "Verified-token cache lookups by result", ("result",)
+)
+_verified_tokens: MemoryBackend | None = None
+
+
+def configure_verify_cache(maxsize: int, clock=time.time) -> None:
+    """(Re)create the verified-token cache; ``0`` disables it."""
+    global _verified_tokens
+    # Wall clock, so entries expire exactly at the token's ``exp``.
+    _verified_tokens = MemoryBackend(maxsize=maxsize, clock=clock) if maxsize > 0 else None
+
+
+configure_verify_cache(JWT_VERIFY_CACHE_SIZE)
+
+KEY_RING: KeyRing = (
+    load_key_ring(JWT_KEYS_DIR, JWT_SIGNING_KID) if JWT_KEYS_DIR else symmetric_key_ring(SECRET_KEY, ALGORITHM)
+)
+
+
+def configure_keys(key_ring: KeyRing) -> None:
+    """Swap the signing/verification keys, forgetting tokens verified with the old ones."""
+    global KEY_RING
+    KEY_RING = key_ring
+    configure_verify_cache(_verified_tokens.maxsize if _verified_tokens is not None else 0)
 
 
 def create_access_token(subject: Dict[str, Any], expires_delta: timedelta | None = None) -> str:
@@ -28,17 +65,42 @@ def create_access_token(subject: Dict[str, Any], expires_delta: timedelta | None
     to_encode = subject.copy()
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    key = KEY_RING.signing
+    return jwt.encode(to_encode, key.signing_key, algorithm=key.algorithm, headers=KEY_RING.signing_headers())
 
 
 def decode_access_token(token: str) -> Dict[str, Any]:
-    """Decode the JWT token and return its payload if valid."""
+    """Decode the JWT token and return its payload if valid.
+
+    Tokens that verified before are served from a bounded cache keyed by the
+    token's SHA-256 digest until their ``exp``; expired or unknown tokens go
+    through full verification against the key named by the token's ``kid``,
+    with that key's algorithm only.
+    """
+    cache = _verified_tokens
+    digest = None
+    if cache is not None:
+        digest = hashlib.sha256(token.encode()).digest()
+        payload = cache.get(digest)
+        if payload is not None:
+            _VERIFY_CACHE_LOOKUPS.labels("hit").inc()
+            return dict(payload)
+        _VERIFY_CACHE_LOOKUPS.labels("miss").inc()
+
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        key = KEY_RING.verification_key(token)
+        payload = jwt.decode(token, key.verifying_key, algorithms=[key.algorithm])
     except jwt.PyJWTError as exc:  # catch all decode / expiration issues
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         ) from exc
+
+    expires_at = payload.get("exp")
+    if cache is not None and isinstance(expires_at, (int, float)):
+        # Tokens without ``exp`` never expire, so they are always re-verified.
+        ttl = expires_at - time.time()
+        if ttl > 0:
+            cache.set(digest, dict(payload), ttl)
     return payload
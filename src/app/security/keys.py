@@ -0,0 +1,125 @@
+"""Signing and verification keys for access tokens.
+
+By default tokens are signed with the shared ``JWT_SECRET_KEY`` (HS256), which
+every verifier must also hold. Pointing ``JWT_KEYS_DIR`` at a directory of PEM
+files switches to asymmetric signatures:
+
+* every ``<kid>.pem`` file is a key, identified by its file name;
+* private keys (RSA, Ed25519 or EC P-256/384/521) can sign, public keys only
+  verify; the algorithm follows from the key type (RS256, EdDSA, ES256...);
+* tokens are signed with ``JWT_SIGNING_KID`` (optional when exactly one
+  private key is present) and carry its ``kid`` header;
+* the public half of every key is published at ``/.well-known/jwks.json``,
+  so other services verify tokens without any shared secret.
+
+To rotate, add the new key, switch ``JWT_SIGNING_KID`` to it and remove the
+old file once the tokens it signed have expired.
+
+Keys are parsed once when the ring is built; requests only look them up.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import jwt
+
+
+class KeyConfigurationError(RuntimeError):
+    """The configured keys cannot be used to sign or verify tokens."""
+
+
+@dataclass(frozen=True)
+class JWTKey:
+    kid: str | None
+    algorithm: str
+    # Secret or private key; ``None`` for keys that only verify.
+    signing_key: Any
+    verifying_key: Any
+
+    @property
+    def is_symmetric(self) -> bool:
+        return self.algorithm.startswith("HS")
+
+    def to_jwk(self) -> dict:
+        """The public JWK of an asymmetric key."""
+        jwk = jwt.get_algorithm_by_name(self.algorithm).to_jwk(self.verifying_key, as_dict=True)
+        jwk.update(kid=self.kid, alg=self.algorithm, use="sig")
+        return jwk
+
+
+class KeyRing:
+    """The keys accepted for verification, indexed by ``kid``, and the one that signs."""
+
+    def __init__(self, keys: list[JWTKey], signing_kid: str | None):
+        self.keys = {key.kid: key for key in keys}
+        signing = self.keys.get(signing_kid)
+        if signing is None or signing.signing_key is None:
+            raise KeyConfigurationError(f"No private key with kid {signing_kid!r} to sign tokens with")
+        self.signing = signing
+        # Built once: the JWKS endpoint serves this document as is.
+        self.jwks = {"keys": [key.to_jwk() for key in keys if not key.is_symmetric]}
+
+    def signing_headers(self) -> dict | None:
+        return {"kid": self.signing.kid} if self.signing.kid is not None else None
+
+    def verification_key(self, token: str) -> JWTKey:
+        """The key that must have signed ``token``, chosen by its ``kid`` header."""
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self.keys.get(kid)
+        if key is None:
+            raise jwt.InvalidKeyError(f"Unknown key id {kid!r}")
+        return key
+
+
+def symmetric_key_ring(secret: str, algorithm: str = "HS256") -> KeyRing:
+    """A ring holding the single shared secret (tokens carry no ``kid``)."""
+    return KeyRing([JWTKey(None, algorithm, secret, secret)], None)
+
+
+def _algorithm_for(key) -> str:
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+    if isinstance(key, (rsa.RSAPrivateKey, rsa.RSAPublicKey)):
+        return "RS256"
+    if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+        return "EdDSA"
+    if isinstance(key, (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey)):
+        algorithm = {"secp256r1": "ES256", "secp384r1": "ES384", "secp521r1": "ES512"}.get(key.curve.name)
+        if algorithm is not None:
+            return algorithm
+    raise KeyConfigurationError(f"Unsupported key type {type(key).__name__}")
+
+
+def load_pem_key(kid: str, pem: bytes) -> JWTKey:
+    """Parse a private or public PEM key."""
+    try:
+        from cryptography.hazmat.primitives import serialization
+    except ImportError as exc:
+        raise KeyConfigurationError(
+            "Asymmetric JWT keys require the 'cryptography' package"
+        ) from exc
+
+    if b"PRIVATE KEY" in pem:
+        private_key = serialization.load_pem_private_key(pem, password=None)
+        return JWTKey(kid, _algorithm_for(private_key), private_key, private_key.public_key())
+    public_key = serialization.load_pem_public_key(pem)
+    return JWTKey(kid, _algorithm_for(public_key), None, public_key)
+
+
+def load_key_ring(directory: str | Path, signing_kid: str | None = None) -> KeyRing:
+    """Build a ring from the ``<kid>.pem`` files in ``directory``."""
+    paths = sorted(Path(directory).glob("*.pem"))
+    if not paths:
+        raise KeyConfigurationError(f"No *.pem keys found in {directory}")
+    keys = [load_pem_key(path.stem, path.read_bytes()) for path in paths]
+    if signing_kid is None:
+        private = [key.kid for key in keys if key.signing_key is not None]
+        if len(private) != 1:
+            raise KeyConfigurationError(
+                f"Set JWT_SIGNING_KID to choose the signing key among {private or 'no private keys'}"
+            )
+        signing_kid = private[0]
+    return KeyRing(keys, signing_kid)
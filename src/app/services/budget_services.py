@@ -1,20 +1,41 @@
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
+from src.app.cache import budget_cache, invalidate_on_commit, report_cache
 from src.app.models.expense import Budget
+from src.app.pagination import DEFAULT_PAGE_SIZE, keyset_paginate
+from src.app.schema.expense import BudgetOut
+from src.app.services.version_services import mark_changed
 
 
-def get_all_budgets(db:Session):
-    """Retrieve all budgets from the database.
+def get_all_budgets(db:Session, limit: int = DEFAULT_PAGE_SIZE, after_id: int | None = None):
+    """Retrieve one page of budgets from the database.
 
     Args:
         db (Session): SQLAlchemy database session.  
+        limit (int): Maximum number of budgets to return.
+        after_id (int, optional): Return budgets with an id greater than this.
     Returns:
-        List[Budget]: A list of all Budget objects.     
+        tuple[List[dict], str | None]: The page of budgets and the next cursor.
         
     """
-    all_budgets = db.query(Budget).all()
-    return all_budgets
+    def load():
+        # Plain column tuples: the dicts are built without ORM objects.
+        rows, next_cursor = keyset_paginate(
+            db.query(Budget.id, Budget.name, Budget.amount, Budget.spent), Budget.id, limit, after_id
+        )
+        return [
+            {
+                "id": row.id,
+                "name": row.name,
+                "amount": str(row.amount),
+                "spent": str(row.spent),
+                "remaining": str(row.amount - row.spent),
+            }
+            for row in rows
+        ], next_cursor
+
+    return budget_cache.get_or_load(("page", limit, after_id), load)
 
 def get_specific_budget(db:Session, budget_id:int):
     """Retrieve a specific budget by its ID.
@@ -24,12 +45,18 @@ def get_specific_budget(db:Session, budget_id:int):
         budget_id (int): The ID of the budget to retrieve.
 
     Returns:
-        Budget: The Budget object with the specified ID, or None if not found.
+        dict: The serialized budget with the specified ID.
+
+    Raises:
+        HTTPException: If the budget is not found (404).
     """
-    specific_budget = db.query(Budget).filter(Budget.id == budget_id).first()
-    if not specific_budget:
-        raise HTTPException({"message": "Budget not found", "code": 404})
-    return specific_budget
+    def load():
+        specific_budget = db.query(Budget).filter(Budget.id == budget_id).first()
+        if not specific_budget:
+            raise HTTPException(status_code=404, detail={"message": "Budget not found", "code": 404})
+        return BudgetOut.model_validate(specific_budget).model_dump(mode="json")
+
+    return budget_cache.get_or_load(budget_id, load)
 
 
 def create_budget(budget:Budget, db:Session):
@@ -45,6 +72,8 @@ def create_budget(budget:Budget, db:Session):
     if budget is None:
         raise HTTPException(status_code=400, detail="Budget payload is required")
     db.add(budget)
+    invalidate_on_commit(db, budget_cache, report_cache)
+    mark_changed(db, Budget)
     db.commit()
     db.refresh(budget)
     return budget
\ No newline at end of file
@@ -1,23 +1,38 @@
 from fastapi import HTTPException
+from src.app.cache import category_cache, invalidate_on_commit, report_cache
 from src.app.models.expense import Category
+from src.app.schema.expense import CategoryOut
 from sqlalchemy.orm import Session
+from src.app.pagination import DEFAULT_PAGE_SIZE, keyset_paginate
+from src.app.services.version_services import mark_changed
 
 
-def get_all_categories(db: Session):
-    all_categories = db.query(Category).all()
-    return all_categories
+def get_all_categories(db: Session, limit: int = DEFAULT_PAGE_SIZE, after_id: int | None = None):
+    def load():
+        # Plain column tuples: the dicts are built without ORM objects.
+        rows, next_cursor = keyset_paginate(
+            db.query(Category.id, Category.name, Category.spent), Category.id, limit, after_id
+        )
+        return [{"id": row.id, "name": row.name, "spent": str(row.spent)} for row in rows], next_cursor
+
+    return category_cache.get_or_load(("page", limit, after_id), load)
 
 def get_specific_category(category_id: int, db: Session):
-    specific_category = db.query(Category).filter(Category.id == category_id).first()
-    if not specific_category:
-        raise HTTPException(status_code=404, detail="Category not found")
-    return specific_category
+    def load():
+        specific_category = db.query(Category).filter(Category.id == category_id).first()
+        if not specific_category:
+            raise HTTPException(status_code=404, detail="Category not found")
+        return CategoryOut.model_validate(specific_category).model_dump(mode="json")
+
+    return category_cache.get_or_load(category_id, load)
 
 
 def create_category(category:Category, db: Session):
     if category is None:
         raise HTTPException(status_code=400, detail="Category payload is required")
     db.add(category)
+    invalidate_on_commit(db, category_cache, report_cache)
+    mark_changed(db, Category)
     db.commit()
     db.refresh(category)
     return category
@@ -1,19 +1,162 @@
+import os
+from datetime import datetime
+from decimal import Decimal
+
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from src.app.cache import expense_cache, invalidate_on_commit, report_cache
+from src.app.models.expense import Budget, Category, Expense
+from src.app.schema.expense import ExpenseIn, ExpenseOut, format_timestamp
+from src.app.pagination import DEFAULT_PAGE_SIZE, keyset_paginate
+from src.app.services.rollup_services import adjust_rollups
+from src.app.services.totals_services import adjust_spent
+from src.app.services.version_services import mark_changed
+
+# Related rows embedded in ExpenseOut are loaded together with the expenses
+# (never lazily per row): "selectin" issues one extra IN query per relation,
+# "joined" folds both into the main query with LEFT OUTER JOINs. They must be
+# loaded while the session is active; in async mode a lazy load during response
+# serialization would fail.
+EAGER_LOADING_STRATEGIES = {
+    "selectin": selectinload,
+    "joined": joinedload,
+}
+EXPENSE_EAGER_LOADING = os.getenv("EXPENSE_EAGER_LOADING", "selectin")
+if EXPENSE_EAGER_LOADING not in EAGER_LOADING_STRATEGIES:
+    raise ValueError(
+        "EXPENSE_EAGER_LOADING must be one of: " + ", ".join(EAGER_LOADING_STRATEGIES)
+    )
+
+
+def _expense_load_options():
+    loader = EAGER_LOADING_STRATEGIES[EXPENSE_EAGER_LOADING]
+    return (loader(Expense.category), loader(Expense.budget))
 
-from src.app.models.expense import Expense
 
-def get_all_expenses(db: Session):
-    """Retrieve all budgets from the database.
+def get_all_expenses(
+    db: Session,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after_id: int | None = None,
+    category_id: int | None = None,
+    budget_id: int | None = None,
+    min_amount: Decimal | None = None,
+    max_amount: Decimal | None = None,
+    name_prefix: str | None = None,
+    spent_from: datetime | None = None,
+    spent_to: datetime | None = None,
+):
+    """Retrieve one page of expenses, optionally filtered.
+
+    All filters are applied in SQL; pages are keyed on ``Expense.id``.
 
     Args:
-        db (Session): SQLAlchemy database session.  
+        db (Session): SQLAlchemy database session.
+        limit (int): Maximum number of expenses to return.
+        after_id (int, optional): Return expenses with an id greater than this.
+        category_id (int, optional): Only expenses in this category.
+        budget_id (int, optional): Only expenses charged to this budget.
+        min_amount (Decimal, optional): Inclusive lower bound on the amount.
+        max_amount (Decimal, optional): Inclusive upper bound on the amount.
+        name_prefix (str, optional): Only expenses whose name starts with this.
+        spent_from (datetime, optional): Only expenses spent at or after this (UTC).
+        spent_to (datetime, optional): Only expenses spent before this (UTC).
+
+    Returns:
+        tuple[List[Expense], str | None]: The page of expenses and the next cursor.
+    """
+    query = _filter_expenses(
+        db.query(Expense).options(*_expense_load_options()),
+        category_id, budget_id, min_amount, max_amount, name_prefix, spent_from, spent_to,
+    )
+    return keyset_paginate(query, Expense.id, limit, after_id)
+
+
+def _filter_expenses(query, category_id, budget_id, min_amount, max_amount, name_prefix, spent_from, spent_to):
+    if category_id is not None:
+        query = query.filter(Expense.category_id == category_id)
+    if budget_id is not None:
+        query = query.filter(Expense.budget_id == budget_id)
+    if min_amount is not None:
+        query = query.filter(Expense.amount >= min_amount)
+    if max_amount is not None:
+        query = query.filter(Expense.amount <= max_amount)
+    if name_prefix:
+        query = query.filter(Expense.name.startswith(name_prefix, autoescape=True))
+    if spent_from is not None:
+        query = query.filter(Expense.spent_at >= spent_from)
+    if spent_to is not None:
+        query = query.filter(Expense.spent_at < spent_to)
+    return query
+
+
+def get_expense_rows(
+    db: Session,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after_id: int | None = None,
+    category_id: int | None = None,
+    budget_id: int | None = None,
+    min_amount: Decimal | None = None,
+    max_amount: Decimal | None = None,
+    name_prefix: str | None = None,
+    spent_from: datetime | None = None,
+    spent_to: datetime | None = None,
+):
+    """Like :func:`get_all_expenses`, but as JSON-ready dicts shaped like ``ExpenseOut``.
+
+    Only the columns of the schema are selected and no ORM objects are built:
+    the expenses carry their foreign keys, and each distinct category and
+    budget of the page is read once (one ``IN`` query each) and shared by the
+    rows referencing it. Used by the fast JSON path.
+
     Returns:
-        List[Expense]: A list of all Budget objects.     
-        
+        tuple[List[dict], str | None]: The page of expenses and the next cursor.
     """
-    all_expenses = db.query(Expense).all()
-    return all_expenses
+    query = _filter_expenses(
+        db.query(
+            Expense.id,
+            Expense.name,
+            Expense.amount,
+            Expense.spent_at,
+            Expense.created_at,
+            Expense.category_id,
+            Expense.budget_id,
+        ),
+        category_id, budget_id, min_amount, max_amount, name_prefix, spent_from, spent_to,
+    )
+    rows, next_cursor = keyset_paginate(query, Expense.id, limit, after_id)
+
+    category_ids = {row.category_id for row in rows} - {None}
+    budget_ids = {row.budget_id for row in rows} - {None}
+    categories = {
+        id_: {"id": id_, "name": name, "spent": str(spent)}
+        for id_, name, spent in (
+            db.query(Category.id, Category.name, Category.spent).filter(Category.id.in_(category_ids))
+            if category_ids else ()
+        )
+    }
+    budgets = {
+        id_: {"id": id_, "name": name, "amount": str(amount), "spent": str(spent), "remaining": str(amount - spent)}
+        for id_, name, amount, spent in (
+            db.query(Budget.id, Budget.name, Budget.amount, Budget.spent).filter(Budget.id.in_(budget_ids))
+            if budget_ids else ()
+        )
+    }
+    return [
+        {
+            "id": id_,
+            "name": name,
+            "amount": str(amount),
+            "spent_at": format_timestamp(spent_at),
+            "created_at": format_timestamp(created_at),
+            "category": categories.get(category_id),
+            "budget": budgets.get(budget_id),
+        }
+        for id_, name, amount, spent_at, created_at, category_id, budget_id in rows
+    ], next_cursor
+
 
 def get_specific_expense(db: Session, expense_id: int):
     """Retrieve a specific expense by its ID.
@@ -25,7 +168,12 @@ def get_specific_expense(db: Session, expense_id: int):
     Returns:
         Expense: The Expense object with the specified ID, or None if not found.
     """
-    specific_expense = db.query(Expense).filter(Expense.id == expense_id).first()
+    specific_expense = (
+        db.query(Expense)
+        .options(*_expense_load_options())
+        .filter(Expense.id == expense_id)
+        .first()
+    )
     if not specific_expense:
         raise HTTPException(
             status_code=404,
@@ -33,6 +181,40 @@ def get_specific_expense(db: Session, expense_id: int):
         )
     return specific_expense
 
+
+def get_expense_detail(db: Session, expense_id: int) -> dict:
+    """Retrieve a serialized expense, served from the shared cache when possible.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        expense_id (int): The ID of the expense to retrieve.
+
+    Returns:
+        dict: The expense as returned by the API.
+    """
+    return expense_cache.get_or_load(
+        expense_id,
+        lambda: ExpenseOut.model_validate(get_specific_expense(db, expense_id)).model_dump(mode="json"),
+    )
+
+
+def _record_write(db: Session):
+    # Cached expenses embed their budget's running total, and reports aggregate
+    # every expense, so any expense write invalidates both namespaces.
+    invalidate_on_commit(db, expense_cache, report_cache)
+    mark_changed(db, Expense)
+
+def _get_expense_for_write(db: Session, expense_id: int) -> Expense:
+    """Load an expense without its relations, raising 404 if it is missing."""
+    expense = db.query(Expense).filter(Expense.id == expense_id).first()
+    if not expense:
+        raise HTTPException(
+            status_code=404,
+            detail={"message": "Expense not found", "code": 404},
+        )
+    return expense
+
+
 def create_expense(expense: Expense, db: Session):
     """Create a new expense in the database.
 
@@ -46,6 +228,159 @@ def create_expense(expense: Expense, db: Session):
     if expense is None:
         raise HTTPException(status_code=400, detail="Expense payload is required")
     db.add(expense)
+    db.flush()
+    expense_id = expense.id
+    adjust_spent(db, [(expense.category_id, expense.budget_id, expense.amount)])
+    adjust_rollups(db, [(expense.spent_at, expense.category_id, expense.budget_id, expense.amount, 1)])
+    _record_write(db)
     db.commit()
-    db.refresh(expense)
-    return expense
+    return get_specific_expense(db, expense_id)
+
+
+def update_expense(expense_id: int, expense_in, db: Session):
+    """Update an existing expense in the database.
+
+    Args:
+        expense_id (int): The ID of the expense to update.
+        expense_in (ExpenseIn): The updated expense data.
+        db (Session): SQLAlchemy database session.
+
+    Returns:
+        Expense: The updated Expense object.
+    """
+    expense = _get_expense_for_write(db, expense_id)
+    previous = (expense.category_id, expense.budget_id, -expense.amount)
+    previous_rollup = (expense.spent_at, *previous, -1)
+
+    # Update fields from the input schema. ExpenseIn uses category_id and budget_id
+    expense.name = expense_in.name
+    expense.amount = expense_in.amount
+    # Some clients may omit category_id or budget_id, so handle that defensively
+    try:
+        expense.category_id = expense_in.category_id
+    except AttributeError:
+        # if ExpenseIn doesn't include category_id, skip assignment
+        pass
+
+    try:
+        expense.budget_id = expense_in.budget_id
+    except AttributeError:
+        pass
+    # spent_at defaults to now; keep the recorded date unless one was sent.
+    if "spent_at" in expense_in.model_fields_set:
+        expense.spent_at = expense_in.spent_at
+
+    # Move the amount between running totals (same budget: just the difference).
+    adjust_spent(db, [previous, (expense.category_id, expense.budget_id, expense.amount)])
+    adjust_rollups(
+        db, [previous_rollup, (expense.spent_at, expense.category_id, expense.budget_id, expense.amount, 1)]
+    )
+    _record_write(db)
+    db.commit()
+    # Reload with relations; expire first so a moved category/budget is re-read.
+    db.expire(expense)
+    return get_specific_expense(db, expense_id)
+
+
+def delete_expense(expense_id: int, db: Session):
+    """Delete an expense from the database.
+
+    Args:
+        expense_id (int): The ID of the expense to delete.
+        db (Session): SQLAlchemy database session.
+    """
+    expense = _get_expense_for_write(db, expense_id)
+    db.delete(expense)
+    adjust_spent(db, [(expense.category_id, expense.budget_id, -expense.amount)])
+    adjust_rollups(db, [(expense.spent_at, expense.category_id, expense.budget_id, -expense.amount, -1)])
+    _record_write(db)
+    db.commit()
+
+
+def validate_bulk_rows(items: list) -> tuple[list[tuple[int, dict]], list[dict]]:
+    """Validate the rows of a bulk import against ``ExpenseIn``.
+
+    Args:
+        items (list): Decoded rows; ``None`` marks a row that could not be decoded.
+
+    Returns:
+        tuple: ``(index, values)`` pairs of the valid rows and the per-row errors.
+    """
+    valid = []
+    errors = []
+    for index, item in enumerate(items):
+        if item is None:
+            errors.append({"index": index, "errors": [{"loc": [], "msg": "Invalid JSON"}]})
+            continue
+        try:
+            valid.append((index, ExpenseIn.model_validate(item).model_dump()))
+        except ValidationError as exc:
+            errors.append(
+                {
+                    "index": index,
+                    "errors": [
+                        {"loc": list(error["loc"]), "msg": error["msg"]}
+                        for error in exc.errors(include_url=False)
+                    ],
+                }
+            )
+    return valid, errors
+
+
+def bulk_create_expenses(rows: list[tuple[int, dict]], db: Session):
+    """Insert many expenses in one transaction.
+
+    Category and budget references are checked with one query each, so a bad
+    reference rejects only its row instead of failing the whole INSERT. The
+    remaining rows are written with a single multi-row ``INSERT ... RETURNING``.
+
+    Args:
+        rows (list[tuple[int, dict]]): ``(index, values)`` pairs of validated rows.
+        db (Session): SQLAlchemy database session.
+
+    Returns:
+        tuple[list[dict], list[dict]]: The created ``{index, id}`` pairs and the rejected rows.
+    """
+    category_ids = {values["category_id"] for _, values in rows}
+    budget_ids = {values["budget_id"] for _, values in rows if values["budget_id"] is not None}
+    known_categories = set(
+        db.scalars(select(Category.id).where(Category.id.in_(category_ids)))
+    ) if category_ids else set()
+    known_budgets = set(
+        db.scalars(select(Budget.id).where(Budget.id.in_(budget_ids)))
+    ) if budget_ids else set()
+
+    accepted = []
+    errors = []
+    for index, values in rows:
+        row_errors = []
+        if values["category_id"] not in known_categories:
+            row_errors.append({"loc": ["category_id"], "msg": "Category not found"})
+        if values["budget_id"] is not None and values["budget_id"] not in known_budgets:
+            row_errors.append({"loc": ["budget_id"], "msg": "Budget not found"})
+        if row_errors:
+            errors.append({"index": index, "errors": row_errors})
+        else:
+            accepted.append((index, values))
+
+    created = []
+    if accepted:
+        ids = db.scalars(
+            insert(Expense).returning(Expense.id, sort_by_parameter_order=True),
+            [values for _, values in accepted],
+        ).all()
+        adjust_spent(
+            db,
+            ((values["category_id"], values["budget_id"], values["amount"]) for _, values in accepted),
+        )
+        adjust_rollups(
+            db,
+            (
+                (values["spent_at"], values["category_id"], values["budget_id"], values["amount"], 1)
+                for _, values in accepted
+            ),
+        )
+        _record_write(db)
+        db.commit()
+        created = [{"index": index, "id": id_} for (index, _), id_ in zip(accepted, ids)]
+    return created, errors
@@ -0,0 +1,154 @@
+"""Streaming export of the expense ledger.
+
+Rows are read through a server-side cursor (``yield_per``) and encoded batch by
+batch, so memory use stays flat no matter how many expenses are exported.
+"""
+
+import csv
+import io
+import json
+import zlib
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.app.models.expense import Budget, Category, Expense
+from src.app.schema.expense import format_timestamp
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = (
+    "id",
+    "name",
+    "amount",
+    "category_id",
+    "category_name",
+    "budget_id",
+    "budget_name",
+    "spent_at",
+    "created_at",
+)
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _export_statement():
+    return (
+        select(
+            Expense.id,
+            Expense.name,
+            Expense.amount,
+            Expense.category_id,
+            Category.name.label("category_name"),
+            Expense.budget_id,
+            Budget.name.label("budget_name"),
+            Expense.spent_at,
+            Expense.created_at,
+        )
+        .outerjoin(Category, Expense.category_id == Category.id)
+        .outerjoin(Budget, Expense.budget_id == Budget.id)
+        .order_by(Expense.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+
+def _values(row) -> tuple:
+    # Timestamps as ISO-8601 UTC text (2025-01-31T12:00:00Z), as in the API.
+    *values, spent_at, created_at = row
+    return (*values, format_timestamp(spent_at), format_timestamp(created_at))
+
+
+def _encode_ndjson(rows) -> str:
+    lines = []
+    for row in rows:
+        record = dict(zip(EXPORT_COLUMNS, _values(row)))
+        # Amounts are exported as exact decimal strings, not floats.
+        record["amount"] = str(record["amount"])
+        lines.append(json.dumps(record, separators=(",", ":")))
+    lines.append("")
+    return "\n".join(lines)
+
+
+def _encode_csv(rows, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(map(_values, rows))
+    return buffer.getvalue()
+
+
+class _Encoder:
+    """Turns batches of rows into (optionally gzip-compressed) byte chunks."""
+
+    def __init__(self, fmt: str, compress: bool):
+        if fmt not in MEDIA_TYPES:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        self.fmt = fmt
+        self.header_pending = fmt == "csv"
+        # wbits=31 writes a gzip container instead of a raw zlib stream.
+        self.compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+
+    def encode(self, rows) -> bytes:
+        if self.fmt == "ndjson":
+            chunk = _encode_ndjson(rows)
+        else:
+            chunk = _encode_csv(rows, header=self.header_pending)
+            self.header_pending = False
+        data = chunk.encode()
+        return self.compressor.compress(data) if self.compressor else data
+
+    def finish(self) -> bytes:
+        data = b""
+        if self.header_pending:
+            data = self.encode([])
+        if self.compressor:
+            data += self.compressor.flush()
+        return data
+
+
+def iter_expense_export(db: Session, fmt: str = "ndjson", compress: bool = False):
+    """Yield the expense ledger as NDJSON or CSV byte chunks.
+
+    The route's session has already been released when the body is streamed
+    (dependency teardown runs first); a closed ``Session`` can be used again,
+    so this generator checks out a connection for the stream and closes the
+    session when done.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        fmt (str): "ndjson" or "csv".
+        compress (bool): Gzip the stream on the fly.
+    """
+    encoder = _Encoder(fmt, compress)
+    try:
+        result = db.execute(_export_statement())
+        for rows in result.partitions():
+            chunk = encoder.encode(rows)
+            if chunk:
+                yield chunk
+        tail = encoder.finish()
+        if tail:
+            yield tail
+    finally:
+        db.close()
+
+
+async def aiter_expense_export(db: AsyncSession, fmt: str = "ndjson", compress: bool = False):
+    """Async counterpart of :func:`iter_expense_export` for ``AsyncSession``."""
+    encoder = _Encoder(fmt, compress)
+    try:
+        result = await db.stream(_export_statement())
+        async for rows in result.partitions():
+            chunk = encoder.encode(rows)
+            if chunk:
+                yield chunk
+        tail = encoder.finish()
+        if tail:
+            yield tail
+    finally:
+        await db.close()
@@ -0,0 +1,163 @@
+"""``Idempotency-Key`` support for the create endpoints.
+
+A client that retries ``POST /expenses`` (or ``/categories``, ``/budgets``)
+with the same ``Idempotency-Key`` header gets the row created by the first
+attempt instead of a duplicate. Keys are scoped to the user and route, and
+stored as a SHA-256 digest together with a digest of the request body, the id
+of the created row and an expiry (``IDEMPOTENCY_KEY_TTL`` seconds, one day by
+default). The key row is inserted in the same transaction as the created row,
+so a key exists exactly when its row does.
+
+Concurrent requests with the same key: on Postgres the second one waits on a
+transaction-level advisory lock of that key only, then replays. Elsewhere the
+second insert of the key fails at commit, its transaction is rolled back and
+the first attempt's row is replayed.
+
+Expired keys are deleted every ``IDEMPOTENCY_PURGE_INTERVAL`` seconds while
+the app runs.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, event, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.app.models.expense import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_KEY_TTL = float(os.getenv("IDEMPOTENCY_KEY_TTL", "86400"))
+IDEMPOTENCY_PURGE_INTERVAL = float(os.getenv("IDEMPOTENCY_PURGE_INTERVAL", "3600"))
+
+_PENDING_KEY = "pending_idempotency_keys"
+
+
+def request_key(key: str, user: str, route: str) -> bytes:
+    """Digest identifying ``key`` as sent by ``user`` to ``route``."""
+    return hashlib.sha256(f"{user}\0{route}\0{key}".encode()).digest()
+
+
+def fingerprint(payload) -> bytes:
+    """Digest of a validated request body (a pydantic model), as sent.
+
+    Unset fields are left out: defaults such as ``spent_at`` differ per attempt.
+    """
+    return hashlib.sha256(payload.model_dump_json(exclude_unset=True).encode()).digest()
+
+
+def _lock_key(db: Session, digest: bytes) -> None:
+    if db.get_bind().dialect.name != "postgresql":
+        return  # SQLite serializes writers; the key's primary key catches the rest.
+    # The bigint form with 64 bits of the digest: unrelated keys practically
+    # never share a lock (the two-int4 form would leave 32 bits).
+    db.execute(
+        text("SELECT pg_advisory_xact_lock(:key)"),
+        {"key": int.from_bytes(digest[:8], "big", signed=True)},
+    )
+
+
+def _find(db: Session, digest: bytes) -> IdempotencyKey | None:
+    stored = db.get(IdempotencyKey, digest, populate_existing=True)
+    if stored is None:
+        return None
+    expires_at = stored.expires_at
+    if expires_at.tzinfo is None:  # read back naive from SQLite
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    if expires_at <= datetime.now(timezone.utc):
+        db.delete(stored)
+        db.flush()
+        return None
+    return stored
+
+
+def _replay(stored: IdempotencyKey, request_fingerprint: bytes) -> int:
+    if stored.fingerprint != request_fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used with a different request",
+        )
+    return stored.resource_id
+
+
+def create_once(key: str | None, user: str, route: str, payload, instance, create, load, db: Session):
+    """Create ``instance`` unless ``key`` was seen before; return the row and whether it was replayed.
+
+    Args:
+        key (str | None): The ``Idempotency-Key`` header; ``None`` just creates.
+        user (str): Who sent the request.
+        route (str): Name of the create route.
+        payload: The validated request body.
+        instance: The new ORM object, e.g. ``Expense(...)``.
+        create: The service creating it, called as ``create(instance, db)``.
+        load: Called as ``load(db, id)`` to return an existing row when replaying.
+        db (Session): SQLAlchemy database session.
+
+    Returns:
+        tuple: The created (or earlier) row and ``True`` when replayed.
+    """
+    if key is None:
+        return create(instance, db), False
+
+    digest = request_key(key, user, route)
+    request_fingerprint = fingerprint(payload)
+    _lock_key(db, digest)
+    stored = _find(db, digest)
+    if stored is not None:
+        return load(db, _replay(stored, request_fingerprint)), True
+
+    db.info.setdefault(_PENDING_KEY, []).append((digest, request_fingerprint, instance))
+    try:
+        return create(instance, db), False
+    except (IntegrityError, HTTPException):
+        # A concurrent request with the key may have committed first.
+        db.rollback()
+        stored = _find(db, digest)
+        if stored is None:
+            raise
+        return load(db, _replay(stored, request_fingerprint)), True
+    finally:
+        db.info.pop(_PENDING_KEY, None)
+
+
+@event.listens_for(Session, "before_commit")
+def _store_pending_keys(session):
+    pending = session.info.pop(_PENDING_KEY, ())
+    if not pending:
+        return
+    session.flush()  # assigns the ids of the created rows
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=IDEMPOTENCY_KEY_TTL)
+    session.add_all(
+        IdempotencyKey(key=digest, fingerprint=request_fingerprint, resource_id=instance.id, expires_at=expires_at)
+        for digest, request_fingerprint, instance in pending
+    )
+
+
+def purge_expired_keys(db: Session) -> int:
+    """Delete the expired keys; return how many there were."""
+    result = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.now(timezone.utc)))
+    db.commit()
+    return result.rowcount
+
+
+async def maintain_idempotency_keys(session_factory, interval: float = IDEMPOTENCY_PURGE_INTERVAL) -> None:
+    """Delete expired idempotency keys for as long as the app runs."""
+
+    def purge():
+        with session_factory() as db:
+            return purge_expired_keys(db)
+
+    while True:
+        try:
+            purged = await asyncio.to_thread(purge)
+        except Exception:
+            logger.warning("Purging expired idempotency keys failed", exc_info=True)
+        else:
+            if purged:
+                logger.info("Purged %d expired idempotency keys", purged)
+        await asyncio.sleep(interval)
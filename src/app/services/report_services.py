@@ -0,0 +1,148 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Numeric, cast, func, literal_column, select, type_coerce
+from sqlalchemy.orm import Session
+
+from src.app.models.expense import Budget, Category, Expense
+from src.app.services import rollup_services
+
+GROUP_BY_COLUMNS = {
+    "category": Expense.category_id,
+    "budget": Expense.budget_id,
+}
+
+TIME_BUCKETS = ("day", "week", "month")
+
+# SQLite has no date_trunc; it stores the UTC timestamps as ISO text, which
+# strftime truncates (a week starts on Monday, as with date_trunc).
+_SQLITE_BUCKETS = {
+    "day": ("%Y-%m-%d 00:00:00",),
+    "week": ("%Y-%m-%d 00:00:00", "weekday 0", "-6 days"),
+    "month": ("%Y-%m-01 00:00:00",),
+}
+
+
+# Sums and averages come back with two decimal places on every backend.
+MONEY = Numeric(14, 2)
+
+
+def _aggregates(amount):
+    return (
+        cast(func.coalesce(func.sum(amount), 0), MONEY).label("total"),
+        func.count(amount).label("count"),
+        cast(func.round(func.avg(amount), 2), MONEY).label("average"),
+        func.min(amount).label("minimum"),
+        func.max(amount).label("maximum"),
+    )
+
+
+def get_spend_summary(db: Session, group_by: list[str]):
+    """Aggregate spending with SQL ``GROUP BY``.
+
+    Grouping by a single dimension starts from the categories/budgets table so
+    that entries without expenses are reported with zero spend; grouping by
+    budget also returns the budget amount and what remains of it.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        group_by (list[str]): Any of "category" and "budget".
+
+    Returns:
+        dict: The grouped rows and the overall totals.
+    """
+    dimensions = [name for name in GROUP_BY_COLUMNS if name in group_by]
+
+    if dimensions == ["budget"]:
+        stmt = (
+            select(
+                Budget.id.label("budget_id"),
+                Budget.amount.label("budget_amount"),
+                *_aggregates(Expense.amount),
+            )
+            .outerjoin(Expense, Expense.budget_id == Budget.id)
+            .group_by(Budget.id, Budget.amount)
+            .order_by(Budget.id)
+        )
+    elif dimensions == ["category"]:
+        stmt = (
+            select(Category.id.label("category_id"), *_aggregates(Expense.amount))
+            .outerjoin(Expense, Expense.category_id == Category.id)
+            .group_by(Category.id)
+            .order_by(Category.id)
+        )
+    else:
+        columns = [GROUP_BY_COLUMNS[name].label(f"{name}_id") for name in dimensions]
+        stmt = (
+            select(*columns, *_aggregates(Expense.amount))
+            .group_by(*columns)
+            .order_by(*columns)
+        )
+
+    groups = []
+    for row in db.execute(stmt).mappings():
+        group = dict(row)
+        if "budget_amount" in group:
+            group["remaining"] = group["budget_amount"] - group["total"]
+        groups.append(group)
+
+    totals = db.execute(select(*_aggregates(Expense.amount))).mappings().one()
+    return {"group_by": dimensions, "groups": groups, "totals": dict(totals)}
+
+
+def _bucket_start(db: Session, bucket: str):
+    if bucket not in TIME_BUCKETS:
+        raise ValueError(f"Unsupported time bucket {bucket!r}")
+    if db.get_bind().dialect.name == "sqlite":
+        fmt, *modifiers = _SQLITE_BUCKETS[bucket]
+        return type_coerce(func.strftime(fmt, Expense.spent_at, *modifiers), DateTime())
+    # Inline constants, so that Postgres sees the same expression in SELECT and
+    # GROUP BY (bound parameters would differ); bucket is one of TIME_BUCKETS.
+    return func.date_trunc(
+        literal_column(f"'{bucket}'"), func.timezone(literal_column("'UTC'"), Expense.spent_at)
+    )
+
+
+def get_spend_timeseries(
+    db: Session,
+    bucket: str,
+    group_by: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+):
+    """Total spending per day, week or month with SQL ``GROUP BY``.
+
+    Expenses are selected by ``spent_at`` through ``ix_expenses_spent_at`` and
+    bucketed with ``date_trunc`` in UTC. Buckets without expenses are omitted.
+    Monthly series over whole months are summed from the spend rollups instead
+    when those are built for every month of the range.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        bucket (str): "day", "week" or "month".
+        group_by (str, optional): "category" or "budget" for one series each.
+        start (datetime, optional): Only expenses spent at or after this (UTC).
+        end (datetime, optional): Only expenses spent before this (UTC).
+
+    Returns:
+        dict: The bucket, grouping and points, shaped like ``SpendTimeseries``.
+    """
+    if bucket == "month" and rollup_services.rollups_cover(db, start, end):
+        points = rollup_services.get_monthly_timeseries(db, group_by=group_by, start=start, end=end)
+        return {"bucket": bucket, "group_by": group_by, "points": points}
+
+    period = _bucket_start(db, bucket).label("period")
+    keys = [GROUP_BY_COLUMNS[group_by].label(f"{group_by}_id")] if group_by else []
+    query = select(
+        period,
+        *keys,
+        cast(func.sum(Expense.amount), MONEY).label("total"),
+        func.count().label("count"),
+    )
+    if start is not None:
+        query = query.where(Expense.spent_at >= start)
+    if end is not None:
+        query = query.where(Expense.spent_at < end)
+    query = query.group_by(period, *keys).order_by(period, *keys)
+
+    points = [dict(row) for row in db.execute(query).mappings()]
+    return {"bucket": bucket, "group_by": group_by, "points": points}
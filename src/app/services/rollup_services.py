@@ -0,0 +1,311 @@
+"""Monthly spend rollups: maintained incrementally, rebuilt per period.
+
+``spend_rollups`` holds the total and count of expenses per UTC month,
+category and budget. The expense services upsert their deltas in the same
+transaction as every write (:func:`adjust_rollups`), so a rollup stays exact
+once its month has been rebuilt from the expenses (:func:`rebuild_period`),
+which records the month in ``spend_rollup_periods``.
+
+Months are rebuilt by :func:`refresh_rollups`: every month from the oldest
+expense through ``ROLLUP_MONTHS_AHEAD`` months from now that was never built,
+at startup and every ``ROLLUP_REFRESH_INTERVAL`` seconds, or on demand with
+``python -m src.app.commands.refresh_rollups`` (e.g. after writing expenses
+with plain SQL). Reports only read rollups whose months are all built
+(:func:`rollups_cover`) and fall back to ``GROUP BY`` over the expenses
+otherwise.
+"""
+
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy import Date, cast, delete, func, insert, literal, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from src.app.cache import invalidate_on_commit, report_cache
+from src.app.database.partitions import add_months, month_start
+from src.app.models.expense import Expense, SpendRollup, SpendRollupPeriod
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_REPORTS = os.getenv("ROLLUP_REPORTS", "1") == "1"
+ROLLUP_MONTHS_AHEAD = int(os.getenv("ROLLUP_MONTHS_AHEAD", "3"))
+ROLLUP_REFRESH_INTERVAL = float(os.getenv("ROLLUP_REFRESH_INTERVAL", "3600"))
+
+NO_BUDGET = 0
+
+# Namespace of the per-month advisory locks (Postgres): writers share the
+# month's lock, a rebuild takes it exclusively so no delta lands in between.
+_LOCK_NAMESPACE = 0x726F6C6C
+
+
+def period_of(spent_at: datetime) -> date:
+    """UTC month of ``spent_at`` (naive values, as read from SQLite, are UTC)."""
+    if spent_at.tzinfo is not None:
+        spent_at = spent_at.astimezone(timezone.utc)
+    return month_start(spent_at)
+
+
+def _period_bounds(period: date) -> tuple[datetime, datetime]:
+    end = add_months(period, 1)
+    return (
+        datetime(period.year, period.month, 1, tzinfo=timezone.utc),
+        datetime(end.year, end.month, 1, tzinfo=timezone.utc),
+    )
+
+
+def _lock_periods(db: Session, periods, shared: bool) -> None:
+    if db.get_bind().dialect.name != "postgresql":
+        return  # SQLite serializes writers on the database lock.
+    function = "pg_advisory_xact_lock_shared" if shared else "pg_advisory_xact_lock"
+    for period in sorted(periods):
+        db.execute(
+            text(f"SELECT {function}(:namespace, :key)"),
+            {"namespace": _LOCK_NAMESPACE, "key": period.year * 12 + period.month},
+        )
+
+
+def adjust_rollups(db: Session, changes):
+    """Add expenses (or remove them, with negative deltas) to the rollups.
+
+    Args:
+        db (Session): SQLAlchemy database session; the caller commits.
+        changes: Iterable of ``(spent_at, category_id, budget_id, amount, count)``
+            tuples, e.g. ``count=-1`` and a negative amount for a deletion.
+    """
+    deltas = defaultdict(lambda: [Decimal(0), 0])
+    for spent_at, category_id, budget_id, amount, count in changes:
+        if not isinstance(amount, Decimal):
+            amount = Decimal(str(amount))
+        delta = deltas[(period_of(spent_at), category_id, NO_BUDGET if budget_id is None else budget_id)]
+        delta[0] += amount
+        delta[1] += count
+    # Sorted so concurrent writers lock rows in the same order (no deadlocks).
+    rows = [
+        {"period": key[0], "category_id": key[1], "budget_id": key[2], "total": total, "count": count}
+        for key, (total, count) in sorted(deltas.items())
+        if total or count
+    ]
+    if not rows:
+        return
+    _lock_periods(db, {row["period"] for row in rows}, shared=True)
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = dialect_insert(SpendRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SpendRollup.period, SpendRollup.category_id, SpendRollup.budget_id],
+        set_={
+            "total": SpendRollup.total + stmt.excluded.total,
+            "count": SpendRollup.count + stmt.excluded.count,
+        },
+    )
+    db.execute(stmt, rows)
+
+
+def _grouped_expenses(period: date):
+    """``GROUP BY`` of the expenses of ``period``, shaped like ``spend_rollups``."""
+    start, end = _period_bounds(period)
+    budget_id = func.coalesce(Expense.budget_id, NO_BUDGET)
+    return (
+        select(
+            literal(period, Date).label("period"),
+            Expense.category_id,
+            budget_id.label("budget_id"),
+            cast(func.sum(Expense.amount), SpendRollup.total.type).label("total"),
+            func.count().label("count"),
+        )
+        .where(Expense.spent_at >= start, Expense.spent_at < end)
+        .group_by(Expense.category_id, budget_id)
+    )
+
+
+def rebuild_period(db: Session, period: date):
+    """Recompute the rollups of one month from its expenses and mark it built.
+
+    Args:
+        db (Session): SQLAlchemy database session; the caller commits.
+        period (date): Any day of the month to rebuild.
+    """
+    period = month_start(period)
+    _lock_periods(db, [period], shared=False)
+    db.execute(delete(SpendRollup).where(SpendRollup.period == period))
+    db.execute(
+        insert(SpendRollup).from_select(
+            ["period", "category_id", "budget_id", "total", "count"], _grouped_expenses(period)
+        )
+    )
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = dialect_insert(SpendRollupPeriod).values(period=period, refreshed_at=datetime.now(timezone.utc))
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[SpendRollupPeriod.period], set_={"refreshed_at": stmt.excluded.refreshed_at}
+        )
+    )
+    invalidate_on_commit(db, report_cache)
+
+
+def _expense_periods(db: Session) -> tuple[date, date] | None:
+    """UTC months of the oldest and newest expense (two index probes)."""
+    # Separate statements: SQLite only answers a lone min() or max() from the index.
+    oldest = db.scalar(select(func.min(Expense.spent_at)))
+    if oldest is None:
+        return None
+    return period_of(oldest), period_of(db.scalar(select(func.max(Expense.spent_at))))
+
+
+def _months(first: date, last: date) -> list[date]:
+    months = []
+    while first <= last:
+        months.append(first)
+        first = add_months(first, 1)
+    return months
+
+
+def refresh_rollups(db: Session, periods=None, months_ahead: int = ROLLUP_MONTHS_AHEAD) -> list[date]:
+    """Rebuild the given months, or every month that was never built.
+
+    Without ``periods`` that is each month from the oldest expense through
+    the newest one, or ``months_ahead`` months from now if that is later. Each month is committed on its own.
+
+    Returns:
+        list[date]: The months rebuilt.
+    """
+    if periods is None:
+        this_month = month_start(datetime.now(timezone.utc).date())
+        first, last = this_month, add_months(this_month, months_ahead)
+        span = _expense_periods(db)
+        if span:
+            first, last = min(first, span[0]), max(last, span[1])
+        built = set(db.scalars(select(SpendRollupPeriod.period)))
+        periods = [month for month in _months(first, last) if month not in built]
+    rebuilt = []
+    for period in sorted({month_start(period) for period in periods}):
+        rebuild_period(db, period)
+        db.commit()
+        rebuilt.append(period)
+    return rebuilt
+
+
+def rollup_drift(db: Session) -> list[dict]:
+    """Compare the rollups of built months with ``GROUP BY`` over the expenses.
+
+    Returns:
+        list[dict]: One entry per differing (period, category, budget), with
+        the recorded and actual totals and counts.
+    """
+    drift = []
+    for period in db.scalars(select(SpendRollupPeriod.period).order_by(SpendRollupPeriod.period)):
+        actual = {
+            (row.category_id, row.budget_id): (row.total, row.count)
+            for row in db.execute(_grouped_expenses(period))
+        }
+        recorded = {
+            (row.category_id, row.budget_id): (row.total, row.count)
+            for row in db.execute(
+                select(SpendRollup.category_id, SpendRollup.budget_id, SpendRollup.total, SpendRollup.count)
+                .where(SpendRollup.period == period)
+            )
+            # Emptied by deletes: same as no row.
+            if row.total or row.count
+        }
+        for category_id, budget_id in sorted(actual.keys() | recorded.keys()):
+            if actual.get((category_id, budget_id)) != recorded.get((category_id, budget_id)):
+                drift.append(
+                    {
+                        "period": period,
+                        "category_id": category_id,
+                        "budget_id": budget_id,
+                        "recorded": recorded.get((category_id, budget_id), (0, 0)),
+                        "actual": actual.get((category_id, budget_id), (0, 0)),
+                    }
+                )
+    return drift
+
+
+def _is_month_start(value: datetime) -> bool:
+    value = value.astimezone(timezone.utc) if value.tzinfo is not None else value
+    return (value.day, value.hour, value.minute, value.second, value.microsecond) == (1, 0, 0, 0, 0)
+
+
+def rollups_cover(db: Session, start: datetime | None = None, end: datetime | None = None) -> bool:
+    """Whether monthly reports over ``[start, end)`` can be read from the rollups.
+
+    The bounds must fall on month starts and every month holding expenses in
+    the range must have been built.
+    """
+    if not ROLLUP_REPORTS:
+        return False
+    if (start is not None and not _is_month_start(start)) or (end is not None and not _is_month_start(end)):
+        return False
+    span = _expense_periods(db)
+    if span is None:
+        return False
+    first, last = span
+    if start is not None:
+        first = max(first, period_of(start))
+    if end is not None:
+        last = min(last, add_months(period_of(end), -1))
+    if first > last:
+        return False
+    built = db.scalar(
+        select(func.count())
+        .select_from(SpendRollupPeriod)
+        .where(SpendRollupPeriod.period >= first, SpendRollupPeriod.period <= last)
+    )
+    return built == len(_months(first, last))
+
+
+def get_monthly_timeseries(
+    db: Session,
+    group_by: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> list[dict]:
+    """Monthly points of the spend time series, summed from the rollups.
+
+    Same points as ``GROUP BY`` over the expenses; call only when
+    :func:`rollups_cover` the range.
+    """
+    keys = []
+    if group_by == "category":
+        keys = [SpendRollup.category_id.label("category_id")]
+    elif group_by == "budget":
+        keys = [func.nullif(SpendRollup.budget_id, NO_BUDGET).label("budget_id")]
+    query = select(
+        SpendRollup.period,
+        *keys,
+        cast(func.sum(SpendRollup.total), SpendRollup.total.type).label("total"),
+        func.sum(SpendRollup.count).label("count"),
+    )
+    if start is not None:
+        query = query.where(SpendRollup.period >= period_of(start))
+    if end is not None:
+        query = query.where(SpendRollup.period < period_of(end))
+    query = query.group_by(SpendRollup.period, *keys).having(func.sum(SpendRollup.count) > 0)
+    points = []
+    for row in db.execute(query.order_by(SpendRollup.period, *keys)).mappings():
+        point = dict(row)
+        point["period"] = _period_bounds(point["period"])[0]
+        points.append(point)
+    return points
+
+
+async def maintain_rollups(session_factory, interval: float = ROLLUP_REFRESH_INTERVAL) -> None:
+    """Build the missing months' rollups for as long as the app runs."""
+
+    def refresh():
+        with session_factory() as db:
+            return refresh_rollups(db)
+
+    while True:
+        try:
+            rebuilt = await asyncio.to_thread(refresh)
+        except Exception:
+            logger.warning("Refreshing spend rollups failed", exc_info=True)
+        else:
+            if rebuilt:
+                logger.info("Rebuilt spend rollups of %s", ", ".join(month.isoformat() for month in rebuilt))
+        await asyncio.sleep(interval)
@@ -0,0 +1,99 @@
+"""Running spend totals on budgets and categories.
+
+``budgets.spent`` and ``categories.spent`` are adjusted in the same
+transaction as every expense write, so reading what a budget has used is a
+primary-key lookup instead of a SUM over its expenses.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from src.app.cache import budget_cache, category_cache, expense_cache, invalidate_on_commit
+from src.app.models.expense import Budget, Category, Expense
+from src.app.services.version_services import mark_changed
+
+
+def _apply(db: Session, model, deltas: dict, cache):
+    keys = sorted(key for key, delta in deltas.items() if key is not None and delta)
+    if keys:
+        # Cached budgets/categories embed the total.
+        invalidate_on_commit(db, cache)
+        mark_changed(db, model)
+    # Sorted so concurrent writers lock rows in the same order (no deadlocks).
+    for key in keys:
+        db.execute(
+            update(model)
+            .where(model.id == key)
+            .values(spent=model.spent + deltas[key])
+            # Expire the total on instances already loaded in this session.
+            .execution_options(synchronize_session="fetch")
+        )
+
+
+def adjust_spent(db: Session, changes):
+    """Add amounts to the running totals.
+
+    Args:
+        db (Session): SQLAlchemy database session; the caller commits.
+        changes: Iterable of ``(category_id, budget_id, delta)`` tuples.
+    """
+    category_deltas = defaultdict(Decimal)
+    budget_deltas = defaultdict(Decimal)
+    for category_id, budget_id, delta in changes:
+        if not isinstance(delta, Decimal):
+            delta = Decimal(str(delta))
+        category_deltas[category_id] += delta
+        budget_deltas[budget_id] += delta
+    _apply(db, Category, category_deltas, category_cache)
+    _apply(db, Budget, budget_deltas, budget_cache)
+
+
+def _drift(db: Session, model, fk):
+    # Typed so SQLite's float sums come back as Decimal and compare exactly.
+    actual = func.coalesce(
+        select(func.sum(Expense.amount)).where(fk == model.id).scalar_subquery(),
+        0,
+        type_=model.spent.type,
+    )
+    rows = db.execute(select(model.id, model.spent, actual.label("actual")).order_by(model.id))
+    return [
+        {"id": row.id, "recorded": row.spent, "actual": row.actual}
+        for row in rows
+        if row.spent != row.actual
+    ], actual
+
+
+def reconcile_spent_totals(db: Session, fix: bool = False) -> dict:
+    """Recompute the running totals from the expenses and report drift.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        fix (bool): Overwrite drifted totals with the recomputed values.
+
+    Returns:
+        dict: Drifted budgets and categories with their recorded and actual totals.
+    """
+    report = {}
+    for name, model, fk, cache in (
+        ("budgets", Budget, Expense.budget_id, budget_cache),
+        ("categories", Category, Expense.category_id, category_cache),
+    ):
+        drifted, actual = _drift(db, model, fk)
+        report[name] = drifted
+        if fix and drifted:
+            # Cached expenses embed their budget and category with the total.
+            invalidate_on_commit(db, cache, expense_cache)
+            mark_changed(db, model)
+            # Recomputed inside the UPDATE so concurrent writes are not lost.
+            db.execute(
+                update(model)
+                .where(model.id.in_([row["id"] for row in drifted]))
+                .values(spent=actual)
+                .execution_options(synchronize_session=False)
+            )
+    if fix:
+        db.commit()
+    return report
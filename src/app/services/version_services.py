@@ -0,0 +1,62 @@
+"""Per-table change counters behind the ETag / Last-Modified validators.
+
+Each counter is split over ``TABLE_VERSION_SHARDS`` rows and read as their
+sum. A single row per table would be locked by every write until it commits,
+queueing all concurrent writers of the table (and, through the running
+totals, every expense writer behind the budgets and categories rows) across
+all workers. With shards, two writes only wait for each other when they bump
+the same one.
+"""
+
+import random
+from datetime import datetime, timezone
+
+from sqlalchemy import event, func, select, update
+from sqlalchemy.orm import Session
+
+from src.app.models.expense import TABLE_VERSION_SHARDS, TableVersion
+
+_PENDING_KEY = "changed_tables"
+
+
+def mark_changed(db: Session, *models) -> None:
+    """Bump the versions of the tables of ``models`` when ``db`` commits."""
+    db.info.setdefault(_PENDING_KEY, set()).update(model.__tablename__ for model in models)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_versions(session):
+    # Bumped last and in name order, inside the write's own transaction: the
+    # new version becomes visible together with the rows it describes. All
+    # tables of a write use the same random shard.
+    tables = sorted(session.info.pop(_PENDING_KEY, ()))
+    if not tables:
+        return
+    shard = random.randrange(TABLE_VERSION_SHARDS)
+    now = datetime.now(timezone.utc)
+    result = session.execute(
+        update(TableVersion)
+        .where(TableVersion.name.in_(tables), TableVersion.shard == shard)
+        .values(version=TableVersion.version + 1, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount < len(tables):
+        existing = set(
+            session.scalars(
+                select(TableVersion.name).where(TableVersion.name.in_(tables), TableVersion.shard == shard)
+            )
+        )
+        session.add_all(
+            TableVersion(name=name, shard=shard, version=1, updated_at=now) for name in tables if name not in existing
+        )
+
+
+def get_table_versions(db: Session, tables: tuple[str, ...]) -> list[tuple[str, int, datetime]]:
+    """Return ``(name, version, updated_at)`` for the known ``tables``."""
+    rows = db.execute(
+        select(TableVersion.name, func.sum(TableVersion.version), func.max(TableVersion.updated_at))
+        .where(TableVersion.name.in_(tables))
+        .group_by(TableVersion.name)
+        .order_by(TableVersion.name)
+    )
+    return [(name, int(version), updated_at) for name, version, updated_at in rows]
@@ -0,0 +1,107 @@
+"""Shared fixtures for the API test suite."""
+
+import os
+
+from dotenv import load_dotenv
+
+# Without a configured database the suite runs against in-memory SQLite.
+load_dotenv()
+if not os.getenv("DATABASE_URL") and not os.getenv("POSTGRES_DB"):
+    os.environ["DATABASE_URL"] = "sqlite://"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from src.main import app  # noqa: E402
+from src.app.cache import MemoryBackend, configure_cache  # noqa: E402
+from src.app.routes.expense import get_db  # noqa: E402
+from src.app.database.expense import Base, engine, SessionLocal  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def prepare_database():
+    """Ensure the tables exist before tests run."""
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    """Each test rolls its data back, so cached rows must not outlive it."""
+    configure_cache(MemoryBackend())
+    yield
+
+
+@pytest.fixture()
+def db_session():
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = SessionLocal(bind=connection)
+
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture()
+def client(db_session):
+    def _get_test_db():
+        try:
+            yield db_session
+        finally:
+            pass
+
+    app.dependency_overrides[get_db] = _get_test_db
+    test_client = TestClient(app)
+
+    try:
+        yield test_client
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture()
+def auth_headers(client: TestClient) -> dict[str, str]:
+    response = client.post(
+        "/api/v1/auth/token",
+        data={"username": "admin", "password": "admin"},
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    assert response.status_code == 200
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+class QueryCounter:
+    """Records the SQL statements emitted on the test engine."""
+
+    def __init__(self):
+        self.statements: list[str] = []
+        self.parameters: list = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        self.parameters.append(parameters)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def reset(self):
+        self.statements.clear()
+        self.parameters.clear()
+
+
+@pytest.fixture()
+def query_counter():
+    """Count statements sent to the database while the test runs."""
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
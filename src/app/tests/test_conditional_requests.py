@@ -0,0 +1,111 @@
+"""Tests for ETag / Last-Modified conditional GETs on the read routes."""
+
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select, update
+
+from src.app.models.expense import TableVersion
+from src.app.services import version_services
+
+
+@pytest.fixture()
+def category(client, auth_headers):
+    return client.post("/api/v1/categories", json={"name": "cg-food"}, headers=auth_headers).json()
+
+
+def test_unchanged_list_answers_304_without_reading_rows(client, auth_headers, category, db_session, query_counter):
+    db_session.execute(update(TableVersion).values(updated_at=datetime.now(timezone.utc) - timedelta(seconds=30)))
+    first = client.get("/api/v1/categories", headers=auth_headers)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["last-modified"]
+
+    query_counter.reset()
+    response = client.get("/api/v1/categories", headers={**auth_headers, "If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert query_counter.count == 1
+    assert "table_versions" in query_counter.statements[0]
+
+
+def test_writes_change_the_etag(client, auth_headers, category):
+    budget = client.post("/api/v1/budgets", json={"name": "cg-home", "amount": 10}, headers=auth_headers).json()
+    categories_etag = client.get("/api/v1/categories", headers=auth_headers).headers["etag"]
+    budget_etag = client.get(f"/api/v1/budgets/{budget['id']}", headers=auth_headers).headers["etag"]
+    expenses_etag = client.get("/api/v1/expenses", headers=auth_headers).headers["etag"]
+
+    client.post("/api/v1/categories", json={"name": "cg-travel"}, headers=auth_headers)
+    response = client.get("/api/v1/categories", headers={**auth_headers, "If-None-Match": categories_etag})
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 2
+    # Routes that do not read the categories keep their tags.
+    assert client.get(
+        f"/api/v1/budgets/{budget['id']}", headers={**auth_headers, "If-None-Match": budget_etag}
+    ).status_code == 304
+
+    # An expense changes the budget's running total, so the budget is stale too.
+    client.post(
+        "/api/v1/expenses",
+        json={"name": "cg-lunch", "amount": 4, "category_id": category["id"], "budget_id": budget["id"]},
+        headers=auth_headers,
+    )
+    for path, etag in ((f"/api/v1/budgets/{budget['id']}", budget_etag), ("/api/v1/expenses", expenses_etag)):
+        response = client.get(path, headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 200, path
+
+
+def test_writes_on_different_shards_all_change_the_etag(client, auth_headers, db_session, monkeypatch):
+    shards = iter([3, 7, 3])
+    monkeypatch.setattr(version_services.random, "randrange", lambda n: next(shards))
+    etags = [client.get("/api/v1/categories", headers=auth_headers).headers["etag"]]
+
+    for name in ("cg-one", "cg-two", "cg-three"):
+        client.post("/api/v1/categories", json={"name": name}, headers=auth_headers)
+        etags.append(client.get("/api/v1/categories", headers=auth_headers).headers["etag"])
+
+    assert len(set(etags)) == 4
+    bumped = db_session.execute(
+        select(TableVersion.shard, TableVersion.version)
+        .where(TableVersion.name == "categories", TableVersion.version > 0)
+        .order_by(TableVersion.shard)
+    ).all()
+    assert [tuple(row) for row in bumped] == [(3, 2), (7, 1)]
+    assert db_session.scalar(select(func.count()).select_from(TableVersion).where(TableVersion.name == "categories")) == 16
+
+
+def test_if_modified_since(client, auth_headers, category, db_session):
+    now = datetime.now(timezone.utc)
+    db_session.execute(update(TableVersion).values(updated_at=now - timedelta(seconds=30)))
+    later = format_datetime(now + timedelta(minutes=1), usegmt=True)
+    earlier = format_datetime(now - timedelta(minutes=1), usegmt=True)
+
+    assert client.get("/api/v1/categories", headers={**auth_headers, "If-Modified-Since": later}).status_code == 304
+    assert client.get("/api/v1/categories", headers={**auth_headers, "If-Modified-Since": earlier}).status_code == 200
+
+
+def test_write_in_the_same_second_is_not_hidden_by_if_modified_since(client, auth_headers):
+    # Start early in a second so that both writes and reads share it.
+    time.sleep(1 - datetime.now(timezone.utc).microsecond / 1_000_000)
+    written_at = format_datetime(datetime.now(timezone.utc), usegmt=True)
+    client.post("/api/v1/categories", json={"name": "cg-first"}, headers=auth_headers)
+    first = client.get("/api/v1/categories", headers=auth_headers)
+    client.post("/api/v1/categories", json={"name": "cg-second"}, headers=auth_headers)
+
+    response = client.get("/api/v1/categories", headers={**auth_headers, "If-Modified-Since": written_at})
+
+    assert "last-modified" not in first.headers
+    assert response.status_code == 200
+    assert [item["name"] for item in response.json()["items"]] == ["cg-first", "cg-second"]
+
+
+def test_conditional_requests_still_require_authentication(client, auth_headers, category):
+    etag = client.get("/api/v1/categories", headers=auth_headers).headers["etag"]
+
+    response = client.get("/api/v1/categories", headers={"If-None-Match": etag})
+
+    assert response.status_code == 401
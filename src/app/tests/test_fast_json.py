@@ -0,0 +1,69 @@
+"""Tests for the opt-in fast JSON path of the list endpoints."""
+
+import pytest
+
+from src.app.routes import expense as expense_routes
+from src.app.schema.expense import BudgetOut, CategoryOut, ExpenseOut, Page
+from src.main import app
+
+
+@pytest.fixture()
+def ledger(client, auth_headers):
+    category = client.post("/api/v1/categories", json={"name": "fj-food"}, headers=auth_headers).json()
+    budget = client.post("/api/v1/budgets", json={"name": "fj-home", "amount": "80"}, headers=auth_headers).json()
+    for name, amount in (("fj-lunch", "12.5"), ("fj-dinner", 20), ("fj-snack", "0.1")):
+        response = client.post(
+            "/api/v1/expenses",
+            json={"name": name, "amount": amount, "category_id": category["id"], "budget_id": budget["id"]},
+            headers=auth_headers,
+        )
+        assert response.status_code == 201
+
+
+def _get_both(client, auth_headers, monkeypatch, path, params):
+    responses = {}
+    for fast in (False, True):
+        monkeypatch.setattr(expense_routes, "FAST_JSON_RESPONSES", fast)
+        responses[fast] = client.get(path, params=params, headers=auth_headers)
+        assert responses[fast].status_code == 200
+    return responses[False], responses[True]
+
+
+@pytest.mark.parametrize(
+    "path, schema, params",
+    [
+        ("/api/v1/expenses", Page[ExpenseOut], {"name_prefix": "fj-", "limit": 2}),
+        ("/api/v1/categories", Page[CategoryOut], {"limit": 500}),
+        ("/api/v1/budgets", Page[BudgetOut], {"limit": 500}),
+    ],
+)
+def test_fast_path_returns_the_same_document(client, auth_headers, ledger, monkeypatch, path, schema, params):
+    default, fast = _get_both(client, auth_headers, monkeypatch, path, params)
+
+    assert fast.json() == default.json()
+    assert schema.model_validate(fast.json())
+    assert fast.headers["content-type"] == "application/json"
+    assert fast.headers["etag"] == default.headers["etag"]
+
+
+def test_fast_path_follows_cursors(client, auth_headers, ledger, monkeypatch):
+    params = {"name_prefix": "fj-", "limit": 2}
+    first = _get_both(client, auth_headers, monkeypatch, "/api/v1/expenses", params)[1].json()
+    second = _get_both(
+        client, auth_headers, monkeypatch, "/api/v1/expenses", {**params, "cursor": first["next_cursor"]}
+    )[1].json()
+
+    assert [item["name"] for item in first["items"] + second["items"]] == ["fj-lunch", "fj-dinner", "fj-snack"]
+    assert second["next_cursor"] is None
+    assert first["items"][0]["budget"]["remaining"] == "47.40"
+
+
+def test_openapi_schema_is_unchanged(monkeypatch):
+    app.openapi_schema = None
+    default = app.openapi()
+    monkeypatch.setattr(expense_routes, "FAST_JSON_RESPONSES", True)
+    app.openapi_schema = None
+    try:
+        assert app.openapi() == default
+    finally:
+        app.openapi_schema = None
@@ -0,0 +1,165 @@
+"""Tests for the group-commit expense writer."""
+
+import asyncio
+import threading
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+
+from src.app import group_commit
+from src.app.database.expense import Base
+from src.app.group_commit import GroupCommitWriter
+from src.app.models.expense import Budget, Category, Expense
+
+
+SPENT_AT = datetime(2025, 3, 1, 12, tzinfo=timezone.utc)
+
+
+@pytest.fixture()
+def ledger(tmp_path):
+    """A database of its own: the writer commits for real."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'ingest.db'}")
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as db:
+        db.add_all([Category(name="gc-food"), Budget(name="gc-home", amount=1000)])
+        db.commit()
+    commits = []
+    event.listen(engine, "commit", lambda conn: commits.append(1))
+    yield session_factory, commits
+    engine.dispose()
+
+
+def _expense(name, category_id=1, amount="2.50"):
+    return {"name": name, "amount": Decimal(amount), "category_id": category_id, "budget_id": 1, "spent_at": SPENT_AT}
+
+
+def test_concurrent_expenses_share_commits(ledger):
+    session_factory, commits = ledger
+    writer = GroupCommitWriter(session_factory, max_batch=20, max_delay=0.05)
+
+    async def ingest():
+        ids = await asyncio.gather(*(writer.submit(_expense(f"gc-{i}")) for i in range(50)))
+        await writer.stop()
+        return ids
+
+    ids = asyncio.run(ingest())
+
+    assert len(set(ids)) == 50
+    assert writer.batches == len(commits) < 50
+    with session_factory() as db:
+        assert db.scalar(select(func.count()).select_from(Expense)) == 50
+        assert db.get(Category, 1).spent == Decimal("125.00")
+        names = dict(db.execute(select(Expense.id, Expense.name).where(Expense.id.in_(ids[:2]))).all())
+        assert names == {ids[0]: "gc-0", ids[1]: "gc-1"}
+
+
+def test_a_bad_reference_rejects_only_its_expense(ledger):
+    session_factory, _ = ledger
+    writer = GroupCommitWriter(session_factory, max_delay=0.05)
+
+    async def ingest():
+        results = await asyncio.gather(
+            writer.submit(_expense("gc-ok")), writer.submit(_expense("gc-bad", category_id=99)), return_exceptions=True
+        )
+        await writer.stop()
+        return results
+
+    created, rejected = asyncio.run(ingest())
+
+    assert isinstance(created, int)
+    assert isinstance(rejected, HTTPException) and rejected.status_code == 422
+    assert rejected.detail == [{"loc": ["category_id"], "msg": "Category not found"}]
+
+
+def test_a_failed_batch_fails_its_requests_and_the_writer_goes_on(ledger, monkeypatch):
+    session_factory, _ = ledger
+    writer = GroupCommitWriter(session_factory, max_delay=0.05)
+    write = writer._write
+    failures = iter([OSError("disk full"), None])
+
+    def flaky_write(rows):
+        failure = next(failures)
+        if failure is not None:
+            raise failure
+        return write(rows)
+
+    monkeypatch.setattr(writer, "_write", flaky_write)
+
+    async def ingest():
+        failed = await asyncio.wait_for(
+            asyncio.gather(*(writer.submit(_expense(f"gc-lost-{i}")) for i in range(3)), return_exceptions=True), 5
+        )
+        created = await asyncio.wait_for(writer.submit(_expense("gc-after")), 5)
+        await writer.stop()
+        return failed, created
+
+    failed, created = asyncio.run(ingest())
+
+    assert [str(error) for error in failed] == ["disk full"] * 3
+    assert isinstance(created, int)
+
+
+def test_an_unexpected_result_fails_the_request_instead_of_hanging(ledger, monkeypatch):
+    session_factory, _ = ledger
+    writer = GroupCommitWriter(session_factory, max_delay=0)
+    monkeypatch.setattr(writer, "_write", lambda rows: ([{"index": 7, "id": 1}], []))
+
+    async def ingest():
+        try:
+            return await asyncio.wait_for(writer.submit(_expense("gc-lost")), 5)
+        finally:
+            await writer.stop()
+
+    with pytest.raises(IndexError):
+        asyncio.run(ingest())
+
+
+def test_full_queue_answers_503(ledger, monkeypatch):
+    session_factory, _ = ledger
+    writer = GroupCommitWriter(session_factory, max_batch=1, max_delay=0, queue_size=1, enqueue_timeout=0.05)
+    release = threading.Event()
+    write = writer._write
+    monkeypatch.setattr(writer, "_write", lambda rows: release.wait() and write(rows))
+
+    async def ingest():
+        writing = asyncio.ensure_future(writer.submit(_expense("gc-writing")))
+        await asyncio.sleep(0.05)  # taken off the queue, blocked in the write
+        queued = asyncio.ensure_future(writer.submit(_expense("gc-queued")))
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as rejected:
+            await writer.submit(_expense("gc-rejected"))
+        release.set()
+        ids = await asyncio.gather(writing, queued)
+        await writer.stop()
+        return rejected.value, ids
+
+    rejected, ids = asyncio.run(ingest())
+
+    assert rejected.status_code == 503
+    assert rejected.headers == {"Retry-After": "1"}
+    assert len(set(ids)) == 2
+
+
+def test_create_route_goes_through_the_writer(client, auth_headers, db_session, monkeypatch):
+    category = client.post("/api/v1/categories", json={"name": "gc-route"}, headers=auth_headers).json()["id"]
+    budget = client.post("/api/v1/budgets", json={"name": "gc-route", "amount": "10"}, headers=auth_headers).json()["id"]
+    # Bound to the test's connection, so its rows are rolled back with the test.
+    writer = GroupCommitWriter(lambda: sessionmaker()(bind=db_session.connection()), max_delay=0)
+    monkeypatch.setattr(group_commit, "EXPENSE_GROUP_COMMIT", True)
+    monkeypatch.setattr(group_commit, "expense_writer", writer)
+
+    response = client.post(
+        "/api/v1/expenses",
+        json={"name": "gc-route", "amount": "3.10", "category_id": category, "budget_id": budget},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 201, response.text
+    assert response.json()["name"] == "gc-route"
+    assert response.json()["category"]["id"] == category
+    assert writer.batches == 1
@@ -0,0 +1,139 @@
+"""Tests for Idempotency-Key support on the create endpoints."""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine, func, select, update
+from sqlalchemy.orm import sessionmaker
+
+from src.app.database.expense import Base
+from src.app.models.expense import Category, Expense, IdempotencyKey
+from src.app.schema.expense import CategoryIn
+from src.app.services import category_service, idempotency_services
+
+
+def _keyed(headers, key):
+    return {**headers, "Idempotency-Key": key}
+
+
+def _expense_body(client, headers, name="ik-lunch"):
+    category = client.post("/api/v1/categories", json={"name": f"{name}-food"}, headers=headers).json()["id"]
+    budget = client.post("/api/v1/budgets", json={"name": f"{name}-home", "amount": "100"}, headers=headers).json()["id"]
+    return {"name": name, "amount": "12.50", "category_id": category, "budget_id": budget}
+
+
+def _count(db_session, model, name):
+    return db_session.scalar(select(func.count()).select_from(model).where(model.name == name))
+
+
+def test_retried_expense_is_created_once(client, auth_headers, db_session, query_counter):
+    body = _expense_body(client, auth_headers)
+
+    first = client.post("/api/v1/expenses", json=body, headers=_keyed(auth_headers, "retry-1"))
+    query_counter.reset()
+    retry = client.post("/api/v1/expenses", json=body, headers=_keyed(auth_headers, "retry-1"))
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert not any(statement.startswith("INSERT") for statement in query_counter.statements)
+    assert _count(db_session, Expense, "ik-lunch") == 1
+
+
+def test_keys_are_scoped_per_route_and_requests_without_keys_always_create(client, auth_headers, db_session):
+    body = _expense_body(client, auth_headers)
+    category = client.post("/api/v1/categories", json={"name": "ik-shared"}, headers=_keyed(auth_headers, "same"))
+    budget = client.post("/api/v1/budgets", json={"name": "ik-shared", "amount": "5"}, headers=_keyed(auth_headers, "same"))
+    assert (category.status_code, budget.status_code) == (201, 201)
+    assert "Idempotent-Replayed" not in budget.headers
+
+    for _ in range(2):
+        assert client.post("/api/v1/expenses", json=body, headers=auth_headers).status_code == 201
+    assert _count(db_session, Expense, "ik-lunch") == 2
+
+
+def test_reusing_a_key_for_another_request_is_rejected(client, auth_headers):
+    headers = _keyed(auth_headers, "reused")
+    assert client.post("/api/v1/categories", json={"name": "ik-first"}, headers=headers).status_code == 201
+
+    response = client.post("/api/v1/categories", json={"name": "ik-second"}, headers=headers)
+
+    assert response.status_code == 422
+    assert "Idempotency-Key" in response.json()["detail"]
+
+
+def test_expired_keys_no_longer_replay(client, auth_headers, db_session):
+    body = _expense_body(client, auth_headers)
+    headers = _keyed(auth_headers, "expiring")
+    first = client.post("/api/v1/expenses", json=body, headers=headers).json()
+    db_session.execute(update(IdempotencyKey).values(expires_at=datetime.now(timezone.utc) - timedelta(seconds=1)))
+
+    response = client.post("/api/v1/expenses", json=body, headers=headers)
+
+    assert response.status_code == 201
+    assert "Idempotent-Replayed" not in response.headers
+    assert response.json()["id"] != first["id"]
+    # The expired key was replaced: the next retry replays the new expense.
+    assert client.post("/api/v1/expenses", json=body, headers=headers).json()["id"] == response.json()["id"]
+
+
+def test_purge_deletes_only_expired_keys(client, auth_headers, db_session):
+    for name in ("ik-keep", "ik-drop"):
+        client.post("/api/v1/categories", json={"name": name}, headers=_keyed(auth_headers, name))
+    db_session.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.key == idempotency_services.request_key("ik-drop", "admin", "create_category"))
+        .values(expires_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+    )
+
+    assert idempotency_services.purge_expired_keys(db_session) == 1
+    assert db_session.scalar(select(func.count()).select_from(IdempotencyKey)) == 1
+
+
+def test_advisory_lock_uses_64_bits_of_the_key():
+    statements = []
+    postgres = SimpleNamespace(
+        get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name="postgresql")),
+        execute=lambda statement, params: statements.append((str(statement), params)),
+    )
+    digest = bytes.fromhex("00000000ffffffff") + bytes(24)
+
+    idempotency_services._lock_key(postgres, digest)
+
+    assert statements == [("SELECT pg_advisory_xact_lock(:key)", {"key": 0xFFFFFFFF})]
+
+
+def test_concurrent_duplicate_replays_the_committed_row(tmp_path, monkeypatch):
+    # Real commits and rollbacks: a database of its own instead of the rolled-back test transaction.
+    race_engine = create_engine(f"sqlite:///{tmp_path / 'race.db'}")
+    Base.metadata.create_all(race_engine)
+    race_session = sessionmaker(bind=race_engine)
+
+    def create(db):
+        return idempotency_services.create_once(
+            "race",
+            "admin",
+            "create_category",
+            CategoryIn(name="ik-race"),
+            Category(name="ik-race"),
+            category_service.create_category,
+            lambda session, category_id: category_service.get_specific_category(category_id, session),
+            db=db,
+        )
+
+    with race_session() as first:
+        created, replayed = create(first)
+        assert not replayed
+    # The second request looked the key up before the first one committed.
+    find = idempotency_services._find
+    misses = iter([None])
+    monkeypatch.setattr(idempotency_services, "_find", lambda db, digest: next(misses, None) or find(db, digest))
+
+    with race_session() as second:
+        category, replayed = create(second)
+
+        assert replayed
+        assert category["id"] == created.id
+        assert _count(second, Category, "ik-race") == 1
+    race_engine.dispose()
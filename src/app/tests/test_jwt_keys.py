@@ -0,0 +1,117 @@
+"""Tests for asymmetric access tokens, key rotation and the JWKS endpoint."""
+
+import jwt as pyjwt
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+pytest.importorskip("cryptography")
+from cryptography.hazmat.primitives import serialization  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa  # noqa: E402
+
+from src.app.security import jwt as jwt_helpers  # noqa: E402
+from src.app.security.keys import KeyConfigurationError, load_key_ring  # noqa: E402
+from src.main import app  # noqa: E402
+
+
+def _write_private(directory, kid, key):
+    pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    (directory / f"{kid}.pem").write_bytes(pem)
+
+
+def _write_public(directory, kid, key):
+    pem = key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    (directory / f"{kid}.pem").write_bytes(pem)
+
+
+@pytest.fixture()
+def keys_dir(tmp_path):
+    _write_private(tmp_path, "rsa-2025", rsa.generate_private_key(public_exponent=65537, key_size=2048))
+    _write_private(tmp_path, "ed-2026", ed25519.Ed25519PrivateKey.generate())
+    return tmp_path
+
+
+@pytest.fixture()
+def use_keys():
+    original = jwt_helpers.KEY_RING
+    yield jwt_helpers.configure_keys
+    jwt_helpers.configure_keys(original)
+
+
+@pytest.mark.parametrize("kid, algorithm", [("rsa-2025", "RS256"), ("ed-2026", "EdDSA")])
+def test_tokens_are_signed_with_the_configured_kid(keys_dir, use_keys, kid, algorithm):
+    use_keys(load_key_ring(keys_dir, kid))
+
+    token = jwt_helpers.create_access_token({"sub": "admin"})
+
+    assert pyjwt.get_unverified_header(token) == {"alg": algorithm, "kid": kid, "typ": "JWT"}
+    assert jwt_helpers.decode_access_token(token)["sub"] == "admin"
+
+
+def test_tokens_of_the_previous_key_verify_after_rotation(keys_dir, use_keys):
+    use_keys(load_key_ring(keys_dir, "rsa-2025"))
+    old_token = jwt_helpers.create_access_token({"sub": "admin"})
+
+    use_keys(load_key_ring(keys_dir, "ed-2026"))
+
+    assert jwt_helpers.decode_access_token(old_token)["sub"] == "admin"
+    assert pyjwt.get_unverified_header(jwt_helpers.create_access_token({"sub": "admin"}))["kid"] == "ed-2026"
+
+
+def test_tokens_of_removed_or_unknown_keys_are_rejected(keys_dir, use_keys):
+    use_keys(load_key_ring(keys_dir, "rsa-2025"))
+    token = jwt_helpers.create_access_token({"sub": "admin"})
+
+    (keys_dir / "rsa-2025.pem").unlink()
+    use_keys(load_key_ring(keys_dir))
+
+    with pytest.raises(HTTPException) as excinfo:
+        jwt_helpers.decode_access_token(token)
+    assert excinfo.value.status_code == 401
+
+
+def test_shared_secret_tokens_are_rejected_by_an_asymmetric_ring(keys_dir, use_keys):
+    forged = pyjwt.encode({"sub": "admin"}, jwt_helpers.SECRET_KEY, algorithm="HS256", headers={"kid": "rsa-2025"})
+    use_keys(load_key_ring(keys_dir, "rsa-2025"))
+
+    with pytest.raises(HTTPException):
+        jwt_helpers.decode_access_token(forged)
+
+
+def test_public_only_keys_verify_but_cannot_sign(tmp_path):
+    key = ed25519.Ed25519PrivateKey.generate()
+    _write_public(tmp_path, "ed-peer", key)
+
+    with pytest.raises(KeyConfigurationError):
+        load_key_ring(tmp_path)
+    _write_private(tmp_path, "ed-own", ed25519.Ed25519PrivateKey.generate())
+    ring = load_key_ring(tmp_path)
+
+    assert ring.signing.kid == "ed-own"
+    assert ring.keys["ed-peer"].signing_key is None
+
+
+def test_jwks_lets_other_services_verify_tokens(keys_dir, use_keys):
+    use_keys(load_key_ring(keys_dir, "ed-2026"))
+    token = jwt_helpers.create_access_token({"sub": "admin"})
+
+    with TestClient(app) as client:
+        response = client.get("/.well-known/jwks.json")
+
+    assert response.status_code == 200
+    assert "max-age" in response.headers["cache-control"]
+    jwks = response.json()
+    assert sorted(key["kid"] for key in jwks["keys"]) == ["ed-2026", "rsa-2025"]
+    assert all("d" not in key for key in jwks["keys"])
+
+    signing_key = pyjwt.PyJWKSet.from_dict(jwks)[pyjwt.get_unverified_header(token)["kid"]]
+    assert pyjwt.decode(token, signing_key, algorithms=["EdDSA"])["sub"] == "admin"
+
+
+def test_jwks_is_empty_with_the_shared_secret():
+    with TestClient(app) as client:
+        assert client.get("/.well-known/jwks.json").json() == {"keys": []}
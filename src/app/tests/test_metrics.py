@@ -0,0 +1,51 @@
+"""Tests for the metrics registry and the /metrics endpoint."""
+
+from src.app.database import pool
+from src.app.metrics import Registry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.histogram("wait_seconds", "Wait", ("engine",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value, engine="sync")
+
+    lines = registry.render().splitlines()
+
+    assert 'wait_seconds_bucket{engine="sync",le="0.1"} 2' in lines
+    assert 'wait_seconds_bucket{engine="sync",le="1"} 3' in lines
+    assert 'wait_seconds_bucket{engine="sync",le="+Inf"} 4' in lines
+    assert 'wait_seconds_count{engine="sync"} 4' in lines
+    assert 'wait_seconds_sum{engine="sync"} 3.65' in lines
+
+
+def test_statement_timeout_is_passed_per_driver(monkeypatch):
+    monkeypatch.setattr(pool, "DB_STATEMENT_TIMEOUT_MS", 1500)
+
+    psycopg = pool.engine_options("postgresql://u:p@db/app")
+    asyncpg = pool.engine_options("postgresql+asyncpg://u:p@db/app", is_async=True)
+
+    assert psycopg["connect_args"] == {"options": "-c statement_timeout=1500"}
+    assert asyncpg["connect_args"] == {"server_settings": {"statement_timeout": "1500"}}
+    assert asyncpg["poolclass"] is pool.InstrumentedAsyncQueuePool
+    assert pool.engine_options("sqlite:///app.db")["connect_args"] == {"check_same_thread": False}
+
+
+def test_in_memory_sqlite_shares_one_connection():
+    assert pool.engine_options("sqlite:///app.db")["poolclass"] is pool.InstrumentedQueuePool
+    for url in ("sqlite://", "sqlite+aiosqlite:///:memory:", "sqlite:///file:app?mode=memory&cache=shared&uri=true"):
+        assert pool.engine_options(url)["poolclass"] is pool.StaticPool
+
+
+def test_metrics_endpoint_reports_pool_and_cache(client, auth_headers, db_session):
+    client.get("/api/v1/categories", headers=auth_headers)
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert "# TYPE db_pool_wait_seconds histogram" in body
+    assert 'cache_lookups_total{namespace="categories",result="miss"}' in body
+    if not pool.is_memory_sqlite(db_session.get_bind().engine.url):
+        assert 'db_pool_checked_out{engine="sync"}' in body
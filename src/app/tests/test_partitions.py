@@ -0,0 +1,87 @@
+"""Tests for the monthly partitions of expenses and partition pruning."""
+
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine
+
+from src.app.database import partitions
+from src.app.models.expense import Category, Expense
+
+
+def test_month_arithmetic_and_names():
+    assert partitions.month_start(date(2025, 1, 31)) == date(2025, 1, 1)
+    assert partitions.add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+    assert partitions.add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    assert partitions.partition_name(date(2025, 2, 1)) == "expenses_y2025m02"
+
+
+def test_sqlite_keeps_a_plain_table(db_session):
+    if db_session.connection().dialect.name == "postgresql":
+        pytest.skip("Postgres partitions expenses")
+
+    assert not partitions.is_partitioned(db_session.connection())
+    assert partitions.ensure_upcoming_partitions(create_engine("sqlite://")) == []
+
+
+@pytest.fixture()
+def partitioned_ledger(db_session):
+    connection = db_session.connection()
+    if not partitions.is_partitioned(connection):
+        pytest.skip("expenses are only partitioned on Postgres")
+
+    partitions.ensure_expense_partitions(connection, date(2025, 1, 1), date(2025, 3, 1))
+    category = Category(name="pt-category")
+    db_session.add_all(
+        Expense(name=f"pt-{month}", amount=10, category=category, spent_at=datetime(2025, month, 15, tzinfo=timezone.utc))
+        for month in (1, 2, 3)
+    )
+    db_session.commit()
+    return category
+
+
+def _explained(db_session, query_counter) -> str:
+    statement, parameters = next(
+        (statement, parameters)
+        for statement, parameters in zip(query_counter.statements, query_counter.parameters)
+        if "FROM expenses" in statement
+    )
+    rows = db_session.connection().exec_driver_sql("EXPLAIN " + statement, parameters)
+    return "\n".join(row[0] for row in rows)
+
+
+@pytest.mark.parametrize(
+    "path, params",
+    [
+        ("/api/v1/expenses", {"spent_from": "2025-02-01T00:00:00Z", "spent_to": "2025-03-01T00:00:00Z"}),
+        ("/api/v1/reports/timeseries", {"bucket": "day", "start": "2025-02-01T00:00:00Z", "end": "2025-03-01T00:00:00Z"}),
+    ],
+)
+def test_range_queries_only_read_their_partitions(
+    client, auth_headers, db_session, partitioned_ledger, query_counter, path, params
+):
+    response = client.get(path, params=params, headers=auth_headers)
+    assert response.status_code == 200
+
+    plan = _explained(db_session, query_counter)
+    assert "expenses_y2025m02" in plan, plan
+    for pruned in ("expenses_y2025m01", "expenses_y2025m03", partitions.DEFAULT_PARTITION):
+        assert pruned not in plan, plan
+
+
+def test_new_partitions_take_their_rows_from_the_default(db_session, partitioned_ledger):
+    connection = db_session.connection()
+    late = Expense(
+        name="pt-late", amount=5, category=partitioned_ledger, spent_at=datetime(2031, 5, 2, tzinfo=timezone.utc)
+    )
+    db_session.add(late)
+    db_session.flush()
+    assert connection.exec_driver_sql("SELECT count(*) FROM expenses_default WHERE name = 'pt-late'").scalar() == 1
+
+    created = partitions.ensure_expense_partitions(connection, date(2031, 4, 1), date(2031, 6, 1))
+
+    assert created == ["expenses_y2031m04", "expenses_y2031m05", "expenses_y2031m06"]
+    assert connection.exec_driver_sql("SELECT name FROM expenses_y2031m05").scalars().all() == ["pt-late"]
+    assert partitions.ensure_expense_partitions(connection, date(2031, 4, 1), date(2031, 6, 1)) == []
+    db_session.expire_all()
+    assert db_session.get(Expense, late.id).name == "pt-late"
@@ -1,64 +1,21 @@
+import csv
+import io
+import json
+from decimal import Decimal
+
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 
+from src.app.database import expense as database
 from src.main import app
-from src.app.routes.expense import get_db
-from src.app.database.expense import Base, engine, SessionLocal
-
-
-@pytest.fixture(scope="session", autouse=True)
-def prepare_database():
-    """Ensure the relevant Postgres tables exist before tests run."""
-    Base.metadata.create_all(bind=engine)
-    yield
-
-
-@pytest.fixture()
-def db_session():
-    connection = engine.connect()
-    transaction = connection.begin()
-    session = SessionLocal(bind=connection)
-
-    try:
-        yield session
-    finally:
-        session.close()
-        transaction.rollback()
-        connection.close()
-
-
-@pytest.fixture()
-def client(db_session):
-    def _get_test_db():
-        try:
-            yield db_session
-        finally:
-            pass
-
-    app.dependency_overrides[get_db] = _get_test_db
-    test_client = TestClient(app)
-
-    try:
-        yield test_client
-    finally:
-        app.dependency_overrides.pop(get_db, None)
-
-
-@pytest.fixture()
-def auth_headers(client: TestClient) -> dict[str, str]:
-    response = client.post(
-        "/api/v1/postgres/auth/token",
-        data={"username": "admin", "password": "admin"},
-        headers={"Content-Type": "application/x-www-form-urlencoded"},
-    )
-    assert response.status_code == 200
-    token = response.json()["access_token"]
-    return {"Authorization": f"Bearer {token}"}
 
 
 def create_category(client, headers, name="Food"):
     response = client.post(
-        "/api/v1/postgres/categories",
+        "/api/v1/categories",
         json={"name": name},
         headers=headers,
     )
@@ -68,7 +25,7 @@ def create_category(client, headers, name="Food"):
 
 def create_budget(client, headers, name="Monthly Budget", amount=5000.0):
     response = client.post(
-        "/api/v1/postgres/budgets",
+        "/api/v1/budgets",
         json={"name": name, "amount": amount},
         headers=headers,
     )
@@ -80,19 +37,19 @@ def test_create_and_list_categories(client, auth_headers):
     category = create_category(client, auth_headers)
 
     list_response = client.get(
-        "/api/v1/postgres/categories",
+        "/api/v1/categories",
         headers=auth_headers,
     )
     assert list_response.status_code == 200
     payload = list_response.json()
-    assert any(item["id"] == category["id"] for item in payload)
+    assert any(item["id"] == category["id"] for item in payload["items"])
 
 
 def test_create_budget_and_get_single(client, auth_headers):
     budget = create_budget(client, auth_headers)
 
     response = client.get(
-        f"/api/v1/postgres/budgets/{budget['id']}",
+        f"/api/v1/budgets/{budget['id']}",
         headers=auth_headers,
     )
     assert response.status_code == 200
@@ -101,6 +58,66 @@ def test_create_budget_and_get_single(client, auth_headers):
     assert data["amount"] == budget["amount"]
 
 
+def test_amounts_are_exact_decimal_strings(client, auth_headers):
+    category = create_category(client, auth_headers, name="Snacks")
+    budget = create_budget(client, auth_headers, name="Snacks Budget", amount="1")
+    assert budget["amount"] == "1.00"
+
+    for amount in (0.1, "0.2"):
+        response = client.post(
+            "/api/v1/expenses",
+            json={"name": "Gum", "amount": amount, "category_id": category["id"], "budget_id": budget["id"]},
+            headers=auth_headers,
+        )
+        assert response.status_code == 201
+    totals = client.get(f"/api/v1/budgets/{budget['id']}", headers=auth_headers).json()
+    assert (totals["spent"], totals["remaining"]) == ("0.30", "0.70")
+
+    response = client.post(
+        "/api/v1/expenses",
+        json={"name": "Gum", "amount": "0.125", "category_id": category["id"], "budget_id": budget["id"]},
+        headers=auth_headers,
+    )
+    assert response.status_code == 422
+
+
+def test_list_expenses_by_spent_at_range(client, auth_headers):
+    category = create_category(client, auth_headers, name="Dated")
+    budget = create_budget(client, auth_headers, name="Dated Budget")
+    for name, spent_at in [
+        ("Before", "2025-03-31T23:59:59Z"),
+        ("Start", "2025-04-01T02:00:00+02:00"),
+        ("Inside", "2025-04-15T12:00:00"),
+        ("End", "2025-05-01T00:00:00Z"),
+    ]:
+        response = client.post(
+            "/api/v1/expenses",
+            json={
+                "name": name,
+                "amount": 1,
+                "category_id": category["id"],
+                "budget_id": budget["id"],
+                "spent_at": spent_at,
+            },
+            headers=auth_headers,
+        )
+        assert response.status_code == 201
+
+    response = client.get(
+        "/api/v1/expenses",
+        params={"category_id": category["id"], "spent_from": "2025-04-01T00:00:00Z", "spent_to": "2025-05-01T00:00:00Z"},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [(item["name"], item["spent_at"]) for item in items] == [
+        ("Start", "2025-04-01T00:00:00Z"),
+        ("Inside", "2025-04-15T12:00:00Z"),
+    ]
+    assert all(item["created_at"].endswith("Z") for item in items)
+
+
 def test_create_and_delete_expense(client, auth_headers):
     category = create_category(client, auth_headers, name="Travel")
     budget = create_budget(client, auth_headers, name="Travel Budget", amount=1000.0)
@@ -113,23 +130,195 @@ def test_create_and_delete_expense(client, auth_headers):
     }
 
     create_response = client.post(
-        "/api/v1/postgres/expenses",
+        "/api/v1/expenses",
         json=expense_payload,
         headers=auth_headers,
     )
     assert create_response.status_code == 201
     expense = create_response.json()
     assert expense["name"] == expense_payload["name"]
-    assert expense["amount"] == expense_payload["amount"]
+    assert expense["amount"] == "250.50"
 
     delete_response = client.delete(
-        f"/api/v1/postgres/expenses/{expense['id']}",
+        f"/api/v1/expenses/{expense['id']}",
         headers=auth_headers,
     )
     assert delete_response.status_code == 204
 
     not_found_response = client.get(
-        f"/api/v1/postgres/expenses/{expense['id']}",
+        f"/api/v1/expenses/{expense['id']}",
         headers=auth_headers,
     )
     assert not_found_response.status_code == 404
+
+
+def test_list_expenses_paginates_and_filters(client, auth_headers):
+    food = create_category(client, auth_headers, name="Groceries")
+    rent = create_category(client, auth_headers, name="Rent")
+    budget = create_budget(client, auth_headers, name="Household", amount=3000.0)
+
+    for name, amount, category in [
+        ("Milk", 2.5, food),
+        ("Bread", 3.0, food),
+        ("Butter", 4.75, food),
+        ("April rent", 1200.0, rent),
+    ]:
+        response = client.post(
+            "/api/v1/expenses",
+            json={
+                "name": name,
+                "amount": amount,
+                "category_id": category["id"],
+                "budget_id": budget["id"],
+            },
+            headers=auth_headers,
+        )
+        assert response.status_code == 201
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2, "category_id": food["id"]}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/expenses", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= 2
+        seen.extend(item["name"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == ["Milk", "Bread", "Butter"]
+
+    response = client.get(
+        "/api/v1/expenses",
+        params={"budget_id": budget["id"], "name_prefix": "B", "min_amount": 3, "max_amount": 4},
+        headers=auth_headers,
+    )
+    assert [item["name"] for item in response.json()["items"]] == ["Bread"]
+
+    response = client.get(
+        "/api/v1/expenses", params={"cursor": "not-a-cursor"}, headers=auth_headers
+    )
+    assert response.status_code == 400
+
+
+def test_export_expenses_streams_ndjson_and_csv(client, auth_headers):
+    category = create_category(client, auth_headers, name="Office")
+    budget = create_budget(client, auth_headers, name="Office Budget", amount=800.0)
+    for name, amount in [("Paper", 12.5), ("Toner, black", 80.0)]:
+        response = client.post(
+            "/api/v1/expenses",
+            json={
+                "name": name,
+                "amount": amount,
+                "category_id": category["id"],
+                "budget_id": budget["id"],
+                "spent_at": "2025-06-01T09:30:00+02:00",
+            },
+            headers=auth_headers,
+        )
+        assert response.status_code == 201
+
+    response = client.get("/api/v1/expenses/export", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    records = [json.loads(line) for line in response.text.splitlines()]
+    exported = {r["name"]: r for r in records if r["category_id"] == category["id"]}
+    assert Decimal(exported["Paper"]["amount"]) == Decimal("12.5")
+    assert exported["Paper"]["budget_name"] == "Office Budget"
+    assert exported["Paper"]["spent_at"] == "2025-06-01T07:30:00Z"
+    assert exported["Paper"]["created_at"].endswith("Z")
+
+    response = client.get(
+        "/api/v1/expenses/export",
+        params={"format": "csv", "gzip": True},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0][:3] == ["id", "name", "amount"]
+    assert rows[0][-2:] == ["spent_at", "created_at"]
+    toner = next(row for row in rows[1:] if row[1] == "Toner, black")
+    assert toner[-2] == "2025-06-01T07:30:00Z"
+    assert toner[-1].endswith("Z")
+
+
+def test_bulk_create_expenses_reports_row_errors(client, auth_headers):
+    category = create_category(client, auth_headers, name="Imports")
+    budget = create_budget(client, auth_headers, name="Imports Budget", amount=900.0)
+    good = {"name": "Coffee", "amount": 3.2, "category_id": category["id"], "budget_id": budget["id"]}
+
+    response = client.post(
+        "/api/v1/expenses/bulk",
+        json=[
+            good,
+            {**good, "amount": "not-a-number"},
+            {**good, "name": "Tea", "category_id": 987654},
+            {**good, "name": "Cake"},
+        ],
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert [row["index"] for row in result["created"]] == [0, 3]
+    assert [row["index"] for row in result["errors"]] == [1, 2]
+    assert result["errors"][1]["errors"][0]["loc"] == ["category_id"]
+
+    stored = client.get(
+        f"/api/v1/expenses/{result['created'][1]['id']}", headers=auth_headers
+    ).json()
+    assert stored["name"] == "Cake"
+
+    ndjson = "\n".join([json.dumps(good), "{broken", json.dumps({**good, "name": "Juice"})])
+    response = client.post(
+        "/api/v1/expenses/bulk",
+        content=ndjson,
+        headers={**auth_headers, "Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert [row["index"] for row in result["created"]] == [0, 2]
+    assert result["errors"] == [{"index": 1, "errors": [{"loc": [], "msg": "Invalid JSON"}]}]
+
+
+@pytest.fixture()
+def async_client(tmp_path, monkeypatch):
+    """Routes served through the async ``get_db`` on a SQLite file of their own."""
+    path = tmp_path / "async.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    database.Base.metadata.create_all(sync_engine)
+    sync_engine.dispose()
+    # NullPool: the test client's event loop does not outlive the request.
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    statements = []
+    event.listen(async_engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    monkeypatch.setattr(database, "ASYNC_DATABASE", True)
+    monkeypatch.setattr(
+        database, "AsyncSessionLocal", async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    )
+    yield TestClient(app), statements
+
+
+def test_routes_run_on_an_async_session(async_client):
+    client, statements = async_client
+    token = client.post("/api/v1/auth/token", data={"username": "admin", "password": "admin"}).json()
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+    category = create_category(client, headers, name="Async")
+    budget = create_budget(client, headers, name="Async Budget", amount="20")
+
+    created = client.post(
+        "/api/v1/expenses",
+        json={"name": "Coffee", "amount": "3.50", "category_id": category["id"], "budget_id": budget["id"]},
+        headers=headers,
+    )
+    assert created.status_code == 201, created.text
+    expense = client.get(f"/api/v1/expenses/{created.json()['id']}", headers=headers).json()
+    listed = client.get("/api/v1/expenses", params={"budget_id": budget["id"]}, headers=headers).json()
+
+    assert expense == created.json()
+    assert expense["budget"]["spent"] == "3.50"
+    assert [item["id"] for item in listed["items"]] == [expense["id"]]
+    assert any(statement.startswith("INSERT INTO expenses") for statement in statements)
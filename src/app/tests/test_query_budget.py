@@ -0,0 +1,77 @@
+"""Query budgets: endpoints must not issue one query per serialized row."""
+
+import pytest
+
+from src.app.models.expense import Budget, Category, Expense
+from src.app.services import expense_services
+
+ROWS = 25
+
+# Maximum statements per request, independent of the number of rows returned.
+# Reads include the table_versions lookup behind their ETag; writes include one
+# UPDATE per running total (category and budget) they change, the spend rollup
+# upsert (and its advisory lock on Postgres) and the version bump.
+QUERY_BUDGETS = {
+    "selectin": {"list": 4, "get": 4, "create": 9, "update": 8},
+    "joined": {"list": 2, "get": 2, "create": 7, "update": 6},
+}
+
+
+@pytest.fixture(params=sorted(QUERY_BUDGETS))
+def eager_loading(request, monkeypatch):
+    monkeypatch.setattr(expense_services, "EXPENSE_EAGER_LOADING", request.param)
+    return request.param
+
+
+@pytest.fixture()
+def seeded_expenses(db_session):
+    """One category and one budget per expense, the worst case for N+1 loads."""
+    expenses = []
+    for i in range(ROWS):
+        category = Category(name=f"qb-category-{i}")
+        budget = Budget(name=f"qb-budget-{i}", amount=100)
+        expenses.append(Expense(name=f"qb-expense-{i}", amount=i, category=category, budget=budget))
+    db_session.add_all(expenses)
+    db_session.commit()
+    ids = [expense.id for expense in expenses]
+    db_session.expunge_all()
+    return ids
+
+
+def test_list_expenses_query_budget(client, auth_headers, seeded_expenses, eager_loading, query_counter):
+    response = client.get("/api/v1/expenses", params={"limit": ROWS}, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == ROWS
+    assert all(item["category"] and item["budget"] for item in response.json()["items"])
+    assert query_counter.count <= QUERY_BUDGETS[eager_loading]["list"], query_counter.statements
+
+
+def test_get_expense_query_budget(client, auth_headers, seeded_expenses, eager_loading, query_counter):
+    response = client.get(f"/api/v1/expenses/{seeded_expenses[0]}", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert query_counter.count <= QUERY_BUDGETS[eager_loading]["get"], query_counter.statements
+
+
+def test_write_responses_query_budget(client, auth_headers, seeded_expenses, eager_loading, query_counter, db_session):
+    existing = db_session.get(Expense, seeded_expenses[0])
+    payload = {
+        "name": "qb-new",
+        "amount": 10,
+        "category_id": existing.category_id,
+        "budget_id": existing.budget_id,
+    }
+    db_session.expunge_all()
+
+    query_counter.reset()
+    response = client.post("/api/v1/expenses", json=payload, headers=auth_headers)
+    assert response.status_code == 201
+    assert query_counter.count <= QUERY_BUDGETS[eager_loading]["create"], query_counter.statements
+
+    query_counter.reset()
+    response = client.patch(
+        f"/api/v1/expenses/{response.json()['id']}", json=payload, headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert query_counter.count <= QUERY_BUDGETS[eager_loading]["update"], query_counter.statements
@@ -0,0 +1,96 @@
+"""EXPLAIN checks: the hot read and report queries must be served by indexes.
+
+Each case captures the statement an endpoint actually sends and asks the
+database for its plan. On Postgres sequential scans are disabled for the
+check, so the assertion is that a matching index exists and is usable even
+though the test tables are tiny. Expenses are partitioned there, so the
+plan names each partition's copy of an index; those are mapped back to the
+index declared on the model.
+"""
+
+import pytest
+
+from src.app.models.expense import Budget, Category, Expense
+
+
+@pytest.fixture()
+def indexed_ledger(db_session):
+    category = Category(name="qp-category")
+    budget = Budget(name="qp-budget", amount=1000)
+    db_session.add_all(
+        Expense(name=f"qp-{i}", amount=i, category=category, budget=budget) for i in range(20)
+    )
+    db_session.commit()
+    return {"category_id": category.id, "budget_id": budget.id}
+
+
+def _explain(db_session, statement, parameters) -> str:
+    connection = db_session.connection()
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        rows = connection.exec_driver_sql("EXPLAIN " + statement, parameters)
+        return _with_parent_indexes(connection, "\n".join(row[0] for row in rows))
+    rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+    return "\n".join(row[-1] for row in rows)
+
+
+def _with_parent_indexes(connection, plan: str) -> str:
+    partition_indexes = connection.exec_driver_sql(
+        "SELECT child.relname, parent.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "WHERE child.relkind = 'i'"
+    )
+    for child, parent in partition_indexes:
+        plan = plan.replace(f" {child} ", f" {child} ({parent}) ")
+    return plan
+
+
+def _payload_query(query_counter):
+    """The first statement after the ETag's table_versions lookup."""
+    for statement, parameters in zip(query_counter.statements, query_counter.parameters):
+        if "table_versions" not in statement:
+            return statement, parameters
+    raise AssertionError(query_counter.statements)
+
+
+HOT_QUERIES = [
+    ("/api/v1/expenses", {"category_id": "category_id"}, "ix_expenses_category_id_id"),
+    ("/api/v1/expenses", {"budget_id": "budget_id"}, "ix_expenses_budget_id_id"),
+    ("/api/v1/reports/summary", {"group_by": "category"}, "ix_expenses_category_id_id"),
+    ("/api/v1/reports/summary", {"group_by": "budget"}, "ix_expenses_budget_id_id"),
+    (
+        "/api/v1/expenses",
+        {"spent_from": "2025-01-01T00:00:00Z", "spent_to": "2025-02-01T00:00:00Z"},
+        "ix_expenses_spent_at",
+    ),
+    (
+        "/api/v1/reports/timeseries",
+        {"bucket": "day", "start": "2025-01-01T00:00:00Z", "end": "2026-01-01T00:00:00Z"},
+        "ix_expenses_spent_at",
+    ),
+]
+
+
+@pytest.mark.parametrize("path, params, index_name", HOT_QUERIES)
+def test_hot_queries_use_indexes(
+    client, auth_headers, db_session, indexed_ledger, query_counter, path, params, index_name
+):
+    params = {key: indexed_ledger.get(value, value) for key, value in params.items()}
+
+    response = client.get(path, params=params, headers=auth_headers)
+    assert response.status_code == 200
+
+    plan = _explain(db_session, *_payload_query(query_counter))
+    assert index_name in plan, plan
+
+
+def test_name_prefix_uses_pattern_index(client, auth_headers, db_session, indexed_ledger, query_counter):
+    if db_session.connection().dialect.name != "postgresql":
+        pytest.skip("SQLite's case-insensitive LIKE cannot use a plain index")
+
+    response = client.get("/api/v1/expenses", params={"name_prefix": "qp-1"}, headers=auth_headers)
+    assert response.status_code == 200
+
+    plan = _explain(db_session, *_payload_query(query_counter))
+    assert "ix_expenses_name" in plan, plan
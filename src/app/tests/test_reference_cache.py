@@ -0,0 +1,273 @@
+"""Tests for the shared response cache."""
+
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.util import greenlet_spawn
+
+from src.app.models.expense import Budget
+from src.app.services import budget_services
+from src.app.cache import (
+    CacheNamespace,
+    MemoryBackend,
+    RedisBackend,
+    budget_cache,
+    category_cache,
+    invalidate_on_commit,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_memory_entries_expire_after_ttl():
+    clock = FakeClock()
+    backend = MemoryBackend(maxsize=10, clock=clock)
+    backend.set("a", 1, ttl=5)
+
+    assert backend.get("a") == 1
+    clock.now = 5
+    assert backend.get("a") is None
+
+
+def test_memory_least_recently_used_entry_is_evicted():
+    backend = MemoryBackend(maxsize=2)
+    backend.set("a", 1)
+    backend.set("b", 2)
+    backend.get("a")
+    backend.set("c", 3)
+
+    assert backend.get("b") is None
+    assert (backend.get("a"), backend.get("c")) == (1, 3)
+    assert backend.evictions == 1
+
+
+def test_namespace_counts_hits_and_misses_and_invalidates():
+    cache = CacheNamespace("test", ttl=60, backend=MemoryBackend())
+    loads = []
+    load = lambda: loads.append(1) or {"value": len(loads)}
+
+    assert cache.get_or_load("a", load) == {"value": 1}
+    assert cache.get_or_load("a", load) == {"value": 1}
+    cache.invalidate()
+    assert cache.get_or_load("a", load) == {"value": 2}
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_row_read_before_a_commit_is_not_cached_after_it():
+    cache = CacheNamespace("test", ttl=60, backend=MemoryBackend())
+
+    def load():
+        row = {"spent": "0.00"}  # selected before the concurrent write commits
+        with Session() as writer:
+            invalidate_on_commit(writer, cache)
+            writer.commit()
+        return row
+
+    assert cache.get_or_load(1, load) == {"spent": "0.00"}
+    assert cache.get(1) is None
+
+
+def test_zero_ttl_disables_caching():
+    cache = CacheNamespace("test", ttl=0, backend=MemoryBackend())
+    loads = []
+    cache.get_or_load("a", lambda: loads.append(1))
+    cache.get_or_load("a", lambda: loads.append(1))
+
+    assert len(loads) == 2
+
+
+def test_redis_invalidation_reaches_every_worker():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    # Two namespaces on one server stand in for two worker processes.
+    worker_a = CacheNamespace("budgets", ttl=60, backend=RedisBackend(client=fakeredis.FakeRedis(server=server)))
+    worker_b = CacheNamespace("budgets", ttl=60, backend=RedisBackend(client=fakeredis.FakeRedis(server=server)))
+
+    worker_a.set(1, {"id": 1, "spent": "5.00"})
+    assert worker_b.get(1) == {"id": 1, "spent": "5.00"}
+    worker_b.invalidate()
+    assert worker_a.get(1) is None
+
+
+def test_value_loaded_across_an_invalidation_is_not_served():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    reader = CacheNamespace("expenses", ttl=60, backend=RedisBackend(client=fakeredis.FakeRedis(server=server)))
+    writer = CacheNamespace("expenses", ttl=60, backend=RedisBackend(client=fakeredis.FakeRedis(server=server)))
+
+    def load():
+        writer.invalidate()  # another worker commits a write mid-load
+        return {"id": 1, "spent": "0.00"}
+
+    assert reader.get_or_load(1, load) == {"id": 1, "spent": "0.00"}
+    assert reader.get(1) is None
+    assert writer.get(1) is None
+
+
+def test_budget_read_racing_a_write_is_not_cached(db_session):
+    budget = Budget(name="rc-race", amount=10)
+    db_session.add(budget)
+    db_session.flush()
+    # The write commits, and invalidates, while the budget's SELECT is running.
+    event.listen(db_session, "do_orm_execute", lambda state: budget_cache.invalidate(), once=True)
+
+    assert budget_services.get_specific_budget(db_session, budget.id)["name"] == "rc-race"
+    assert budget_cache.get(budget.id) is None
+
+
+def test_redis_lookups_take_one_round_trip_off_the_event_loop():
+    fakeredis = pytest.importorskip("fakeredis")
+    commands = []
+
+    class RecordingRedis(fakeredis.FakeRedis):
+        def execute_command(self, *args, **kwargs):
+            commands.append((args[0], threading.get_ident()))
+            return super().execute_command(*args, **kwargs)
+
+    cache = CacheNamespace("budgets", ttl=60, backend=RedisBackend(client=RecordingRedis()))
+    cache.set(1, {"id": 1})
+    commands.clear()
+
+    async def main():
+        # As service code runs in async database mode: sync, inside SQLAlchemy's greenlet.
+        cached = await greenlet_spawn(cache.get_or_load, 1, lambda: None)
+        computed = await cache.get_or_compute(1, None)
+        return cached, computed, threading.get_ident()
+
+    cached, computed, loop_thread = asyncio.run(main())
+
+    assert cached == computed == {"id": 1}
+    assert [name for name, _ in commands] == ["MGET", "MGET"]
+    assert all(thread != loop_thread for _, thread in commands)
+
+
+def test_concurrent_misses_compute_once():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    workers = [
+        CacheNamespace("reports", ttl=60, backend=RedisBackend(client=fakeredis.FakeRedis(server=server)))
+        for _ in range(2)
+    ]
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return {"total": 42}
+
+    async def main():
+        return await asyncio.gather(
+            *(workers[i % 2].get_or_compute("summary", compute) for i in range(20))
+        )
+
+    assert asyncio.run(main()) == [{"total": 42}] * 20
+    assert len(calls) == 1
+
+
+def test_a_failed_computation_fails_its_waiters_once():
+    cache = CacheNamespace("reports", ttl=60, backend=MemoryBackend())
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        if len(calls) == 1:
+            raise RuntimeError("statement timeout")
+        return {"total": 42}
+
+    async def main():
+        failed = await asyncio.gather(*(cache.get_or_compute("summary", compute) for _ in range(5)), return_exceptions=True)
+        retried = await asyncio.gather(*(cache.get_or_compute("summary", compute) for _ in range(5)))
+        return failed, retried
+
+    failed, retried = asyncio.run(main())
+
+    assert [str(error) for error in failed] == ["statement timeout"] * 5
+    assert retried == [{"total": 42}] * 5
+    assert len(calls) == 2
+    assert cache._inflight == {}
+
+
+def test_a_waiter_takes_over_a_cancelled_computation():
+    cache = CacheNamespace("reports", ttl=60, backend=MemoryBackend())
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"total": len(calls)}
+
+    async def main():
+        first = asyncio.ensure_future(cache.get_or_compute("summary", compute))
+        await asyncio.sleep(0)
+        waiters = [asyncio.ensure_future(cache.get_or_compute("summary", compute)) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(main()) == [{"total": 2}] * 5
+    assert len(calls) == 2
+    assert cache._inflight == {}
+
+
+def test_reference_reads_are_served_from_memory(client, auth_headers, query_counter):
+    category = client.post("/api/v1/categories", json={"name": "rc-food"}, headers=auth_headers).json()
+    budget = client.post("/api/v1/budgets", json={"name": "rc-home", "amount": 10}, headers=auth_headers).json()
+    client.get(f"/api/v1/categories/{category['id']}", headers=auth_headers)
+    client.get(f"/api/v1/budgets/{budget['id']}", headers=auth_headers)
+    client.get("/api/v1/budgets", headers=auth_headers)
+    hits = category_cache.hits, budget_cache.hits
+
+    query_counter.reset()
+    assert client.get(f"/api/v1/categories/{category['id']}", headers=auth_headers).json() == category
+    assert client.get(f"/api/v1/budgets/{budget['id']}", headers=auth_headers).json() == budget
+    assert client.get("/api/v1/budgets", headers=auth_headers).status_code == 200
+    # Only the ETag's version lookups reach the database.
+    assert all("table_versions" in statement for statement in query_counter.statements)
+    assert (category_cache.hits, budget_cache.hits) == (hits[0] + 1, hits[1] + 2)
+
+
+def test_writes_invalidate_cached_entries(client, auth_headers):
+    client.post("/api/v1/categories", json={"name": "rc-first"}, headers=auth_headers)
+    assert [c["name"] for c in client.get("/api/v1/categories", headers=auth_headers).json()["items"]] == ["rc-first"]
+
+    category = client.post("/api/v1/categories", json={"name": "rc-second"}, headers=auth_headers).json()
+    names = [c["name"] for c in client.get("/api/v1/categories", headers=auth_headers).json()["items"]]
+    assert names == ["rc-first", "rc-second"]
+
+    # Expense writes change the running total embedded in budgets, expenses and reports.
+    budget = client.post("/api/v1/budgets", json={"name": "rc-home", "amount": 10}, headers=auth_headers).json()
+    assert client.get(f"/api/v1/budgets/{budget['id']}", headers=auth_headers).json()["spent"] == "0.00"
+    report = client.get("/api/v1/reports/summary", headers=auth_headers).json()
+    assert report["totals"]["count"] == 0
+    expense = client.post(
+        "/api/v1/expenses",
+        json={"name": "rc-lunch", "amount": 4, "category_id": category["id"], "budget_id": budget["id"]},
+        headers=auth_headers,
+    ).json()
+    assert client.get(f"/api/v1/budgets/{budget['id']}", headers=auth_headers).json()["remaining"] == "6.00"
+    assert client.get(f"/api/v1/expenses/{expense['id']}", headers=auth_headers).json()["budget"]["spent"] == "4.00"
+    assert client.get("/api/v1/reports/summary", headers=auth_headers).json()["totals"]["count"] == 1
+
+    client.post(
+        "/api/v1/expenses",
+        json={"name": "rc-dinner", "amount": 3, "category_id": category["id"], "budget_id": budget["id"]},
+        headers=auth_headers,
+    )
+    assert client.get(f"/api/v1/expenses/{expense['id']}", headers=auth_headers).json()["budget"]["spent"] == "7.00"
+
+
+def test_missing_budget_returns_404(client, auth_headers):
+    response = client.get("/api/v1/budgets/999999", headers=auth_headers)
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == {"message": "Budget not found", "code": 404}
@@ -0,0 +1,143 @@
+"""Tests for the /api/v1/reports endpoints."""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from src.app.models.expense import Budget, Category, Expense
+
+
+@pytest.fixture()
+def ledger(db_session):
+    food = Category(name="rp-food")
+    travel = Category(name="rp-travel")
+    idle = Category(name="rp-idle")
+    home = Budget(name="rp-home", amount=Decimal("100.00"))
+    trips = Budget(name="rp-trips", amount=Decimal("500.00"))
+    unused = Budget(name="rp-unused", amount=Decimal("50.00"))
+    db_session.add_all(
+        [
+            idle,
+            unused,
+            Expense(name="rp-1", amount=Decimal("10.00"), category=food, budget=home),
+            Expense(name="rp-2", amount=Decimal("30.50"), category=food, budget=home),
+            Expense(name="rp-3", amount=Decimal("200.00"), category=travel, budget=trips),
+            Expense(name="rp-4", amount=Decimal("5.25"), category=food, budget=trips),
+        ]
+    )
+    db_session.commit()
+    return {
+        "food": food.id,
+        "travel": travel.id,
+        "idle": idle.id,
+        "home": home.id,
+        "trips": trips.id,
+        "unused": unused.id,
+    }
+
+
+def test_summary_by_category(client, auth_headers, ledger):
+    response = client.get("/api/v1/reports/summary", headers=auth_headers)
+
+    assert response.status_code == 200
+    groups = {row["category_id"]: row for row in response.json()["groups"]}
+    food = groups[ledger["food"]]
+    assert (food["count"], food["total"], food["minimum"], food["maximum"]) == (3, "45.75", "5.25", "30.50")
+    assert food["average"] == "15.25"
+    assert groups[ledger["idle"]]["count"] == 0
+    assert groups[ledger["idle"]]["total"] == "0.00"
+
+
+def test_summary_by_budget_includes_remaining(client, auth_headers, ledger):
+    response = client.get(
+        "/api/v1/reports/summary", params={"group_by": "budget"}, headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    groups = {row["budget_id"]: row for row in response.json()["groups"]}
+    assert groups[ledger["home"]]["remaining"] == "59.50"
+    assert groups[ledger["trips"]]["remaining"] == "294.75"
+    assert groups[ledger["unused"]]["remaining"] == "50.00"
+
+
+def test_summary_by_category_and_budget(client, auth_headers, ledger):
+    response = client.get(
+        "/api/v1/reports/summary",
+        params=[("group_by", "category"), ("group_by", "budget")],
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["group_by"] == ["category", "budget"]
+    pairs = {(row["category_id"], row["budget_id"]): row["total"] for row in body["groups"]}
+    assert pairs[(ledger["food"], ledger["trips"])] == "5.25"
+    assert pairs[(ledger["food"], ledger["home"])] == "40.50"
+    assert body["totals"]["count"] >= 4
+
+
+@pytest.fixture()
+def dated_ledger(db_session):
+    food = Category(name="ts-food")
+    travel = Category(name="ts-travel")
+    home = Budget(name="ts-home", amount=Decimal("100.00"))
+
+    def spent(name, amount, category, *when):
+        return Expense(
+            name=name,
+            amount=Decimal(amount),
+            category=category,
+            budget=home,
+            spent_at=datetime(*when, tzinfo=timezone.utc),
+        )
+
+    db_session.add_all(
+        [
+            # Thursday 2 and Sunday 5 January fall in the week of Monday 30 December.
+            spent("ts-1", "10.00", food, 2025, 1, 2, 8, 30),
+            spent("ts-2", "2.50", food, 2025, 1, 5, 23, 59),
+            spent("ts-3", "40.00", travel, 2025, 1, 6, 0, 0),
+            spent("ts-4", "7.25", food, 2025, 2, 14, 12, 0),
+            spent("ts-5", "99.00", food, 2024, 12, 31, 23, 0),
+        ]
+    )
+    db_session.commit()
+    return {"food": food.id, "travel": travel.id}
+
+
+def _series(client, auth_headers, **params):
+    params = {"start": "2025-01-01T00:00:00Z", "end": "2025-03-01T00:00:00Z", **params}
+    response = client.get("/api/v1/reports/timeseries", params=params, headers=auth_headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_timeseries_by_month(client, auth_headers, dated_ledger):
+    body = _series(client, auth_headers)
+
+    assert body["bucket"] == "month" and body["group_by"] is None
+    assert [(point["period"], point["total"], point["count"]) for point in body["points"]] == [
+        ("2025-01-01T00:00:00Z", "52.50", 3),
+        ("2025-02-01T00:00:00Z", "7.25", 1),
+    ]
+
+
+def test_timeseries_weeks_start_on_monday(client, auth_headers, dated_ledger):
+    body = _series(client, auth_headers, bucket="week")
+
+    assert [(point["period"], point["total"]) for point in body["points"]] == [
+        ("2024-12-30T00:00:00Z", "12.50"),
+        ("2025-01-06T00:00:00Z", "40.00"),
+        ("2025-02-10T00:00:00Z", "7.25"),
+    ]
+
+
+def test_timeseries_per_category(client, auth_headers, dated_ledger):
+    body = _series(client, auth_headers, bucket="day", group_by="category", end="2025-01-06T00:00:01Z")
+
+    assert [(point["period"], point["category_id"], point["total"]) for point in body["points"]] == [
+        ("2025-01-02T00:00:00Z", dated_ledger["food"], "10.00"),
+        ("2025-01-05T00:00:00Z", dated_ledger["food"], "2.50"),
+        ("2025-01-06T00:00:00Z", dated_ledger["travel"], "40.00"),
+    ]
@@ -0,0 +1,78 @@
+"""Tests for the per-route request metrics and SQL profiling."""
+
+import logging
+import re
+
+from src.app import middleware
+from src.app.middleware import REQUEST_DURATION, REQUEST_QUERIES, REQUESTS
+
+
+def test_requests_are_recorded_per_route_name(client, auth_headers):
+    before = REQUESTS.value(route="get_categories", method="GET", status="200")
+    timed = REQUEST_DURATION.count(route="get_categories", method="GET")
+
+    client.get("/api/v1/categories", headers=auth_headers)
+    client.get("/api/v1/categories", headers=auth_headers)
+
+    assert REQUESTS.value(route="get_categories", method="GET", status="200") == before + 2
+    assert REQUEST_DURATION.count(route="get_categories", method="GET") == timed + 2
+
+
+def test_queries_are_attributed_to_the_request(client, auth_headers):
+    queries = REQUEST_QUERIES.count(route="get_expenses")
+
+    client.get("/api/v1/expenses", headers=auth_headers)
+
+    assert REQUEST_QUERIES.count(route="get_expenses") == queries + 1
+    body = client.get("/metrics").text
+    assert 'http_request_db_queries_bucket{route="get_expenses",le="0"}' in body
+    # The listing ran at least the ETag lookup and the page query.
+    bucket = next(
+        line for line in body.splitlines()
+        if line.startswith('http_request_db_queries_bucket{route="get_expenses",le="1"}')
+    )
+    assert int(bucket.rsplit(" ", 1)[1]) < REQUEST_QUERIES.count(route="get_expenses")
+
+
+def test_unknown_paths_share_one_label(client):
+    before = REQUESTS.value(route="unmatched", method="GET", status="404")
+
+    client.get("/no/such/path")
+
+    assert REQUESTS.value(route="unmatched", method="GET", status="404") == before + 1
+
+
+def test_slow_queries_are_logged_with_redacted_parameters(client, auth_headers, caplog, monkeypatch):
+    monkeypatch.setattr(middleware, "SLOW_QUERY_MS", 1e-6)
+
+    with caplog.at_level(logging.WARNING, logger="src.app.middleware"):
+        client.get("/api/v1/expenses", params={"name_prefix": "secret-lunch"}, headers=auth_headers)
+
+    slow = [record.getMessage() for record in caplog.records if record.getMessage().startswith("Slow query")]
+    assert any(message.startswith("Slow query in get_expenses:") for message in slow)
+    assert "<str>" in "".join(slow)
+    assert "secret-lunch" not in "".join(slow)
+
+
+def test_redact_parameters_keeps_shape_not_values():
+    assert middleware.redact_parameters({"name": "lunch", "amount": 3, "note": None}) == {
+        "name": "<str>",
+        "amount": "<int>",
+        "note": None,
+    }
+    assert middleware.redact_parameters([("a", 1), ("b", 2)], executemany=True) == {
+        "sets": 2,
+        "first": ["<str>", "<int>"],
+    }
+
+
+def test_server_timing_header(client, auth_headers, monkeypatch):
+    assert "server-timing" not in client.get("/api/v1/expenses", headers=auth_headers).headers
+    monkeypatch.setattr(middleware, "SERVER_TIMING", True)
+
+    header = client.get("/api/v1/expenses", headers=auth_headers).headers["server-timing"]
+
+    assert re.fullmatch(
+        r'db;dur=\d+\.\d\d;desc="[1-9]\d* queries, \d+ rows", serialize;dur=\d+\.\d\d, total;dur=\d+\.\d\d',
+        header,
+    )
@@ -0,0 +1,132 @@
+"""Tests for the monthly spend rollups and their consistency with the expenses."""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import update
+
+from src.app.models.expense import SpendRollup
+from src.app.schema.expense import SpendTimeseries
+from src.app.services import report_services, rollup_services
+
+MONTHS = [date(2024, month, 1) for month in (1, 2, 3, 4)]
+
+
+def _at(month):
+    return rollup_services._period_bounds(month)[0]
+
+
+@pytest.fixture()
+def rolled_up_ledger(client, auth_headers, db_session):
+    # Built while empty: from here on the rollups are kept by the write paths.
+    assert rollup_services.refresh_rollups(db_session, periods=MONTHS) == MONTHS
+
+    def post(path, body):
+        response = client.post(path, json=body, headers=auth_headers)
+        assert response.status_code in (200, 201), response.text
+        return response.json()
+
+    food = post("/api/v1/categories", {"name": "ru-food"})["id"]
+    rent = post("/api/v1/categories", {"name": "ru-rent"})["id"]
+    home = post("/api/v1/budgets", {"name": "ru-home", "amount": "5000"})["id"]
+    trips = post("/api/v1/budgets", {"name": "ru-trips", "amount": "500"})["id"]
+
+    def expense(name, amount, category_id, spent_at, budget_id=trips):
+        return {"name": name, "amount": amount, "category_id": category_id, "budget_id": budget_id, "spent_at": spent_at}
+
+    lunch = post("/api/v1/expenses", expense("ru-lunch", "12.30", food, "2024-01-31T23:59:59Z", home))
+    moved = post("/api/v1/expenses", expense("ru-moved", "40", food, "2024-01-10T08:00:00Z"))
+    gone = post("/api/v1/expenses", expense("ru-gone", "7.70", rent, "2024-02-01T00:00:00Z", home))
+    post(
+        "/api/v1/expenses/bulk",
+        [
+            expense("ru-rent-feb", "900", rent, "2024-02-03T00:00:00+02:00", home),
+            expense("ru-snack", "0.10", food, "2024-03-15T12:00:00Z"),
+            expense("ru-snack-2", "0.20", food, "2024-03-16T12:00:00Z"),
+        ],
+    )
+    # Moves the expense to another month, category, budget and amount.
+    response = client.patch(
+        f"/api/v1/expenses/{moved['id']}",
+        json=expense("ru-moved", "41.50", rent, "2024-04-02T00:00:00Z", home),
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert client.delete(f"/api/v1/expenses/{gone['id']}", headers=auth_headers).status_code == 204
+    return {"food": food, "rent": rent, "home": home, "trips": trips, "lunch": lunch["id"]}
+
+
+def test_incremental_rollups_match_group_by(db_session, rolled_up_ledger):
+    assert rollup_services.rollup_drift(db_session) == []
+
+
+@pytest.mark.parametrize("group_by", [None, "category", "budget"])
+@pytest.mark.parametrize(
+    "start, end",
+    [(None, None), (MONTHS[1], MONTHS[3]), (MONTHS[0], None)],
+)
+def test_monthly_reports_from_rollups_match_group_by(db_session, rolled_up_ledger, monkeypatch, group_by, start, end):
+    bounds = {"start": _at(start) if start else None, "end": _at(end) if end else None}
+    assert rollup_services.rollups_cover(db_session, **bounds)
+    from_rollups = report_services.get_spend_timeseries(db_session, "month", group_by, **bounds)
+
+    monkeypatch.setattr(rollup_services, "ROLLUP_REPORTS", False)
+    from_expenses = report_services.get_spend_timeseries(db_session, "month", group_by, **bounds)
+
+    assert from_rollups["points"]
+    assert SpendTimeseries.model_validate(from_rollups) == SpendTimeseries.model_validate(from_expenses)
+
+
+def test_timeseries_endpoint_reads_the_rollups(client, auth_headers, rolled_up_ledger, query_counter):
+    response = client.get(
+        "/api/v1/reports/timeseries",
+        params={"bucket": "month", "start": "2024-01-01T00:00:00Z", "end": "2024-05-01T00:00:00Z"},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    assert [(point["period"], point["total"], point["count"]) for point in response.json()["points"]] == [
+        ("2024-01-01T00:00:00Z", "12.30", 1),
+        ("2024-02-01T00:00:00Z", "900.00", 1),
+        ("2024-03-01T00:00:00Z", "0.30", 2),
+        ("2024-04-01T00:00:00Z", "41.50", 1),
+    ]
+    assert any("FROM spend_rollups" in statement for statement in query_counter.statements)
+
+
+def test_unbuilt_months_and_partial_bounds_fall_back_to_the_expenses(
+    client, auth_headers, db_session, rolled_up_ledger
+):
+    assert not rollup_services.rollups_cover(db_session, _at(MONTHS[0]).replace(day=2), None)
+
+    response = client.post(
+        "/api/v1/expenses",
+        json={
+            "name": "ru-june",
+            "amount": "5",
+            "category_id": rolled_up_ledger["food"],
+            "budget_id": rolled_up_ledger["trips"],
+            "spent_at": "2024-06-05T00:00:00Z",
+        },
+        headers=auth_headers,
+    )
+    assert response.status_code == 201
+    assert rollup_services.rollups_cover(db_session, None, _at(MONTHS[3]))
+    assert not rollup_services.rollups_cover(db_session, None, None)
+
+    points = report_services.get_spend_timeseries(db_session, "month")["points"]
+    assert [(point["period"].month, point["count"]) for point in points] == [(1, 1), (2, 1), (3, 2), (4, 1), (6, 1)]
+
+
+def test_rebuilding_a_period_repairs_drift(db_session, rolled_up_ledger):
+    db_session.execute(
+        update(SpendRollup)
+        .where(SpendRollup.period == MONTHS[2])
+        .values(total=SpendRollup.total + 1, count=SpendRollup.count + 1)
+    )
+    drift = rollup_services.rollup_drift(db_session)
+    assert [(row["period"], row["category_id"]) for row in drift] == [(MONTHS[2], rolled_up_ledger["food"])]
+
+    assert rollup_services.refresh_rollups(db_session, periods=[MONTHS[2]]) == [MONTHS[2]]
+
+    assert rollup_services.rollup_drift(db_session) == []
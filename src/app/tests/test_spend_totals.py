@@ -0,0 +1,108 @@
+"""Tests for the running spent totals on budgets and categories."""
+
+from decimal import Decimal
+
+from sqlalchemy import update
+
+from src.app.models.expense import Budget, Category
+from src.app.services.totals_services import reconcile_spent_totals
+
+
+def create_category(client, headers, name):
+    response = client.post("/api/v1/categories", json={"name": name}, headers=headers)
+    assert response.status_code in (200, 201), response.text
+    return response.json()["id"]
+
+
+def create_budget(client, headers, name, amount=100.0):
+    response = client.post(
+        "/api/v1/budgets", json={"name": name, "amount": amount}, headers=headers
+    )
+    assert response.status_code in (200, 201), response.text
+    return response.json()["id"]
+
+
+def spent(client, headers, kind, item_id):
+    response = client.get(f"/api/v1/{kind}/{item_id}", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_totals_follow_create_update_and_delete(client, auth_headers):
+    category_id = create_category(client, auth_headers, "st-food")
+    home = create_budget(client, auth_headers, "st-home", 100.0)
+    trips = create_budget(client, auth_headers, "st-trips", 50.0)
+
+    response = client.post(
+        "/api/v1/expenses",
+        json={"name": "st-lunch", "amount": 12.5, "category_id": category_id, "budget_id": home},
+        headers=auth_headers,
+    )
+    assert response.status_code in (200, 201), response.text
+    expense_id = response.json()["id"]
+    client.post(
+        "/api/v1/expenses",
+        json={"name": "st-dinner", "amount": 20.0, "category_id": category_id, "budget_id": home},
+        headers=auth_headers,
+    )
+
+    assert spent(client, auth_headers, "categories", category_id)["spent"] == "32.50"
+    home_budget = spent(client, auth_headers, "budgets", home)
+    assert (home_budget["spent"], home_budget["remaining"]) == ("32.50", "67.50")
+
+    # Moving an expense to another budget shifts its amount between the two.
+    response = client.patch(
+        f"/api/v1/expenses/{expense_id}",
+        json={"name": "st-lunch", "amount": 15.0, "category_id": category_id, "budget_id": trips},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200, response.text
+    assert spent(client, auth_headers, "budgets", home)["spent"] == "20.00"
+    assert spent(client, auth_headers, "budgets", trips)["remaining"] == "35.00"
+    assert spent(client, auth_headers, "categories", category_id)["spent"] == "35.00"
+
+    response = client.delete(f"/api/v1/expenses/{expense_id}", headers=auth_headers)
+    assert response.status_code in (200, 204), response.text
+    assert spent(client, auth_headers, "budgets", trips)["spent"] == "0.00"
+    assert spent(client, auth_headers, "categories", category_id)["spent"] == "20.00"
+
+
+def test_bulk_create_adjusts_totals(client, auth_headers):
+    category_id = create_category(client, auth_headers, "st-bulk")
+    budget_id = create_budget(client, auth_headers, "st-bulk", 10.0)
+    rows = [
+        {"name": f"st-bulk-{i}", "amount": 1.25, "category_id": category_id, "budget_id": budget_id}
+        for i in range(4)
+    ] + [{"name": "st-bad", "amount": -1, "category_id": category_id}]
+
+    response = client.post("/api/v1/expenses/bulk", json=rows, headers=auth_headers)
+
+    assert response.status_code == 200, response.text
+    assert len(response.json()["created"]) == 4
+    assert spent(client, auth_headers, "categories", category_id)["spent"] == "5.00"
+    assert spent(client, auth_headers, "budgets", budget_id)["remaining"] == "5.00"
+
+
+def test_reconcile_reports_and_fixes_drift(client, auth_headers, db_session):
+    category_id = create_category(client, auth_headers, "st-drift")
+    budget_id = create_budget(client, auth_headers, "st-drift")
+    client.post(
+        "/api/v1/expenses",
+        json={"name": "st-drift", "amount": 7.0, "category_id": category_id, "budget_id": budget_id},
+        headers=auth_headers,
+    )
+    assert reconcile_spent_totals(db_session) == {"budgets": [], "categories": []}
+
+    db_session.execute(update(Budget).where(Budget.id == budget_id).values(spent=99))
+    db_session.commit()
+
+    report = reconcile_spent_totals(db_session)
+    assert report["budgets"] == [
+        {"id": budget_id, "recorded": Decimal("99.00"), "actual": Decimal("7.00")}
+    ]
+    assert report["categories"] == []
+
+    reconcile_spent_totals(db_session, fix=True)
+    assert reconcile_spent_totals(db_session) == {"budgets": [], "categories": []}
+    assert db_session.get(Budget, budget_id).spent == Decimal("7.00")
+    assert db_session.get(Category, category_id).spent == Decimal("7.00")
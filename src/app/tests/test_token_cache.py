@@ -0,0 +1,71 @@
+"""Tests for the verified-token cache in front of JWT decoding."""
+
+import time
+from datetime import timedelta
+
+import jwt as pyjwt
+import pytest
+from fastapi import HTTPException
+
+from src.app.security import jwt as jwt_helpers
+
+
+@pytest.fixture()
+def verify_cache():
+    jwt_helpers.configure_verify_cache(16)
+    yield
+    jwt_helpers.configure_verify_cache(jwt_helpers.JWT_VERIFY_CACHE_SIZE)
+
+
+def test_repeat_tokens_skip_verification(verify_cache, monkeypatch):
+    token = jwt_helpers.create_access_token({"sub": "admin"})
+    assert jwt_helpers.decode_access_token(token)["sub"] == "admin"
+
+    def fail(*args, **kwargs):
+        raise AssertionError("token was verified again")
+
+    monkeypatch.setattr(jwt_helpers.jwt, "decode", fail)
+    assert jwt_helpers.decode_access_token(token)["sub"] == "admin"
+
+
+def test_cached_tokens_expire_with_their_exp(monkeypatch):
+    now = [time.time()]
+    jwt_helpers.configure_verify_cache(16, clock=lambda: now[0])
+    try:
+        token = jwt_helpers.create_access_token({"sub": "admin"}, expires_delta=timedelta(seconds=60))
+        jwt_helpers.decode_access_token(token)
+
+        def expired(*args, **kwargs):
+            raise pyjwt.ExpiredSignatureError("Signature has expired")
+
+        monkeypatch.setattr(jwt_helpers.jwt, "decode", expired)
+        now[0] += 30
+        assert jwt_helpers.decode_access_token(token)["sub"] == "admin"
+        now[0] += 60
+        with pytest.raises(HTTPException) as excinfo:
+            jwt_helpers.decode_access_token(token)
+        assert excinfo.value.status_code == 401
+    finally:
+        jwt_helpers.configure_verify_cache(jwt_helpers.JWT_VERIFY_CACHE_SIZE)
+
+
+def test_invalid_tokens_are_not_cached(verify_cache):
+    token = jwt_helpers.create_access_token({"sub": "admin"})
+    tampered = token[:-2] + ("AA" if token[-2:] != "AA" else "BB")
+
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            jwt_helpers.decode_access_token(tampered)
+
+
+def test_cache_can_be_disabled(monkeypatch):
+    jwt_helpers.configure_verify_cache(0)
+    try:
+        token = jwt_helpers.create_access_token({"sub": "admin"})
+        jwt_helpers.decode_access_token(token)
+        calls = []
+        monkeypatch.setattr(jwt_helpers.jwt, "decode", lambda *a, **k: calls.append(1) or {"sub": "admin"})
+        jwt_helpers.decode_access_token(token)
+        assert calls == [1]
+    finally:
+        jwt_helpers.configure_verify_cache(jwt_helpers.JWT_VERIFY_CACHE_SIZE)
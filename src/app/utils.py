@@ -14,4 +14,5 @@ def cors_config(app: FastAPI):
         allow_credentials=True,
         allow_methods=["*"],  # Allow all methods for CORS
         allow_headers=["*"],  # Allow all headers for CORS
+        expose_headers=["ETag", "Last-Modified"],  # Let pollers send conditional requests
     )
\ No newline at end of file
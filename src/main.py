@@ -4,15 +4,47 @@ This module initializes the FastAPI application, sets up the application
 lifespan for database initialization, and includes the API routes.
 """
 
+import asyncio
+import contextlib
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from src.app.database.expense import SessionLocal, async_engine, engine
+from src.app.database.partitions import maintain_partitions
+from src.app.group_commit import EXPENSE_GROUP_COMMIT, expense_writer
+from src.app.middleware import metrics_config
 from src.app.routes.expense import router as postgres_router
+from src.app.routes.jwks import router as jwks_router
+from src.app.routes.metrics import router as metrics_router
+from src.app.routes.reports import router as reports_router
+from src.app.services.idempotency_services import maintain_idempotency_keys
+from src.app.services.rollup_services import maintain_rollups
 
 from src.app.utils import cors_config
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the expense group-commit writer (if enabled) and the partition, rollup and idempotency-key maintenance."""
+    maintenance = [
+        asyncio.create_task(maintain_partitions(engine)),
+        asyncio.create_task(maintain_rollups(SessionLocal)),
+        asyncio.create_task(maintain_idempotency_keys(SessionLocal)),
+    ]
+    if EXPENSE_GROUP_COMMIT:
+        expense_writer.start()
+    try:
+        yield
+    finally:
+        await expense_writer.stop()
+        for task in maintenance:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
 
 
 app = FastAPI(
+    lifespan=lifespan,
     title="Expense Tracker API",
     description="An API for tracking expenses and managing budgets",
     version="1.0.0",
@@ -27,6 +59,7 @@ app = FastAPI(
 )
 
 cors_config(app)  # Configure CORS settings
+metrics_config(app, [engine] + ([async_engine.sync_engine] if async_engine else []))
 
 @app.get("/")
 async def root():
@@ -40,3 +73,6 @@ async def root():
 
 
 app.include_router(postgres_router)
+app.include_router(reports_router)
+app.include_router(metrics_router)
+app.include_router(jwks_router)